@@ -8,13 +8,18 @@ from alembic import context
 # Import the Base from your models
 from app.db.base import Base
 # Import all models so they are included in migrations
-from app.models.content import Content
+from app.models.content import Content, ContentChunk
 from app.models.collection import Collection, ContentCollection
 from app.models.annotation import Annotation
 from app.models.preferences import Preferences
-from app.models.search import SearchHistory, SavedSearch
+from app.models.search import SearchHistory, SavedSearch, SavedSearchResult
 from app.models.user import User
 from app.models.auth_token import VerificationToken, PasswordResetToken
+from app.models.embedding import EmbeddingCacheEntry, EmbeddingMigration
+from app.models.job import Job
+from app.models.tag import UserTag
+from app.models.llm import LLMCacheEntry
+from app.models.enrichment import EnrichmentRun
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,66 @@
+"""add_saved_search_results
+
+Revision ID: 3b7e1f9a2c41
+Revises: e163429d516a
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e1f9a2c41'
+down_revision: Union[str, Sequence[str], None] = 'e163429d516a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('saved_searches', sa.Column('materialized', sa.Boolean(), nullable=False, server_default='false'))
+    op.add_column('saved_searches', sa.Column('query_embedding', Vector(384), nullable=True))
+    op.add_column('saved_searches', sa.Column('last_refreshed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('saved_searches', sa.Column('last_viewed_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table('saved_search_results',
+    sa.Column('saved_search_id', sa.UUID(), nullable=False),
+    sa.Column('content_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('relevance_score', sa.Float(), nullable=True),
+    sa.Column('similarity_score', sa.Float(), nullable=True),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('matched_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.ForeignKeyConstraint(['saved_search_id'], ['saved_searches.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['content_id'], ['content.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('saved_search_id', 'content_id')
+    )
+    op.create_index('idx_saved_search_results_score', 'saved_search_results', ['saved_search_id', 'score'])
+    op.create_index('idx_saved_search_results_matched_at', 'saved_search_results', ['saved_search_id', 'matched_at'])
+
+    # Same tenant isolation as the other user-owned tables
+    op.execute("ALTER TABLE saved_search_results ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE saved_search_results FORCE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_policy ON saved_search_results
+        USING (
+            current_setting('app.bypass_rls', true) = 'on'
+            OR user_id = current_setting('app.current_user_id', true)::uuid
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_policy ON saved_search_results")
+    op.drop_index('idx_saved_search_results_matched_at', table_name='saved_search_results')
+    op.drop_index('idx_saved_search_results_score', table_name='saved_search_results')
+    op.drop_table('saved_search_results')
+    op.drop_column('saved_searches', 'last_viewed_at')
+    op.drop_column('saved_searches', 'last_refreshed_at')
+    op.drop_column('saved_searches', 'query_embedding')
+    op.drop_column('saved_searches', 'materialized')
@@ -0,0 +1,58 @@
+"""add_content_chunks
+
+Revision ID: 8d2c4a6f0b13
+Revises: 3b7e1f9a2c41
+Create Date: 2026-10-19 14:05:47.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2c4a6f0b13'
+down_revision: Union[str, Sequence[str], None] = '3b7e1f9a2c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('content_chunks',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('content_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('chunk_index', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('token_count', sa.Integer(), nullable=False),
+    sa.Column('embedding', Vector(384), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.ForeignKeyConstraint(['content_id'], ['content.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('content_id', 'chunk_index', name='uq_content_chunks_content_index')
+    )
+    op.create_index('idx_content_chunks_user_id', 'content_chunks', ['user_id'])
+    op.create_index('idx_content_chunks_embedding_hnsw', 'content_chunks', ['embedding'], postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'})
+
+    # Same tenant isolation as the other user-owned tables
+    op.execute("ALTER TABLE content_chunks ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE content_chunks FORCE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_policy ON content_chunks
+        USING (
+            current_setting('app.bypass_rls', true) = 'on'
+            OR user_id = current_setting('app.current_user_id', true)::uuid
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_policy ON content_chunks")
+    op.drop_index('idx_content_chunks_embedding_hnsw', table_name='content_chunks')
+    op.drop_index('idx_content_chunks_user_id', table_name='content_chunks')
+    op.drop_table('content_chunks')
@@ -0,0 +1,48 @@
+"""add_embedding_migrations
+
+Revision ID: a4d7c2e9b815
+Revises: f1b8d3c6a297
+Create Date: 2026-10-19 17:52:31.448610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7c2e9b815'
+down_revision: Union[str, Sequence[str], None] = 'f1b8d3c6a297'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Global bookkeeping (no user data), so no RLS policy
+    op.create_table('embedding_migrations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('target_model', sa.Text(), nullable=False),
+    sa.Column('dimension', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Text(), nullable=False, server_default='backfilling'),
+    sa.Column('last_content_id', sa.UUID(), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.Column('cutover_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint("status IN ('backfilling', 'complete', 'finalized', 'aborted')", name='ck_embedding_migrations_status'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Saved query vectors are re-embedded at cutover, possibly with another dimension
+    op.alter_column('saved_searches', 'query_embedding', type_=Vector(), existing_type=Vector(384), existing_nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('saved_searches', 'query_embedding', type_=Vector(384), existing_type=Vector(), existing_nullable=True)
+    op.drop_table('embedding_migrations')
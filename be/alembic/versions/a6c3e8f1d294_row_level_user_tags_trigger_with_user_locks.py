@@ -0,0 +1,160 @@
+"""row_level_user_tags_trigger_with_user_locks
+
+Revision ID: a6c3e8f1d294
+Revises: e9b4c1d7a352
+Create Date: 2026-10-19 23:58:31.604127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3e8f1d294'
+down_revision: Union[str, Sequence[str], None] = 'e9b4c1d7a352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Applies a list of (user_id, tag, delta) changes to user_tags in (user_id, tag) order
+APPLY_CHANGES = """
+            FOR entry IN
+                SELECT user_id, tag, sum(delta)::integer AS delta
+                FROM ({changes}) changes
+                WHERE tag IS NOT NULL AND tag <> ''
+                GROUP BY user_id, tag
+                HAVING sum(delta) <> 0
+                ORDER BY user_id, tag
+            LOOP
+                IF entry.delta > 0 THEN
+                    INSERT INTO user_tags (user_id, tag, item_count)
+                    VALUES (entry.user_id, entry.tag, entry.delta)
+                    ON CONFLICT (user_id, tag) DO UPDATE SET item_count = user_tags.item_count + EXCLUDED.item_count;
+                ELSE
+                    UPDATE user_tags SET item_count = item_count + entry.delta
+                    WHERE user_id = entry.user_id AND tag = entry.tag
+                    RETURNING item_count INTO remaining;
+                    IF remaining <= 0 THEN
+                        DELETE FROM user_tags WHERE user_id = entry.user_id AND tag = entry.tag;
+                    END IF;
+                END IF;
+            END LOOP;
+"""
+
+ROW_CHANGES = """
+                    SELECT DISTINCT old_user AS user_id, t AS tag, -1 AS delta FROM unnest(old_tags) AS t
+                    UNION ALL
+                    SELECT DISTINCT new_user, t, 1 FROM unnest(new_tags) AS t
+                """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The statement-level triggers fired for every UPDATE of content, since
+    # transition tables rule out an UPDATE column list. Back to the row-level
+    # trigger on tag and owner changes only. Concurrent statements could
+    # deadlock on shared user_tags entries when their rows were processed in
+    # different orders; each row now first takes a transaction-level advisory
+    # lock per affected user, so writers to the same user's tags queue
+    # instead. Writers touching several users in one transaction take those
+    # locks up front in user order (TagService.lock_users) so they can't
+    # deadlock on each other either. Keys must match TagService.lock_users.
+    op.execute("DROP TRIGGER IF EXISTS content_user_tags_sync_insert ON content")
+    op.execute("DROP TRIGGER IF EXISTS content_user_tags_sync_update ON content")
+    op.execute("DROP TRIGGER IF EXISTS content_user_tags_sync_delete ON content")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION content_user_tags_sync()
+        RETURNS trigger AS $$
+        DECLARE
+            old_user uuid;
+            new_user uuid;
+            old_tags text[] := '{}';
+            new_tags text[] := '{}';
+            entry record;
+            remaining integer;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                old_user := OLD.user_id;
+                old_tags := COALESCE(OLD.tags, '{}') || COALESCE(OLD.suggested_tags, '{}');
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                new_user := NEW.user_id;
+                new_tags := COALESCE(NEW.tags, '{}') || COALESCE(NEW.suggested_tags, '{}');
+            END IF;
+            PERFORM pg_advisory_xact_lock(hashtext('user_tags'), hashtext(u::text))
+            FROM (
+                SELECT DISTINCT u FROM unnest(ARRAY[old_user, new_user]) AS u WHERE u IS NOT NULL ORDER BY u
+            ) users;
+""" + APPLY_CHANGES.format(changes=ROW_CHANGES) + """
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER content_user_tags_sync
+        AFTER INSERT OR DELETE OR UPDATE OF tags, suggested_tags, user_id ON content
+        FOR EACH ROW
+        EXECUTE FUNCTION content_user_tags_sync()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS content_user_tags_sync ON content")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION content_user_tags_sync()
+        RETURNS trigger AS $$
+        DECLARE
+            old_users uuid[] := '{}';
+            old_tags text[] := '{}';
+            new_users uuid[] := '{}';
+            new_tags text[] := '{}';
+            entry record;
+            remaining integer;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                SELECT COALESCE(array_agg(user_id), '{}'), COALESCE(array_agg(tag), '{}')
+                INTO old_users, old_tags
+                FROM (
+                    SELECT DISTINCT o.id, o.user_id, t AS tag
+                    FROM old_rows o, unnest(COALESCE(o.tags, '{}') || COALESCE(o.suggested_tags, '{}')) AS t
+                ) removed;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                SELECT COALESCE(array_agg(user_id), '{}'), COALESCE(array_agg(tag), '{}')
+                INTO new_users, new_tags
+                FROM (
+                    SELECT DISTINCT n.id, n.user_id, t AS tag
+                    FROM new_rows n, unnest(COALESCE(n.tags, '{}') || COALESCE(n.suggested_tags, '{}')) AS t
+                ) added;
+            END IF;
+""" + APPLY_CHANGES.format(changes="""
+                    SELECT u AS user_id, t AS tag, -1 AS delta FROM unnest(old_users, old_tags) AS removed(u, t)
+                    UNION ALL
+                    SELECT u, t, 1 FROM unnest(new_users, new_tags) AS added(u, t)
+                """) + """
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER content_user_tags_sync_insert
+        AFTER INSERT ON content
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION content_user_tags_sync()
+    """)
+    op.execute("""
+        CREATE TRIGGER content_user_tags_sync_update
+        AFTER UPDATE ON content
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION content_user_tags_sync()
+    """)
+    op.execute("""
+        CREATE TRIGGER content_user_tags_sync_delete
+        AFTER DELETE ON content
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION content_user_tags_sync()
+    """)
@@ -0,0 +1,39 @@
+"""add_llm_cache
+
+Revision ID: a9f3d5b2e768
+Revises: e2c6a8f4d1b7
+Create Date: 2026-10-19 20:41:05.772319
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9f3d5b2e768'
+down_revision: Union[str, Sequence[str], None] = 'e2c6a8f4d1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keyed by content hash and read only by workers with RLS bypassed, so no policy
+    op.create_table('llm_cache',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.Text(), nullable=False),
+    sa.Column('prompt_version', sa.Text(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('tags', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('idx_llm_cache_created_at', 'llm_cache', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_llm_cache_created_at', table_name='llm_cache')
+    op.drop_table('llm_cache')
@@ -0,0 +1,50 @@
+"""add_jobs_table
+
+Revision ID: b7e3f1a9d624
+Revises: a4d7c2e9b815
+Create Date: 2026-10-19 18:34:12.907215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f1a9d624'
+down_revision: Union[str, Sequence[str], None] = 'a4d7c2e9b815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Read and written only by the API and workers with RLS bypassed, so no policy
+    op.create_table('jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('kind', sa.Text(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='{}'),
+    sa.Column('status', sa.Text(), nullable=False, server_default='queued'),
+    sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.Column('locked_by', sa.Text(), nullable=True),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint("status IN ('queued', 'running', 'succeeded', 'failed')", name='ck_jobs_status'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_jobs_queued_run_at', 'jobs', ['run_at'], postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('idx_jobs_running_locked_until', 'jobs', ['locked_until'], postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_jobs_running_locked_until', table_name='jobs')
+    op.drop_index('idx_jobs_queued_run_at', table_name='jobs')
+    op.drop_table('jobs')
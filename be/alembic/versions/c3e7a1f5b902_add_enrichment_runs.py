@@ -0,0 +1,42 @@
+"""add_enrichment_runs
+
+Revision ID: c3e7a1f5b902
+Revises: a9f3d5b2e768
+Create Date: 2026-10-19 22:14:37.508116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a1f5b902'
+down_revision: Union[str, Sequence[str], None] = 'a9f3d5b2e768'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Operational timings without user data, written by workers with RLS bypassed, so no policy
+    op.create_table('enrichment_runs',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('mode', sa.Text(), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.Column('wall_seconds', sa.Float(), nullable=False),
+    sa.Column('cpu_seconds', sa.Float(), nullable=False),
+    sa.Column('stages', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='{}'),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.CheckConstraint("mode IN ('pipeline', 'single')", name='ck_enrichment_runs_mode'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_enrichment_runs_created_at', 'enrichment_runs', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_enrichment_runs_created_at', table_name='enrichment_runs')
+    op.drop_table('enrichment_runs')
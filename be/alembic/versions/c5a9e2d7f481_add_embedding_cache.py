@@ -0,0 +1,38 @@
+"""add_embedding_cache
+
+Revision ID: c5a9e2d7f481
+Revises: 8d2c4a6f0b13
+Create Date: 2026-10-19 15:22:09.604871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a9e2d7f481'
+down_revision: Union[str, Sequence[str], None] = '8d2c4a6f0b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Shared across users (hashes and vectors only), so no RLS policy
+    op.create_table('embedding_cache',
+    sa.Column('text_hash', sa.String(length=64), nullable=False),
+    sa.Column('model', sa.Text(), nullable=False),
+    sa.Column('embedding', Vector(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    sa.PrimaryKeyConstraint('text_hash', 'model')
+    )
+    op.create_index('idx_embedding_cache_created_at', 'embedding_cache', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_embedding_cache_created_at', table_name='embedding_cache')
+    op.drop_table('embedding_cache')
@@ -0,0 +1,64 @@
+"""skip_content_trigger_for_embedding_writes
+
+Revision ID: d7a2c5e8f316
+Revises: c3e7a1f5b902
+Create Date: 2026-10-19 23:05:12.731904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2c5e8f316'
+down_revision: Union[str, Sequence[str], None] = 'c3e7a1f5b902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns an UPDATE may change without counting as an edit of the row. Embedding
+# model migrations version their shadow vectors by updated_at, so writing a
+# vector must not move it.
+VECTOR_COLUMNS = "ARRAY['embedding', 'embedding_next', 'embedding_next_at', 'embedding_prev', 'updated_at', 'search_vector']"
+
+SEARCH_VECTOR = """
+            NEW.search_vector :=
+                setweight(to_tsvector('english', COALESCE(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('english', COALESCE(NEW.summary, '')), 'B') ||
+                setweight(to_tsvector('english', COALESCE(array_to_string(NEW.tags, ' '), '')), 'B') ||
+                setweight(to_tsvector('english', COALESCE(NEW.body, '')), 'C');
+            NEW.updated_at := NOW();
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Same trigger, except that updates of vector columns alone keep updated_at
+    # and skip recomputing the search vector
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION content_search_vector_trigger()
+        RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND to_jsonb(NEW) - {VECTOR_COLUMNS}::text[] = to_jsonb(OLD) - {VECTOR_COLUMNS}::text[] THEN
+                NEW.updated_at := OLD.updated_at;
+                RETURN NEW;
+            END IF;
+{SEARCH_VECTOR}
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION content_search_vector_trigger()
+        RETURNS trigger AS $$
+        BEGIN
+{SEARCH_VECTOR}
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
@@ -0,0 +1,117 @@
+"""add_user_tags
+
+Revision ID: e2c6a8f4d1b7
+Revises: b7e3f1a9d624
+Create Date: 2026-10-19 20:02:47.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c6a8f4d1b7'
+down_revision: Union[str, Sequence[str], None] = 'b7e3f1a9d624'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_tags',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('tag', sa.Text(), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'tag')
+    )
+    op.execute("ALTER TABLE user_tags ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE user_tags FORCE ROW LEVEL SECURITY")
+    op.execute("""
+        CREATE POLICY tenant_isolation_policy ON user_tags
+        USING (
+            current_setting('app.bypass_rls', true) = 'on'
+            OR user_id = current_setting('app.current_user_id', true)::uuid
+        )
+    """)
+
+    # Apply the per-row change in the set of distinct tags (tags plus
+    # suggested_tags) to the owner's counts. Entries are visited in
+    # (user_id, tag) order so concurrent writers lock them in the same order
+    op.execute("""
+        CREATE OR REPLACE FUNCTION content_user_tags_sync()
+        RETURNS trigger AS $$
+        DECLARE
+            old_user uuid;
+            new_user uuid;
+            old_tags text[] := '{}';
+            new_tags text[] := '{}';
+            entry record;
+            remaining integer;
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                old_user := OLD.user_id;
+                old_tags := COALESCE(OLD.tags, '{}') || COALESCE(OLD.suggested_tags, '{}');
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                new_user := NEW.user_id;
+                new_tags := COALESCE(NEW.tags, '{}') || COALESCE(NEW.suggested_tags, '{}');
+            END IF;
+
+            FOR entry IN
+                SELECT user_id, tag, sum(delta)::integer AS delta
+                FROM (
+                    SELECT DISTINCT old_user AS user_id, t AS tag, -1 AS delta FROM unnest(old_tags) AS t
+                    UNION ALL
+                    SELECT DISTINCT new_user, t, 1 FROM unnest(new_tags) AS t
+                ) changes
+                WHERE tag IS NOT NULL AND tag <> ''
+                GROUP BY user_id, tag
+                HAVING sum(delta) <> 0
+                ORDER BY user_id, tag
+            LOOP
+                IF entry.delta > 0 THEN
+                    INSERT INTO user_tags (user_id, tag, item_count)
+                    VALUES (entry.user_id, entry.tag, entry.delta)
+                    ON CONFLICT (user_id, tag) DO UPDATE SET item_count = user_tags.item_count + EXCLUDED.item_count;
+                ELSE
+                    UPDATE user_tags SET item_count = item_count + entry.delta
+                    WHERE user_id = entry.user_id AND tag = entry.tag
+                    RETURNING item_count INTO remaining;
+                    IF remaining <= 0 THEN
+                        DELETE FROM user_tags WHERE user_id = entry.user_id AND tag = entry.tag;
+                    END IF;
+                END IF;
+            END LOOP;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER content_user_tags_sync
+        AFTER INSERT OR DELETE OR UPDATE OF tags, suggested_tags, user_id ON content
+        FOR EACH ROW
+        EXECUTE FUNCTION content_user_tags_sync()
+    """)
+
+    op.execute("SELECT set_config('app.bypass_rls', 'on', true)")
+    op.execute("""
+        INSERT INTO user_tags (user_id, tag, item_count)
+        SELECT user_id, tag, count(*)
+        FROM (
+            SELECT DISTINCT c.id, c.user_id, t AS tag
+            FROM content c, unnest(COALESCE(c.tags, '{}') || COALESCE(c.suggested_tags, '{}')) AS t
+        ) tagged
+        WHERE tag IS NOT NULL AND tag <> ''
+        GROUP BY user_id, tag
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS content_user_tags_sync ON content")
+    op.execute("DROP FUNCTION IF EXISTS content_user_tags_sync()")
+    op.execute("DROP POLICY IF EXISTS tenant_isolation_policy ON user_tags")
+    op.drop_table('user_tags')
@@ -0,0 +1,32 @@
+"""quantized_embedding_indexes
+
+Revision ID: f1b8d3c6a297
+Revises: c5a9e2d7f481
+Create Date: 2026-10-19 16:40:55.213794
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b8d3c6a297'
+down_revision: Union[str, Sequence[str], None] = 'c5a9e2d7f481'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The halfvec and binary HNSW expression indexes for EMBEDDING_QUANTIZATION
+    # are built on demand by `python -m app.services.vector_index build`, which
+    # creates only the configured mode's index and checks the pgvector version
+    # (>= 0.7). Building both here cost two extra HNSW graphs for every install.
+    pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS idx_content_embedding_binary_hnsw")
+    op.execute("DROP INDEX IF EXISTS idx_content_embedding_halfvec_hnsw")
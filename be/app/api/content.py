@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.db.session import get_db
@@ -42,7 +42,7 @@ router = APIRouter(prefix="/content", tags=["Content"])
 
 
 @router.post("", response_model=ContentResponse, status_code=status.HTTP_202_ACCEPTED)
-async def create_from_url(request: ContentCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_from_url(request: ContentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """
     Create content from URL (Async).
     
@@ -50,13 +50,13 @@ async def create_from_url(request: ContentCreate, background_tasks: BackgroundTa
     - Normalizes URL
     - Checks for duplicate
     - Saves a "stub" to database
-    - Triggers background scraping & enrichment
+    - Queues scraping & enrichment for the job worker (python -m app.worker)
     
     Returns 202 Accepted with enrichment_status: "pending"
     Errors: 409 if duplicate, 422 if invalid URL
     """
     try:
-        return await ContentService.create_from_url(db, str(request.url), str(current_user.id), background_tasks)
+        return await ContentService.create_from_url(db, str(request.url), str(current_user.id))
     except DuplicateURLError as e:
         raise HTTPException(
             status_code=409,
@@ -76,7 +76,7 @@ async def create_from_url(request: ContentCreate, background_tasks: BackgroundTa
 
 
 @router.post("/manual", response_model=ContentResponse, status_code=status.HTTP_201_CREATED)
-def create_manual(request: ContentManualCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def create_manual(request: ContentManualCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """
     Create content manually (skip scraping).
     
@@ -95,7 +95,6 @@ def create_manual(request: ContentManualCreate, background_tasks: BackgroundTask
             source_url=str(request.source_url) if request.source_url else None,
             tags=request.tags,
             notes=request.notes,
-            background_tasks=background_tasks,
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -258,16 +257,16 @@ def bulk_export(request: BulkExportRequest, db: Session = Depends(get_db), curre
 
 
 @router.post("/{content_id}/enrich", response_model=EnrichQueuedResponse, status_code=status.HTTP_202_ACCEPTED)
-def enrich_content(content_id: UUID, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def enrich_content(content_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """
     Re-trigger background enrichment task.
     
-    Re-triggers the background enrichment task (summary + tags + embedding) 
+    Queues the enrichment job (summary + tags + embedding) 
     regardless of current status. Sets enrichment_status = "processing".
     Returns 202 { "message": "Enrichment queued", "content_id": "..." }
     """
     try:
-        ContentService.trigger_enrichment(db, content_id, str(current_user.id), background_tasks)
+        ContentService.trigger_enrichment(db, content_id, str(current_user.id))
         return EnrichQueuedResponse(
             message="Enrichment queued",
             content_id=content_id,
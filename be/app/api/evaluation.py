@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from pydantic import BaseModel
 from app.db.session import get_db
+from app.models.user import User
+from app.api.auth import get_current_user
 from app.services.content_search_service import ContentSearchService
 from app.evaluation.metrics import SearchEvaluator, precision_at_k, recall_at_k
 
@@ -12,7 +14,7 @@ router = APIRouter()
 class EvaluationQuery(BaseModel):
     """Pydantic model for evaluation query."""
     query: str
-    relevant_ids: List[int]
+    relevant_ids: List[str]  # content UUIDs
 
 
 class EvaluationRequest(BaseModel):
@@ -24,8 +26,10 @@ class EvaluationRequest(BaseModel):
 def evaluate_search(
     request: EvaluationRequest,
     model: str = Query("bm25", enum=["bm25", "tfidf"]),
+    mode: str = Query("keyword", enum=["keyword", "semantic", "hybrid"]),
     k: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     """
     Evaluate search results for a list of queries.
@@ -35,31 +39,29 @@ def evaluate_search(
         "queries": [
             {
                 "query": "search term",
-                "relevant_ids": [1, 2, 3]
+                "relevant_ids": ["<content-uuid>", ...]
             }
         ]
     }
     
+    All queries are run with a single batched search (see `search_many`).
     Returns precision@K, recall@K, and mean average precision.
     """
     try:
         evaluator = SearchEvaluator()
         
         # Get search service
-        service = ContentSearchService(db)
+        service = ContentSearchService(db, user_id=str(current_user.id))
         
-        for item in request.queries:
-            query = item.query
-            relevant_ids = set(item.relevant_ids)
-            
-            # Get search results
-            result = service.search(query, mode='keyword', limit=k)
-            
+        queries = [item.query for item in request.queries]
+        results = service.search_many(queries, mode=mode, limit=k)
+        
+        for item, result in zip(request.queries, results):
             # Extract retrieved document IDs
-            retrieved_ids = [item['id'] for item in result['items']]
+            retrieved_ids = [str(r['id']) for r in result['items']]
             
             # Add to evaluator
-            evaluator.add_result(query, retrieved_ids, relevant_ids)
+            evaluator.add_result(item.query, retrieved_ids, set(item.relevant_ids))
         
         # Get evaluation metrics
         evaluation = evaluator.evaluate(k=k)
@@ -79,7 +81,8 @@ def evaluate_precision(
     relevant_ids: str = Query(..., description="Comma-separated relevant document IDs"),
     model: str = Query("bm25", enum=["bm25", "tfidf"]),
     k: int = Query(5, ge=1, le=20),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     """
     Evaluate Precision@K for a single query.
@@ -91,20 +94,17 @@ def evaluate_precision(
     """
     try:
         # Parse relevant IDs
-        try:
-            relevant = set(int(id.strip()) for id in relevant_ids.split(",") if id.strip())
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid relevant_ids format. Must be comma-separated integers.")
+        relevant = set(id.strip() for id in relevant_ids.split(",") if id.strip())
         
         if not relevant:
             raise HTTPException(status_code=400, detail="At least one relevant_id is required.")
         
         # Get search results
-        service = ContentSearchService(db)
-        result = service.search(query, mode='keyword', limit=k)
+        service = ContentSearchService(db, user_id=str(current_user.id))
+        result = service.search(query=query, mode='keyword', limit=k)
         
         # Extract retrieved document IDs
-        retrieved_ids = [item['id'] for item in result['items']]
+        retrieved_ids = [str(item['id']) for item in result['items']]
         
         # Calculate metrics
         precision = precision_at_k(retrieved_ids, relevant, k)
@@ -193,7 +193,7 @@ def get_similar_items(
     if not content:
         raise HTTPException(status_code=404, detail=f"Content {content_id} not found")
     
-    if not content.embedding:
+    if content.embedding is None:
         raise HTTPException(
             status_code=400,
             detail="Content does not have an embedding yet. Please wait for enrichment to complete."
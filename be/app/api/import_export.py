@@ -6,6 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File,
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.api.auth import get_current_user
+from app.models.user import User
 from app.schemas.import_export import ImportResponse, ImportStatusResponse
 from app.services.import_export_service import import_export_service
 from uuid import UUID
@@ -72,7 +74,8 @@ def export_markdown(
 async def import_pocket(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Pocket export JSON file"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     """
     Import Pocket export.
@@ -91,7 +94,7 @@ async def import_pocket(
         raise HTTPException(status_code=400, detail="Invalid Pocket JSON format")
     
     # Queue import
-    job_id = import_export_service.import_pocket(db, content, background_tasks)
+    job_id = import_export_service.import_pocket(db, content, background_tasks, str(current_user.id))
     
     # Get initial job status
     job = import_export_service.get_import_status(job_id)
@@ -106,7 +109,8 @@ async def import_pocket(
 async def import_raindrop(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Raindrop.io CSV export"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     """
     Import Raindrop.io CSV export.
@@ -117,7 +121,7 @@ async def import_raindrop(
     content = await file.read()
     
     # Queue import
-    job_id = import_export_service.import_raindrop(db, content, background_tasks)
+    job_id = import_export_service.import_raindrop(db, content, background_tasks, str(current_user.id))
     
     # Get initial job status
     job = import_export_service.get_import_status(job_id)
@@ -132,7 +136,8 @@ async def import_raindrop(
 async def import_bookmarks(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="Browser HTML bookmark export"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     """
     Import browser HTML bookmark export (Netscape format).
@@ -143,7 +148,7 @@ async def import_bookmarks(
     content = await file.read()
     
     # Queue import
-    job_id = import_export_service.import_bookmarks(db, content, background_tasks)
+    job_id = import_export_service.import_bookmarks(db, content, background_tasks, str(current_user.id))
     
     # Get initial job status
     job = import_export_service.get_import_status(job_id)
@@ -0,0 +1,24 @@
+"""
+Metrics API endpoint.
+
+Exposes the in-process metrics registry in the Prometheus text format.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import metrics
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Current process metrics (counters such as embedding cache hits and misses,
+    histograms such as enrichment stage timings).
+    
+    Returns text in the Prometheus exposition format.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
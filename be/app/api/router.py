@@ -11,6 +11,7 @@ from app.api import stats
 from app.api import preferences
 from app.api import import_export
 from app.api import auth
+from app.api import metrics
 
 
 api_router = APIRouter()
@@ -26,3 +27,4 @@ api_router.include_router(stats.router)
 api_router.include_router(preferences.router)
 api_router.include_router(import_export.router)
 api_router.include_router(auth.router)
+api_router.include_router(metrics.router)
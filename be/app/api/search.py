@@ -1,26 +1,34 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, SessionLocal
 from app.schemas.search import (
     SearchResponse,
     SearchResultItem,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    PassageSearchResponse,
     SuggestionResponse,
     SearchHistoryResponse,
     SearchHistoryItem,
     SavedSearchCreate,
     SavedSearchResponse,
     SavedSearchesResponse,
+    SavedSearchResultsResponse,
 )
 from app.services.content_search_service import (
     ContentSearchService,
     SearchHistoryService,
     SavedSearchService,
 )
+from app.services.search_history_writer import search_history_writer
 from app.models.user import User
 from app.api.auth import get_current_user
 from typing import Optional, List
 from datetime import date, datetime
 from uuid import UUID
+import orjson
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
@@ -83,11 +91,9 @@ def search(
         collection_id=collection_id,
     )
     
-    # Log to search history (only for non-empty results)
+    # Log to search history (only for non-empty results); written in batches off the request path
     if result['items']:
-        SearchHistoryService.add_history(
-            db, str(current_user.id), query, mode, result['total']
-        )
+        search_history_writer.add(str(current_user.id), query, mode, result['total'])
     
     # Build filters applied dict
     filters_applied = {}
@@ -106,47 +112,176 @@ def search(
     if collection_id:
         filters_applied['collection_id'] = str(collection_id)
     
-    # Convert items to response format
-    items = []
-    for item in result['items']:
-        items.append(SearchResultItem(
-            id=UUID(item['id']),
-            source_url=item['source_url'],
-            domain=item['domain'],
-            og_image_url=item.get('og_image_url'),
-            favicon_url=item.get('favicon_url'),
-            title=item['title'],
-            author=item.get('author'),
-            summary=item.get('summary'),
-            suggested_tags=item.get('suggested_tags', []),
-            tags=item.get('tags', []),
-            notes=item.get('notes'),
-            word_count=item.get('word_count'),
-            reading_time_minutes=item.get('reading_time_minutes', 0),
-            difficulty=item.get('difficulty'),
-            readability_score=item.get('readability_score'),
-            is_truncated=item.get('is_truncated', False),
-            is_read=item.get('is_read', False),
-            reading_progress=item.get('reading_progress', 0.0),
-            enrichment_status=item.get('enrichment_status', 'pending'),
-            published_at=datetime.fromisoformat(item['published_at']) if item.get('published_at') else None,
-            last_opened_at=datetime.fromisoformat(item['last_opened_at']) if item.get('last_opened_at') else None,
-            created_at=datetime.fromisoformat(item['created_at']) if item.get('created_at') else datetime.utcnow(),
-            updated_at=datetime.fromisoformat(item['updated_at']) if item.get('updated_at') else datetime.utcnow(),
-            relevance_score=item.get('relevance_score'),
-            similarity_score=item.get('similarity_score'),
-            combined_score=item.get('combined_score'),
-            matched_excerpt=item.get('matched_excerpt'),
-        ))
+    return {
+        'items': result['items'],
+        'total': result['total'],
+        'query': query,
+        'mode': mode,
+        'latency_ms': int(result['latency_ms']),
+        'filters_applied': filters_applied,
+    }
+
+
+_RESULT_FIELDS = tuple(SearchResultItem.model_fields)
+
+
+@router.post("/batch", response_model=BatchSearchResponse)
+def batch_search(
+    request: BatchSearchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Run many search queries in one request.
+    
+    Body: BatchSearchRequest with up to 500 queries plus the same mode, filters and
+    pagination as `GET /search`, applied to every query.
     
-    return SearchResponse(
-        items=items,
-        total=result['total'],
+    Queries are embedded in a single batch and each search leg runs as one SQL
+    statement for all queries. Batch searches are not recorded in search history.
+    Returns one SearchResponse per query, in request order.
+    """
+    filters = {
+        'tags': request.tags or None,
+        'domain': request.domain,
+        'date_from': datetime.combine(request.date_from, datetime.min.time()) if request.date_from else None,
+        'date_to': datetime.combine(request.date_to, datetime.max.time()) if request.date_to else None,
+        'difficulty': request.difficulty,
+        'is_read': request.is_read,
+        'collection_id': request.collection_id,
+    }
+    filters_applied = {}
+    if request.tags:
+        filters_applied['tags'] = request.tags
+    if request.domain:
+        filters_applied['domain'] = request.domain
+    if request.date_from:
+        filters_applied['date_from'] = str(request.date_from)
+    if request.date_to:
+        filters_applied['date_to'] = str(request.date_to)
+    if request.difficulty:
+        filters_applied['difficulty'] = request.difficulty
+    if request.is_read is not None:
+        filters_applied['is_read'] = request.is_read
+    if request.collection_id:
+        filters_applied['collection_id'] = str(request.collection_id)
+    
+    search_service = ContentSearchService(db, user_id=str(current_user.id))
+    results = search_service.search_many(
+        request.queries,
+        mode=request.mode.value,
+        limit=request.limit,
+        offset=request.offset,
+        **filters,
+    )
+    
+    responses = [
+        {
+            'items': result['items'],
+            'total': result['total'],
+            'query': query,
+            'mode': request.mode.value,
+            'latency_ms': int(result['latency_ms']),
+            'filters_applied': filters_applied,
+        }
+        for query, result in zip(request.queries, results)
+    ]
+    latency_ms = int(results[0]['latency_ms']) if results else 0
+    return {'results': responses, 'latency_ms': latency_ms}
+
+
+@router.get("/stream")
+def stream_search(
+    query: str = Query(..., min_length=1, description="Search query string"),
+    mode: str = Query("hybrid", enum=["keyword", "semantic", "hybrid"], description="Search mode"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags to filter"),
+    domain: Optional[str] = Query(None, description="Filter by domain"),
+    date_from: Optional[date] = Query(None, description="Filter by date from (ISO)"),
+    date_to: Optional[date] = Query(None, description="Filter by date to (ISO)"),
+    difficulty: Optional[str] = Query(None, description="Filter by difficulty"),
+    collection_id: Optional[UUID] = Query(None, description="Filter by collection ID"),
+    is_read: Optional[bool] = Query(None, description="Filter by reading status"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximum number of results (default: all matches, up to SEARCH_STREAM_MAX_RESULTS in semantic and hybrid mode)"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream search results as newline-delimited JSON (application/x-ndjson).
+    
+    Takes the same query and filters as `GET /search`, without pagination: every
+    match (or the first `limit`) is written as one JSON object per line, in rank
+    order. Rows are read from the database with a server-side cursor, so large
+    exports start arriving as soon as the database has ranked them and server
+    memory stays flat. Semantic matches below SEARCH_STREAM_MIN_SIMILARITY are
+    left out.
+    Streamed searches are not recorded in search history.
+    """
+    user_id = str(current_user.id)
+    filters = {
+        'tags': [t.strip() for t in tags.split(",") if t.strip()] if tags else None,
+        'domain': domain,
+        'date_from': datetime.combine(date_from, datetime.min.time()) if date_from else None,
+        'date_to': datetime.combine(date_to, datetime.max.time()) if date_to else None,
+        'difficulty': difficulty,
+        'is_read': is_read,
+        'collection_id': collection_id,
+    }
+    
+    def generate():
+        # The request-scoped session is closed before the body is sent, so the
+        # stream owns its session (and RLS user setting) for its whole lifetime.
+        db = SessionLocal()
+        try:
+            db.execute(text("SET SESSION app.current_user_id = :user_id"), {'user_id': user_id})
+            search_service = ContentSearchService(db, user_id=user_id)
+            for item in search_service.stream_search(query, mode=mode, max_results=limit, **filters):
+                yield orjson.dumps({field: item.get(field) for field in _RESULT_FIELDS}) + b"\n"
+        finally:
+            db.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/passages", response_model=PassageSearchResponse)
+def search_passages(
+    query: str = Query(..., min_length=1, description="Search query string"),
+    tags: Optional[str] = Query(None, description="Comma-separated tags to filter"),
+    domain: Optional[str] = Query(None, description="Filter by domain"),
+    date_from: Optional[date] = Query(None, description="Filter by date from (ISO)"),
+    date_to: Optional[date] = Query(None, description="Filter by date to (ISO)"),
+    difficulty: Optional[str] = Query(None, description="Filter by difficulty"),
+    collection_id: Optional[UUID] = Query(None, description="Filter by collection ID"),
+    is_read: Optional[bool] = Query(None, description="Filter by reading status"),
+    limit: int = Query(20, ge=1, le=100, description="Number of passages"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Passage-level semantic search.
+    
+    Matches the query against the per-chunk embeddings stored at enrichment time
+    and returns the best passages with their source document. Takes the same
+    filters as `GET /search`.
+    """
+    search_service = ContentSearchService(db, user_id=str(current_user.id))
+    result = search_service.passage_search(
         query=query,
-        mode=mode,
-        latency_ms=int(result['latency_ms']),
-        filters_applied=filters_applied,
+        limit=limit,
+        offset=offset,
+        tags=[t.strip() for t in tags.split(",") if t.strip()] if tags else None,
+        domain=domain,
+        date_from=datetime.combine(date_from, datetime.min.time()) if date_from else None,
+        date_to=datetime.combine(date_to, datetime.max.time()) if date_to else None,
+        difficulty=difficulty,
+        is_read=is_read,
+        collection_id=collection_id,
     )
+    return {
+        'items': result['items'],
+        'total': result['total'],
+        'query': query,
+        'latency_ms': int(result['latency_ms']),
+    }
 
 
 @router.get("/suggestions", response_model=SuggestionResponse)
@@ -196,6 +331,7 @@ def clear_search_history(db: Session = Depends(get_db), current_user: User = Dep
     
     Returns 204 No Content on success.
     """
+    search_history_writer.discard(str(current_user.id))
     SearchHistoryService.clear_history(db, str(current_user.id))
 
 
@@ -207,17 +343,7 @@ def get_saved_searches(db: Session = Depends(get_db), current_user: User = Depen
     Returns list of saved searches with their filters.
     """
     saved = SavedSearchService.get_all(db, str(current_user.id))
-    items = [
-        SavedSearchResponse(
-            id=s.id,
-            name=s.name,
-            query=s.query,
-            mode=s.mode,
-            filters=s.filters,
-            created_at=s.created_at,
-        )
-        for s in saved
-    ]
+    items = [SavedSearchResponse.model_validate(s) for s in saved]
     return SavedSearchesResponse(saved_searches=items)
 
 
@@ -230,7 +356,9 @@ def create_saved_search(
     """
     Create a new saved search.
     
-    Body: SavedSearchCreate with name, query, mode, and optional filters
+    Body: SavedSearchCreate with name, query, mode, optional filters and `materialize`.
+    Materialized searches keep their matches in a result table that is refreshed
+    incrementally as content is added or updated.
     Returns the created saved search.
     """
     saved = SavedSearchService.create(
@@ -240,15 +368,41 @@ def create_saved_search(
         query=request.query,
         mode=request.mode,
         filters=request.filters,
+        materialize=request.materialize,
     )
-    return SavedSearchResponse(
-        id=saved.id,
-        name=saved.name,
-        query=saved.query,
-        mode=saved.mode,
-        filters=saved.filters,
-        created_at=saved.created_at,
+    return SavedSearchResponse.model_validate(saved)
+
+
+@router.get("/saved/{search_id}/results", response_model=SavedSearchResultsResponse)
+def get_saved_search_results(
+    search_id: UUID,
+    only_new: bool = Query(False, description="Only return matches since the last view"),
+    limit: int = Query(20, ge=1, le=100, description="Number of results"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the results of a saved search and mark it as viewed.
+    
+    Materialized searches are served from the result table; each item carries
+    `is_new` if it matched after the previous view. Non-materialized searches
+    are executed live.
+    
+    Returns 404 if the saved search does not exist.
+    """
+    result = SavedSearchService.get_results(
+        db, str(current_user.id), search_id, limit=limit, offset=offset, only_new=only_new
     )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    
+    return {
+        'items': result['items'],
+        'total': result['total'],
+        'new_count': result['new_count'],
+        'last_viewed_at': result['last_viewed_at'],
+    }
 
 
 @router.delete("/saved/{search_id}", status_code=204)
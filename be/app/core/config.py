@@ -20,15 +20,140 @@ class Settings(BaseSettings):
     # Weight for BM25 in hybrid search (semantic weight = 1 - bm25_weight)
     HYBRID_SEARCH_BM25_WEIGHT: float = 0.4
     HYBRID_SEARCH_SEMANTIC_WEIGHT: float = 0.6
+
+    # Streamed search (GET /search/stream): semantic matches need at least this
+    # cosine similarity, and the semantic and hybrid legs rank at most this many items
+    SEARCH_STREAM_MIN_SIMILARITY: float = 0.2
+    SEARCH_STREAM_MAX_RESULTS: int = 5000
+
+    # Search History Configuration
+    # History entries are buffered in memory and written in batches
+    SEARCH_HISTORY_FLUSH_SIZE: int = 100
+    SEARCH_HISTORY_FLUSH_INTERVAL_MS: int = 1000
+    SEARCH_HISTORY_BUFFER_MAX: int = 10000
+
+    # Saved Search Materialization
+    # Minimum cosine similarity for a semantic match to be materialized
+    SAVED_SEARCH_MIN_SIMILARITY: float = 0.35
+    # Enrichment refreshes a user's materialized searches as items become ready;
+    # opening a search refreshes it only if that was longer ago than this, to
+    # pick up edits made outside enrichment
+    SAVED_SEARCH_REFRESH_INTERVAL_SECONDS: int = 300
     
     # Embedding Model Configuration
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
     EMBEDDING_DIMENSION: int = 384
-    
+    # At most this many model.encode calls run at once per process; each uses
+    # EMBEDDING_NUM_THREADS intra-op threads (default: CPU cores / max concurrency)
+    EMBEDDING_MAX_CONCURRENCY: int = 2
+    EMBEDDING_NUM_THREADS: Optional[int] = None
+    # Run tokenization and inference in this many dedicated worker processes (each
+    # loading the model once) instead of in the API process; 0 keeps it in-process
+    EMBEDDING_WORKERS: int = 0
+    # Load the model weights when app.main is imported (before gunicorn forks workers
+    # with preload_app, so they share the weights), and run a warm-up batch in every
+    # worker at startup; /health reports not-ready until the warm-up has finished
+    EMBEDDING_PRELOAD: bool = False
+    EMBEDDING_WARMUP: bool = False
+    # Inference backend: "torch", "onnx" or "onnx-int8" (dynamically quantized).
+    # The ONNX backends need sentence-transformers[onnx]; EMBEDDING_ONNX_FILE overrides
+    # which ONNX file in the model repo is loaded
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_ONNX_FILE: Optional[str] = None
+    # Bodies are split into sentence-aligned chunks of at most this many word
+    # pieces (capped by the model's max sequence length), each stored with its own vector
+    EMBEDDING_CHUNK_TOKENS: int = 256
+    EMBEDDING_CHUNK_OVERLAP_SENTENCES: int = 1
+    # Semantic search candidate pass: "none" (exact float32 HNSW), "halfvec" or "binary".
+    # Quantized modes scan a smaller expression index, fetch limit * SEMANTIC_RERANK_FACTOR
+    # candidates and re-rank them with the full-precision vectors. Build the mode's index
+    # with `python -m app.services.vector_index build` (pgvector >= 0.7)
+    EMBEDDING_QUANTIZATION: str = "none"
+    SEMANTIC_RERANK_FACTOR: int = 4
+    # Reuse embeddings of identical (whitespace-normalized) text across re-enrichment and users
+    EMBEDDING_CACHE_ENABLED: bool = True
+    # Concurrent embed() calls are coalesced into batches of up to this many texts,
+    # waiting at most this long for more requests after the first one
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    # Model migrations (app.services.embedding_migration): content is re-embedded in
+    # batches of this size with a pause between batches, and the column swap gives up
+    # (and retries later) if its table locks are not granted within the timeout.
+    # Query embedding follows the model of the latest cutover, re-read at this interval
+    EMBEDDING_MIGRATION_BATCH_SIZE: int = 256
+    EMBEDDING_MIGRATION_THROTTLE_SECONDS: float = 0.5
+    EMBEDDING_MIGRATION_LOCK_TIMEOUT_MS: int = 5000
+    EMBEDDING_ACTIVE_MODEL_TTL_SECONDS: float = 10.0
+
+    # Job Queue Configuration (python -m app.worker)
+    # Jobs each worker process runs at once, and how often an idle worker polls
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    # A running job whose worker stops renewing its lease for this long is
+    # claimed again by another worker
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 300
+    # Failed attempts are retried after JOB_RETRY_BASE_SECONDS * 2^(attempt - 1)
+    # (capped at JOB_RETRY_MAX_SECONDS, with jitter) up to JOB_MAX_ATTEMPTS attempts
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10.0
+    JOB_RETRY_MAX_SECONDS: float = 3600.0
+    # Enrichment jobs are claimed and run through the pipeline in batches of this size
+    ENRICHMENT_BATCH_SIZE: int = 16
+    # Per-stage timings of each enrichment run are recorded as histograms and in the
+    # enrichment_runs table (newest ENRICHMENT_RUNS_MAX_ROWS kept). The worker serves
+    # its metrics on WORKER_METRICS_PORT (0 disables)
+    ENRICHMENT_PROFILING: bool = True
+    ENRICHMENT_RUNS_MAX_ROWS: int = 50000
+    WORKER_METRICS_PORT: int = 9100
+
+    # Scraping Configuration (workers)
+    # Scrapes share one event loop and pooled HTTP client per process; at most
+    # SCRAPE_MAX_CONCURRENCY fetches run at once, SCRAPE_PER_DOMAIN_CONCURRENCY per domain
+    SCRAPE_MAX_CONCURRENCY: int = 32
+    SCRAPE_PER_DOMAIN_CONCURRENCY: int = 4
+    SCRAPE_HTTP2: bool = True
+
     # LLM Configuration
+    # Backend: "groq" or "ollama" (the llm_provider preference overrides it for enrichment)
+    LLM_PROVIDER: str = "groq"
     LLM_MODEL: str = "llama3-8b-8192"
     LLM_MAX_TOKENS: int = 500
     LLM_TEMPERATURE: float = 0.3
+    # Provider rate limits this process may use (split the API key's limits across
+    # worker processes). Calls are paced to both budgets; failed calls are retried up
+    # to LLM_MAX_RETRIES times, after retry-after or a jittered exponential backoff
+    LLM_REQUESTS_PER_MINUTE: int = 30
+    LLM_TOKENS_PER_MINUTE: int = 6000
+    LLM_MAX_RETRIES: int = 5
+    LLM_RETRY_BASE_SECONDS: float = 1.0
+    LLM_RETRY_MAX_SECONDS: float = 60.0
+    # Each backend has its own connection pool of this many concurrent requests.
+    # Ollama generates on local hardware: match its OLLAMA_NUM_PARALLEL
+    GROQ_MAX_CONCURRENCY: int = 16
+    GROQ_TIMEOUT_SECONDS: float = 30.0
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    OLLAMA_MODEL: str = "llama3"
+    OLLAMA_MAX_CONCURRENCY: int = 4
+    OLLAMA_TIMEOUT_SECONDS: float = 300.0
+    # Prompts list only the user's existing tags most similar to the document:
+    # at most LLM_TAG_CONTEXT_MAX_TAGS, within about LLM_TAG_CONTEXT_TOKENS tokens.
+    # Tag vectors are kept in memory, up to TAG_VECTOR_CACHE_SIZE per process
+    LLM_TAG_CONTEXT_MAX_TAGS: int = 50
+    LLM_TAG_CONTEXT_TOKENS: int = 300
+    TAG_VECTOR_CACHE_SIZE: int = 50000
+    # Summaries and tags are cached by (content, model, prompt version, tag context):
+    # "postgres" (shared llm_cache table), "memory" (per process) or "none". Entries
+    # expire after the TTL, and the oldest beyond LLM_CACHE_MAX_ENTRIES are evicted
+    LLM_CACHE_BACKEND: str = "postgres"
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    LLM_CACHE_MAX_ENTRIES: int = 100000
+    # Batch mode (enrichment pipeline): documents of up to LLM_BATCH_MAX_DOCUMENT_CHARS
+    # are packed LLM_BATCH_MAX_DOCUMENTS to a request, within LLM_BATCH_MAX_PROMPT_TOKENS,
+    # with LLM_BATCH_TOKENS_PER_DOCUMENT of completion each. 1 disables batching
+    LLM_BATCH_MAX_DOCUMENTS: int = 8
+    LLM_BATCH_MAX_DOCUMENT_CHARS: int = 2000
+    LLM_BATCH_MAX_PROMPT_TOKENS: int = 3000
+    LLM_BATCH_TOKENS_PER_DOCUMENT: int = 200
 
     # JWT Authentication Configuration
     JWT_SECRET_KEY: SecretStr = SecretStr("smartkeep-dev-secret")
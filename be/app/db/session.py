@@ -1,3 +1,4 @@
+import logging
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
@@ -6,12 +7,17 @@ from app.core.config import settings
 # Import all models here so that they are registered with SQLAlchemy's metadata
 # before any session or router accesses them, preventing mapper initialization errors.
 from app.models.user import User
-from app.models.content import Content
+from app.models.content import Content, ContentChunk
 from app.models.collection import Collection, ContentCollection
 from app.models.annotation import Annotation
-from app.models.search import SearchHistory, SavedSearch
+from app.models.search import SearchHistory, SavedSearch, SavedSearchResult
 from app.models.preferences import Preferences
 from app.models.auth_token import VerificationToken, PasswordResetToken
+from app.models.embedding import EmbeddingCacheEntry, EmbeddingMigration
+from app.models.job import Job
+from app.models.tag import UserTag
+from app.models.llm import LLMCacheEntry
+from app.models.enrichment import EnrichmentRun
 
 engine = create_engine(
     settings.DATABASE_URL,
@@ -30,6 +36,32 @@ SessionLocal = sessionmaker(
 
 from sqlalchemy import event
 
+logger = logging.getLogger(__name__)
+
+
+@event.listens_for(engine, "connect")
+def register_vector_types(dbapi_connection, connection_record):
+    """
+    Register pgvector's adapters on every new DBAPI connection.
+    
+    np.ndarray parameters are then bound as vector values (binary with psycopg 3,
+    adapted natively with psycopg2) and vector/halfvec columns are read back as
+    np.ndarray, so no code builds or parses '[v1,v2,...]' strings.
+    """
+    if engine.dialect.driver == "psycopg":
+        from pgvector.psycopg import register_vector
+    else:
+        from pgvector.psycopg2 import register_vector
+    try:
+        register_vector(dbapi_connection)
+        # Don't leave the type lookup's transaction open on the pooled connection
+        dbapi_connection.commit()
+    except Exception as e:
+        # e.g. the vector extension does not exist yet on a fresh database
+        logger.warning(f"pgvector types not registered on connection: {e}")
+        dbapi_connection.rollback()
+
+
 @event.listens_for(engine, "checkin")
 def clear_rls(dbapi_connection, connection_record):
     """Clear RLS settings when connection is returned to the pool to prevent leaks."""
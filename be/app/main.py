@@ -1,8 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.router import api_router
+from app.core.config import settings
+from app.services.embedding_migration import active_embedding_service
+from app.services.search_history_writer import search_history_writer
 
+import gc
 import logging
+import threading
 import traceback
 from fastapi import Request
 from fastapi.responses import JSONResponse
@@ -13,6 +18,13 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="SmartKeep API")
 
+if settings.EMBEDDING_PRELOAD:
+    # Runs at import, i.e. in the gunicorn master when preload_app is set
+    active_embedding_service().preload()
+    # Move everything loaded so far out of the collector's generations so GC
+    # passes in the workers don't write to (and unshare) those pages
+    gc.freeze()
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     error_msg = f"Unhandled exception: {str(exc)}"
@@ -39,6 +51,43 @@ app.add_middleware(
 
 app.include_router(api_router)
 
+
+@app.on_event("startup")
+def warm_up_embedding_model():
+    """Warm the embedding model in the background; /health reports when it is done."""
+    if settings.EMBEDDING_WARMUP:
+        threading.Thread(target=_warm_up_embedding_model, name="embedding-warmup", daemon=True).start()
+
+
+def _warm_up_embedding_model():
+    try:
+        active_embedding_service().warm_up()
+    except Exception as e:
+        logger.error(f"Embedding model warm-up failed: {e}")
+
+
+@app.on_event("shutdown")
+def flush_search_history():
+    """Write any buffered search history before the process exits."""
+    search_history_writer.shutdown()
+
+
 @app.get("/")
 def root():
     return {"message": "SmartKeep API Running"}
+
+
+@app.get("/health")
+def health():
+    """
+    Readiness check.
+    
+    Returns 503 with status "starting" until the embedding model warm-up has
+    finished (when EMBEDDING_WARMUP is enabled), then 200 with status "ok".
+    """
+    embedding = active_embedding_service().status()
+    ready = embedding['warm'] or not settings.EMBEDDING_WARMUP
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ok" if ready else "starting", "embedding": embedding},
+    )
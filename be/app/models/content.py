@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, DateTime, Index, Boolean, Float, CheckConstraint, Integer, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, Index, Boolean, Float, CheckConstraint, Integer, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import TSVECTOR, UUID, ARRAY
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -32,7 +32,8 @@ class Content(Base):
     # AI enrichment
     summary = Column(Text, nullable=True)
     suggested_tags = Column(ARRAY(Text), nullable=False, server_default='{}')
-    embedding = Column(Vector(384), nullable=True)
+    # Dimensionless so a model migration can swap in vectors of another size
+    embedding = Column(Vector(), nullable=True)
     readability_score = Column(Float, nullable=True)
     difficulty = Column(Text, nullable=True)
     enrichment_status = Column(String(20), nullable=False, server_default='pending')
@@ -65,6 +66,8 @@ class Content(Base):
         Index('idx_content_tags', 'tags', postgresql_using='gin'),
         Index('idx_content_search_vector_gin', 'search_vector', postgresql_using='gin'),
         Index('idx_content_embedding_hnsw', 'embedding', postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'}),
+        # halfvec and binary_quantize expression indexes for EMBEDDING_QUANTIZATION
+        # are built by app.services.vector_index (not expressible here)
     )
     
     @property
@@ -95,3 +98,23 @@ class Content(Base):
         cascade="all, delete-orphan",
         lazy="dynamic"
     )
+
+
+class ContentChunk(Base):
+    """A sentence-aligned passage of a content body with its own embedding."""
+    __tablename__ = "content_chunks"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    content_id = Column(UUID(as_uuid=True), ForeignKey("content.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False)
+    embedding = Column(Vector(), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('content_id', 'chunk_index', name='uq_content_chunks_content_index'),
+        Index('idx_content_chunks_user_id', 'user_id'),
+        Index('idx_content_chunks_embedding_hnsw', 'embedding', postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'embedding': 'vector_cosine_ops'}),
+    )
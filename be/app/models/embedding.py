@@ -0,0 +1,50 @@
+from sqlalchemy import Column, String, Text, DateTime, Integer, CheckConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from app.db.base import Base
+import uuid
+
+
+class EmbeddingCacheEntry(Base):
+    """
+    Embedding of a normalized text, keyed by its SHA-256 and the model that produced it.
+    
+    Shared across users: it holds no text, only hashes and vectors.
+    """
+    __tablename__ = "embedding_cache"
+
+    text_hash = Column(String(64), primary_key=True)
+    model = Column(Text, primary_key=True)  # "<model name>:<backend>"
+    embedding = Column(Vector(), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_embedding_cache_created_at', 'created_at'),
+    )
+
+
+class EmbeddingMigration(Base):
+    """
+    Re-embedding of all content with a new model (see app.services.embedding_migration).
+    
+    The latest migration that reached cutover names the model behind the live
+    vectors; `last_content_id` is the keyset checkpoint of the backfill pass.
+    """
+    __tablename__ = "embedding_migrations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    target_model = Column(Text, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    status = Column(Text, nullable=False, server_default='backfilling')
+    last_content_id = Column(UUID(as_uuid=True), nullable=True)
+    processed = Column(Integer, nullable=False, server_default='0')
+    total = Column(Integer, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    cutover_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('backfilling', 'complete', 'finalized', 'aborted')", name='ck_embedding_migrations_status'),
+    )
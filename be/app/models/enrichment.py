@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, Integer, Float, Text, DateTime, Index, CheckConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class EnrichmentRun(Base):
+    """
+    Timings of one enrichment run (see app.services.enrichment_profiler).
+
+    A run is one batch of the enrichment pipeline or one `enrich_content`
+    call. `stages` maps each stage name to its wall-clock and CPU seconds,
+    e.g. {"llm": {"wall": 2.1, "cpu": 0.02}}. Only the newest
+    ENRICHMENT_RUNS_MAX_ROWS runs are kept.
+    """
+    __tablename__ = "enrichment_runs"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    mode = Column(Text, nullable=False)  # "pipeline" or "single"
+    items = Column(Integer, nullable=False)
+    wall_seconds = Column(Float, nullable=False)
+    cpu_seconds = Column(Float, nullable=False)
+    stages = Column(JSONB, nullable=False, server_default='{}')
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint("mode IN ('pipeline', 'single')", name='ck_enrichment_runs_mode'),
+        Index('idx_enrichment_runs_created_at', 'created_at'),
+    )
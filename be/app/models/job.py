@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Text, DateTime, Integer, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from app.db.base import Base
+import uuid
+
+
+class Job(Base):
+    """
+    A unit of background work in the Postgres job queue (see app.services.job_queue).
+    
+    Queued jobs become claimable at `run_at`; a claimed (running) job is
+    invisible to other workers until `locked_until`, after which it is
+    claimed again as if its worker had died.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(Text, nullable=False)  # handler name, e.g. "enrich_content"
+    payload = Column(JSONB, nullable=False, server_default='{}')
+    status = Column(Text, nullable=False, server_default='queued')
+    attempts = Column(Integer, nullable=False, server_default='0')
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(Text, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('queued', 'running', 'succeeded', 'failed')", name='ck_jobs_status'),
+        # Claim scans: due queued jobs, and running jobs whose lock expired
+        Index('idx_jobs_queued_run_at', 'run_at', postgresql_where=text("status = 'queued'")),
+        Index('idx_jobs_running_locked_until', 'locked_until', postgresql_where=text("status = 'running'")),
+    )
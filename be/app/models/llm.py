@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class LLMCacheEntry(Base):
+    """
+    Summary and tags the LLM returned for a prompt (see app.services.llm_cache).
+
+    `key` hashes the normalized content, model, prompt version and tag
+    context. Entries expire after LLM_CACHE_TTL_SECONDS; the oldest are
+    evicted beyond LLM_CACHE_MAX_ENTRIES.
+    """
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)
+    model = Column(Text, nullable=False)
+    prompt_version = Column(Text, nullable=False)
+    summary = Column(Text, nullable=True)
+    tags = Column(Text, nullable=True)  # JSON array, as returned by summarize_and_tag
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_llm_cache_created_at', 'created_at'),
+    )
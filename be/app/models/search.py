@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Text, DateTime, Integer, CheckConstraint, Index, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, Integer, Boolean, Float, CheckConstraint, Index, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
 from app.db.base import Base
 import uuid
 
@@ -32,7 +33,30 @@ class SavedSearch(Base):
     filters = Column(JSONB, nullable=False, server_default='{}')
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
     
+    # Materialization: matches are kept in saved_search_results and refreshed incrementally
+    materialized = Column(Boolean, nullable=False, server_default='false')
+    query_embedding = Column(Vector(), nullable=True)
+    last_refreshed_at = Column(DateTime(timezone=True), nullable=True)
+    last_viewed_at = Column(DateTime(timezone=True), nullable=True)
+    
     __table_args__ = (
         CheckConstraint("mode IN ('keyword', 'semantic', 'hybrid')", name='ck_saved_searches_mode'),
         Index('idx_saved_searches_user_id', 'user_id'),
     )
+
+
+class SavedSearchResult(Base):
+    __tablename__ = "saved_search_results"
+
+    saved_search_id = Column(UUID(as_uuid=True), ForeignKey("saved_searches.id", ondelete="CASCADE"), primary_key=True)
+    content_id = Column(UUID(as_uuid=True), ForeignKey("content.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    relevance_score = Column(Float, nullable=True)   # ts_rank against the saved tsquery
+    similarity_score = Column(Float, nullable=True)  # cosine similarity against the saved query embedding
+    score = Column(Float, nullable=False)
+    matched_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index('idx_saved_search_results_score', 'saved_search_id', 'score'),
+        Index('idx_saved_search_results_matched_at', 'saved_search_id', 'matched_at'),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Text, Integer, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+
+class UserTag(Base):
+    """
+    One entry of a user's tag vocabulary: every distinct tag or suggested tag
+    on their content, with the number of items carrying it.
+
+    Maintained by the `content_user_tags_sync` trigger on content, so reading
+    a user's vocabulary costs O(tags) instead of unnesting their whole
+    library. The trigger serializes writers per user with an advisory lock
+    (see `TagService.lock_users`).
+    """
+    __tablename__ = "user_tags"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(Text, primary_key=True)
+    item_count = Column(Integer, nullable=False)
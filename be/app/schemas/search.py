@@ -75,6 +75,42 @@ class SearchResponse(BaseModel):
     filters_applied: Dict[str, Any]
 
 
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=500)
+    mode: SearchModeEnum = SearchModeEnum.hybrid
+    tags: List[str] = []
+    domain: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    difficulty: Optional[str] = None
+    collection_id: Optional[UUID] = None
+    is_read: Optional[bool] = None
+    limit: int = Field(20, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+
+
+class BatchSearchResponse(BaseModel):
+    results: List[SearchResponse]  # one per query, in request order
+    latency_ms: int
+
+
+class PassageResultItem(BaseModel):
+    content_id: UUID
+    chunk_index: int
+    text: str
+    title: str
+    source_url: str
+    domain: Optional[str] = None
+    similarity_score: float
+
+
+class PassageSearchResponse(BaseModel):
+    items: List[PassageResultItem]
+    total: int
+    query: str
+    latency_ms: int
+
+
 class SuggestionResponse(BaseModel):
     suggestions: List[str]
 
@@ -97,6 +133,7 @@ class SavedSearchCreate(BaseModel):
     query: str
     mode: str = "hybrid"
     filters: Dict[str, Any] = {}
+    materialize: bool = False  # keep matches in a result table, refreshed incrementally
 
 
 class SavedSearchResponse(BaseModel):
@@ -106,6 +143,9 @@ class SavedSearchResponse(BaseModel):
     mode: str
     filters: Dict[str, Any]
     created_at: datetime
+    materialized: bool = False
+    last_refreshed_at: Optional[datetime] = None
+    last_viewed_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -113,3 +153,14 @@ class SavedSearchResponse(BaseModel):
 
 class SavedSearchesResponse(BaseModel):
     saved_searches: List[SavedSearchResponse]
+
+
+class SavedSearchResultItem(SearchResultItem):
+    is_new: bool = False  # matched since the saved search was last viewed
+
+
+class SavedSearchResultsResponse(BaseModel):
+    items: List[SavedSearchResultItem]
+    total: int
+    new_count: int
+    last_viewed_at: Optional[datetime] = None
@@ -6,17 +6,37 @@ import re
 import praw
 import logging
 import asyncio
+from typing import Optional
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Sent with every scrape request. Keep-alive is left to the client (and is
+# not a valid header over HTTP/2)
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+}
+
 
 class ContentScraper:
 
     @staticmethod
-    async def scrape_url(url: str) -> dict:
+    async def scrape_url(url: str, client: Optional[httpx.AsyncClient] = None) -> dict:
         """
         Scrape content from URL and extract metadata asynchronously.
+
+        Pass a shared `client` (see app.services.scrape_runner) to reuse its
+        connections; otherwise a client is created for this call.
         
         Returns dict with:
         - title
@@ -71,28 +91,17 @@ class ContentScraper:
         
         for attempt in range(max_scrape_retries + 1):
             try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Sec-Fetch-User': '?1',
-                    'Cache-Control': 'max-age=0',
-                }
                 # Increase timeout on each attempt
                 current_timeout = 10.0 + (attempt * 5.0)
                 
-                async with httpx.AsyncClient(headers=headers, timeout=current_timeout, follow_redirects=True) as client:
-                    response = await client.get(url)
-                    response.raise_for_status()
-                    html = response.text
-                    break # Success!
+                if client is not None:
+                    response = await client.get(url, timeout=current_timeout)
+                else:
+                    async with httpx.AsyncClient(headers=BROWSER_HEADERS, timeout=current_timeout, follow_redirects=True) as own_client:
+                        response = await own_client.get(url)
+                response.raise_for_status()
+                html = response.text
+                break # Success!
             except (httpx.RequestError, httpx.HTTPStatusError) as e:
                 last_error = e
                 if attempt < max_scrape_retries:
@@ -11,15 +11,16 @@ import time
 import logging
 import hashlib
 import json
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Iterator
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func
+from sqlalchemy import text, func, insert
 from app.models.content import Content
 from app.models.annotation import Annotation
 from app.models.search import SearchHistory, SavedSearch
 from app.models.collection import ContentCollection
-from app.services.embedding_service import embedding_service
-from datetime import datetime
+from app.services.embedding_migration import active_embedding_model, active_embedding_service
+from app.core.config import settings
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,34 @@ class ContentSearchService:
     # RRF (Reciprocal Rank Fusion) parameters
     RRF_K = 60
     
+    # Keyword scoring columns and match predicate, parameterized by the tsquery
+    # expression so single and batched searches share the same SQL
+    _KEYWORD_COLUMNS = """
+        ts_rank(c.search_vector, {tsquery}) as relevance_score,
+        ts_headline('english', COALESCE(c.body, ''), {tsquery},
+                    'MaxWords=30, MinWords=15, StartSel=<b>, StopSel=</b>') as matched_excerpt,
+        (
+            SELECT json_agg(json_build_object(
+                'id', a.id,
+                'selected_text', a.selected_text,
+                'note', a.note,
+                'color', a.color,
+                'relevance_score', ts_rank(to_tsvector('english', COALESCE(a.selected_text, '') || ' ' || COALESCE(a.note, '')), {tsquery})
+            ))
+            FROM annotations a
+            WHERE a.content_id = c.id
+              AND to_tsvector('english', COALESCE(a.selected_text, '') || ' ' || COALESCE(a.note, '')) @@ {tsquery}
+        ) as matched_annotations
+    """
+    _KEYWORD_MATCH = """(
+        c.search_vector @@ {tsquery}
+        OR EXISTS (
+            SELECT 1 FROM annotations a
+            WHERE a.content_id = c.id
+            AND to_tsvector('english', COALESCE(a.selected_text, '') || ' ' || COALESCE(a.note, '')) @@ {tsquery}
+        )
+    )"""
+    
     def __init__(self, db: Session, user_id: str):
         self.db = db
         self.user_id = user_id
@@ -51,74 +80,18 @@ class ContentSearchService:
         start_time = time.time()
         
         # Build the query with ts_rank and ts_headline
-        sql_parts = [
-            """
-            SELECT c.*, 
-                   ts_rank(c.search_vector, plainto_tsquery('english', :query)) as relevance_score,
-                   ts_headline('english', COALESCE(c.body, ''), plainto_tsquery('english', :query), 
-                               'MaxWords=30, MinWords=15, StartSel=<b>, StopSel=</b>') as matched_excerpt,
-                   (
-                       SELECT json_agg(json_build_object(
-                           'id', a.id,
-                           'selected_text', a.selected_text,
-                           'note', a.note,
-                           'color', a.color,
-                           'relevance_score', ts_rank(to_tsvector('english', COALESCE(a.selected_text, '') || ' ' || COALESCE(a.note, '')), plainto_tsquery('english', :query))
-                       ))
-                       FROM annotations a
-                       WHERE a.content_id = c.id
-                         AND to_tsvector('english', COALESCE(a.selected_text, '') || ' ' || COALESCE(a.note, '')) @@ plainto_tsquery('english', :query)
-                   ) as matched_annotations
-            FROM content c
-            """
-        ]
+        tsquery = "plainto_tsquery('english', :query)"
+        sql_parts = [f"SELECT c.*, {self._KEYWORD_COLUMNS.format(tsquery=tsquery)} FROM content c"]
         
         if collection_id:
             sql_parts.append("JOIN content_collections cc ON c.id = cc.content_id")
             
-        sql_parts.append("""
-            WHERE c.user_id = :user_id
-              AND (
-                c.search_vector @@ plainto_tsquery('english', :query)
-                OR EXISTS (
-                    SELECT 1 FROM annotations a 
-                    WHERE a.content_id = c.id 
-                    AND to_tsvector('english', COALESCE(a.selected_text, '') || ' ' || COALESCE(a.note, '')) @@ plainto_tsquery('english', :query)
-                )
-              )
-        """)
+        sql_parts.append(f"WHERE c.user_id = :user_id AND {self._KEYWORD_MATCH.format(tsquery=tsquery)}")
         
         params = {'query': query, 'limit': limit, 'offset': offset, 'user_id': self.user_id}
         
         # Add filters
-        if tags:
-            for i, tag in enumerate(tags):
-                sql_parts.append(f"AND c.tags @> :tags{i}")
-                params[f'tags{i}'] = json.dumps([tag])
-        
-        if domain:
-            sql_parts.append("AND c.domain = :domain")
-            params['domain'] = domain
-        
-        if date_from:
-            sql_parts.append("AND c.created_at >= :date_from")
-            params['date_from'] = date_from
-        
-        if date_to:
-            sql_parts.append("AND c.created_at <= :date_to")
-            params['date_to'] = date_to
-        
-        if difficulty:
-            sql_parts.append("AND c.difficulty = :difficulty")
-            params['difficulty'] = difficulty
-            
-        if is_read is not None:
-            sql_parts.append("AND c.is_read = :is_read")
-            params['is_read'] = is_read
-            
-        if collection_id:
-            sql_parts.append("AND cc.collection_id = :collection_id")
-            params['collection_id'] = collection_id
+        self._append_filters(sql_parts, params, tags, domain, date_from, date_to, difficulty, is_read, collection_id)
         
         sql_parts.append("ORDER BY relevance_score DESC LIMIT :limit OFFSET :offset")
         
@@ -156,13 +129,12 @@ class ContentSearchService:
     ) -> Dict[str, Any]:
         """Semantic search using pgvector cosine similarity."""
         start_time = time.time()
-        query_embedding = embedding_service.embed(query)
-        embedding_string = '[' + ','.join(str(v) for v in query_embedding) + ']'
+        query_embedding = active_embedding_service().embed_array(query)
         
         sql_parts = [
             """
             SELECT c.*, 
-                   1 - (c.embedding <=> (:embedding)::vector) as similarity_score
+                   1 - (c.embedding <=> CAST(:embedding AS vector)) as similarity_score
             FROM content c
             """
         ]
@@ -175,50 +147,55 @@ class ContentSearchService:
               AND c.embedding IS NOT NULL
         """)
         
-        params = {'embedding': embedding_string, 'limit': limit, 'offset': offset, 'user_id': self.user_id}
+        params = {'embedding': query_embedding, 'limit': limit, 'offset': offset, 'user_id': self.user_id}
         
         # Add same filters
-        if tags:
-            for i, tag in enumerate(tags):
-                sql_parts.append(f"AND c.tags @> :tags{i}")
-                params[f'tags{i}'] = json.dumps([tag])
-        if domain:
-            sql_parts.append("AND c.domain = :domain")
-            params['domain'] = domain
-        if date_from:
-            sql_parts.append("AND c.created_at >= :date_from")
-            params['date_from'] = date_from
-        if date_to:
-            sql_parts.append("AND c.created_at <= :date_to")
-            params['date_to'] = date_to
-        if difficulty:
-            sql_parts.append("AND c.difficulty = :difficulty")
-            params['difficulty'] = difficulty
-        if is_read is not None:
-            sql_parts.append("AND c.is_read = :is_read")
-            params['is_read'] = is_read
-        if collection_id:
-            sql_parts.append("AND cc.collection_id = :collection_id")
-            params['collection_id'] = collection_id
+        self._append_filters(sql_parts, params, tags, domain, date_from, date_to, difficulty, is_read, collection_id)
         
-        sql_parts.append("ORDER BY c.embedding <=> (:embedding)::vector LIMIT :limit OFFSET :offset")
-        
-        sql = ' '.join(sql_parts)
+        candidate_order = self._quantized_order_expression()
+        if candidate_order:
+            # Candidate pass on the compact quantized index, then exact re-rank
+            # of those candidates with the full-precision vectors
+            candidates = min((limit + offset) * settings.SEMANTIC_RERANK_FACTOR, 1000)
+            self.db.execute(text("SELECT set_config('hnsw.ef_search', :ef_search, true)"), {'ef_search': str(max(candidates, 40))})
+            sql_parts[0] = "SELECT c.id FROM content c"
+            sql_parts.append(f"ORDER BY {candidate_order} LIMIT :candidates")
+            params['candidates'] = candidates
+            sql = f"""
+                WITH candidates AS ({' '.join(sql_parts)})
+                SELECT c.*, 1 - (c.embedding <=> CAST(:embedding AS vector)) as similarity_score
+                FROM content c JOIN candidates ON candidates.id = c.id
+                ORDER BY c.embedding <=> CAST(:embedding AS vector) LIMIT :limit OFFSET :offset
+            """
+        else:
+            sql_parts.append("ORDER BY c.embedding <=> CAST(:embedding AS vector) LIMIT :limit OFFSET :offset")
+            sql = ' '.join(sql_parts)
         result = self.db.execute(text(sql), params)
         rows = result.fetchall()
         
         items = [self._row_to_dict_with_scores(row, similarity=row.similarity_score) for row in rows]
-        
-        # Fallback excerpt for semantic results
-        for item in items:
-            if not item.get('matched_excerpt') and item.get('body'):
-                # Simple heuristic: find first query word in body
-                body = item['body']
-                excerpt = body[:200] + "..." if len(body) > 200 else body
-                item['matched_excerpt'] = excerpt
+        self._add_fallback_excerpts(items)
 
         return {'items': items, 'total': len(items), 'latency_ms': (time.time() - start_time) * 1000}
     
+    @staticmethod
+    def _quantized_order_expression(query_vector: str = "CAST(:embedding AS vector)") -> Optional[str]:
+        """
+        ORDER BY expression for the quantized candidate pass, or None for exact search.
+        
+        The expressions must match the expression indexes built by
+        app.services.vector_index so the planner can use them.
+        
+        Args:
+            query_vector: SQL expression of the query vector
+        """
+        dim = active_embedding_model()[1]
+        if settings.EMBEDDING_QUANTIZATION == 'halfvec':
+            return f"c.embedding::halfvec({dim}) <=> ({query_vector})::halfvec({dim})"
+        if settings.EMBEDDING_QUANTIZATION == 'binary':
+            return f"binary_quantize(c.embedding)::bit({dim}) <~> binary_quantize({query_vector})"
+        return None
+    
     def hybrid_search(
         self,
         query: str,
@@ -245,19 +222,30 @@ class ContentSearchService:
             query, pool_limit, 0, tags, domain, date_from, date_to, difficulty, is_read, collection_id
         )
         
-        # Fusion logic (RRF)
+        paginated, total = self._fuse_rrf(keyword_results['items'], semantic_results['items'], limit, offset)
+        
+        result = {
+            'items': paginated,
+            'total': total,
+            'latency_ms': (time.time() - start_time) * 1000,
+        }
+        
+        return result
+    
+    def _fuse_rrf(self, keyword_items: List[dict], semantic_items: List[dict], limit: int, offset: int) -> Tuple[List[dict], int]:
+        """Fuse keyword and semantic rankings with RRF. Returns (page, total)."""
         rrf_scores = {} # doc_id -> score
         doc_map = {}    # doc_id -> item_dict
         
         # Process keyword ranks
-        for i, item in enumerate(keyword_results['items']):
+        for i, item in enumerate(keyword_items):
             doc_id = item['id']
             rank = i + 1
             rrf_scores[doc_id] = rrf_scores.get(doc_id, 0) + (1.0 / (self.RRF_K + rank))
             doc_map[doc_id] = item
             
         # Process semantic ranks
-        for i, item in enumerate(semantic_results['items']):
+        for i, item in enumerate(semantic_items):
             doc_id = item['id']
             rank = i + 1
             rrf_scores[doc_id] = rrf_scores.get(doc_id, 0) + (1.0 / (self.RRF_K + rank))
@@ -277,16 +265,69 @@ class ContentSearchService:
             fused_results.append(item)
             
         fused_results.sort(key=lambda x: x['combined_score'], reverse=True)
-        total = len(fused_results)
-        paginated = fused_results[offset : offset + limit]
+        return fused_results[offset : offset + limit], len(fused_results)
+    
+    @staticmethod
+    def _add_fallback_excerpts(items: List[dict]) -> None:
+        """Fallback excerpt for semantic results, which have no ts_headline."""
+        for item in items:
+            if not item.get('matched_excerpt') and item.get('body'):
+                body = item['body']
+                item['matched_excerpt'] = body[:200] + "..." if len(body) > 200 else body
+    
+    def passage_search(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        tags: List[str] = None,
+        domain: str = None,
+        date_from: datetime = None,
+        date_to: datetime = None,
+        difficulty: str = None,
+        is_read: bool = None,
+        collection_id: UUID = None,
+    ) -> Dict[str, Any]:
+        """
+        Semantic search over stored content chunks.
         
-        result = {
-            'items': paginated,
-            'total': total,
-            'latency_ms': (time.time() - start_time) * 1000,
-        }
+        Returns the best-matching passages (not whole documents) ranked by cosine
+        similarity, using the chunk vectors written at enrichment time.
+        """
+        start_time = time.time()
+        query_embedding = active_embedding_service().embed_array(query)
         
-        return result
+        sql_parts = [
+            """
+            SELECT ch.content_id, ch.chunk_index, ch.text,
+                   c.title, c.source_url, c.domain,
+                   1 - (ch.embedding <=> CAST(:embedding AS vector)) as similarity_score
+            FROM content_chunks ch
+            JOIN content c ON c.id = ch.content_id
+            """
+        ]
+        if collection_id:
+            sql_parts.append("JOIN content_collections cc ON c.id = cc.content_id")
+        sql_parts.append("WHERE ch.user_id = :user_id")
+        
+        params = {'embedding': query_embedding, 'limit': limit, 'offset': offset, 'user_id': self.user_id}
+        self._append_filters(sql_parts, params, tags, domain, date_from, date_to, difficulty, is_read, collection_id)
+        sql_parts.append("ORDER BY ch.embedding <=> CAST(:embedding AS vector) LIMIT :limit OFFSET :offset")
+        
+        rows = self.db.execute(text(' '.join(sql_parts)), params).fetchall()
+        items = [
+            {
+                'content_id': row.content_id,
+                'chunk_index': row.chunk_index,
+                'text': row.text,
+                'title': row.title,
+                'source_url': row.source_url,
+                'domain': row.domain,
+                'similarity_score': float(row.similarity_score),
+            }
+            for row in rows
+        ]
+        return {'items': items, 'total': len(items), 'latency_ms': (time.time() - start_time) * 1000}
     
     def search(self, **kwargs) -> Dict[str, Any]:
         mode = kwargs.get('mode', 'hybrid')
@@ -296,6 +337,273 @@ class ContentSearchService:
             return self.semantic_search(**{k: v for k, v in kwargs.items() if k != 'mode'})
         return self.hybrid_search(**{k: v for k, v in kwargs.items() if k != 'mode'})
 
+    def search_many(
+        self,
+        queries: List[str],
+        mode: str = 'hybrid',
+        limit: int = 20,
+        offset: int = 0,
+        **filters,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the same search for many queries at once.
+        
+        All queries are embedded with a single `embed_batch` call and each
+        leg runs as one SQL statement, with a LATERAL subquery per entry of a
+        VALUES list of queries (or query vectors). Results are returned in
+        the order of `queries`, in the same shape as `search()`.
+        """
+        start_time = time.time()
+        if not queries:
+            return []
+        
+        pool_limit = max(100, limit * 2) if mode == 'hybrid' else limit
+        pool_offset = 0 if mode == 'hybrid' else offset
+        
+        keyword_items = [[] for _ in queries]
+        keyword_totals = [0] * len(queries)
+        semantic_items = [[] for _ in queries]
+        if mode in ('keyword', 'hybrid'):
+            keyword_items, keyword_totals = self._keyword_search_many(queries, pool_limit, pool_offset, **filters)
+        if mode in ('semantic', 'hybrid'):
+            semantic_items = self._semantic_search_many(queries, pool_limit, pool_offset, **filters)
+        
+        latency_ms = (time.time() - start_time) * 1000
+        results = []
+        for i in range(len(queries)):
+            if mode == 'keyword':
+                items, total = keyword_items[i], keyword_totals[i]
+            elif mode == 'semantic':
+                items, total = semantic_items[i], len(semantic_items[i])
+            else:
+                items, total = self._fuse_rrf(keyword_items[i], semantic_items[i], limit, offset)
+            results.append({'items': items, 'total': total, 'latency_ms': latency_ms})
+        return results
+    
+    def _keyword_search_many(self, queries: List[str], limit: int, offset: int, **filters) -> Tuple[List[List[dict]], List[int]]:
+        """Keyword leg of `search_many`: one statement for all queries."""
+        params = {'limit': limit, 'offset': offset, 'user_id': self.user_id}
+        values = []
+        for i, query in enumerate(queries):
+            values.append(f"({i}, CAST(:q{i} AS text))")
+            params[f'q{i}'] = query
+        
+        tsquery = "plainto_tsquery('english', q.query)"
+        inner = [f"SELECT c.*, {self._KEYWORD_COLUMNS.format(tsquery=tsquery)}, COUNT(*) OVER () AS total_matches FROM content c"]
+        if filters.get('collection_id'):
+            inner.append("JOIN content_collections cc ON c.id = cc.content_id")
+        inner.append(f"WHERE c.user_id = :user_id AND {self._KEYWORD_MATCH.format(tsquery=tsquery)}")
+        self._append_filters(inner, params, **filters)
+        inner.append("ORDER BY relevance_score DESC LIMIT :limit OFFSET :offset")
+        
+        sql = f"""
+            SELECT q.idx, k.*
+            FROM (VALUES {', '.join(values)}) AS q(idx, query)
+            CROSS JOIN LATERAL ({' '.join(inner)}) k
+            ORDER BY q.idx, k.relevance_score DESC
+        """
+        items = [[] for _ in queries]
+        totals = [0] * len(queries)
+        for row in self.db.execute(text(sql), params):
+            items[row.idx].append(self._row_to_dict_with_scores(
+                row, relevance=row.relevance_score, excerpt=row.matched_excerpt, matched_annotations=row.matched_annotations
+            ))
+            totals[row.idx] = row.total_matches
+        return items, totals
+    
+    def _semantic_search_many(self, queries: List[str], limit: int, offset: int, **filters) -> List[List[dict]]:
+        """Vector leg of `search_many`: one embed_batch call and one statement for all queries."""
+        embeddings = active_embedding_service().embed_batch_array(queries)
+        params = {'limit': limit, 'offset': offset, 'user_id': self.user_id}
+        values = []
+        for i, embedding in enumerate(embeddings):
+            values.append(f"({i}, CAST(:e{i} AS vector))")
+            params[f'e{i}'] = embedding
+        
+        inner = ["SELECT c.*, 1 - (c.embedding <=> q.embedding) AS similarity_score FROM content c"]
+        if filters.get('collection_id'):
+            inner.append("JOIN content_collections cc ON c.id = cc.content_id")
+        inner.append("WHERE c.user_id = :user_id AND c.embedding IS NOT NULL")
+        self._append_filters(inner, params, **filters)
+        
+        candidate_order = self._quantized_order_expression("q.embedding")
+        if candidate_order:
+            # Same candidate pass and exact re-rank as semantic_search, per query
+            candidates = min((limit + offset) * settings.SEMANTIC_RERANK_FACTOR, 1000)
+            self.db.execute(text("SELECT set_config('hnsw.ef_search', :ef_search, true)"), {'ef_search': str(max(candidates, 40))})
+            inner[0] = "SELECT c.id FROM content c"
+            inner.append(f"ORDER BY {candidate_order} LIMIT :candidates")
+            params['candidates'] = candidates
+            inner = [f"""
+                SELECT c.*, 1 - (c.embedding <=> q.embedding) AS similarity_score
+                FROM content c WHERE c.id IN ({' '.join(inner)})
+            """]
+        inner.append("ORDER BY c.embedding <=> q.embedding LIMIT :limit OFFSET :offset")
+        
+        sql = f"""
+            SELECT q.idx, s.*
+            FROM (VALUES {', '.join(values)}) AS q(idx, embedding)
+            CROSS JOIN LATERAL ({' '.join(inner)}) s
+            ORDER BY q.idx, s.similarity_score DESC
+        """
+        items = [[] for _ in queries]
+        for row in self.db.execute(text(sql), params):
+            items[row.idx].append(self._row_to_dict_with_scores(row, similarity=row.similarity_score))
+        for query_items in items:
+            self._add_fallback_excerpts(query_items)
+        return items
+
+    def stream_search(
+        self,
+        query: str,
+        mode: str = 'hybrid',
+        max_results: Optional[int] = None,
+        batch_size: int = 200,
+        **filters,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield search results one by one using server-side cursors.
+        
+        Each mode is one ordered query fetched `batch_size` rows at a time, so
+        memory stays flat in the number of results. Hybrid search fuses the
+        ranked ids of both legs with RRF inside that query and joins full rows
+        to the fused order, so nothing is collected in Python before the first
+        result. Semantic matches need SEARCH_STREAM_MIN_SIMILARITY, and the
+        semantic and hybrid legs rank at most SEARCH_STREAM_MAX_RESULTS items.
+        """
+        if mode == 'keyword':
+            sql, params = self._keyword_stream_sql(query, max_results, **filters)
+            for row in self._stream_rows(sql, params, batch_size):
+                yield self._row_to_dict_with_scores(
+                    row, relevance=row.relevance_score, excerpt=row.matched_excerpt, matched_annotations=row.matched_annotations
+                )
+            return
+        
+        query_embedding = active_embedding_service().embed_array(query)
+        cap = settings.SEARCH_STREAM_MAX_RESULTS
+        if mode == 'semantic':
+            sql, params = self._semantic_stream_sql(query_embedding, min(max_results or cap, cap), **filters)
+            for row in self._stream_rows(sql, params, batch_size):
+                item = self._row_to_dict_with_scores(row, similarity=row.similarity_score)
+                self._add_fallback_excerpts([item])
+                yield item
+            return
+        
+        # Hybrid: rank ids in both legs, fuse with RRF and load rows in fused order
+        pool = min(max_results * 2 if max_results else cap, cap)
+        keyword_sql, params = self._keyword_stream_sql(query, pool, ids_only=True, **filters)
+        semantic_sql, semantic_params = self._semantic_stream_sql(query_embedding, pool, ids_only=True, **filters)
+        params.update(semantic_params)
+        params['rrf_k'] = self.RRF_K
+        tsquery = "plainto_tsquery('english', :query)"
+        sql = f"""
+            WITH keyword AS (
+                SELECT id, row_number() OVER (ORDER BY relevance_score DESC, id) AS rank FROM ({keyword_sql}) k
+            ),
+            semantic AS (
+                SELECT id, row_number() OVER (ORDER BY distance, id) AS rank FROM ({semantic_sql}) s
+            ),
+            fused AS (
+                SELECT COALESCE(k.id, s.id) AS id,
+                       COALESCE(1.0 / (:rrf_k + k.rank), 0) + COALESCE(1.0 / (:rrf_k + s.rank), 0) AS combined_score
+                FROM keyword k FULL OUTER JOIN semantic s ON s.id = k.id
+            )
+            SELECT c.*, {self._KEYWORD_COLUMNS.format(tsquery=tsquery)},
+                   CASE WHEN c.embedding IS NOT NULL THEN 1 - (c.embedding <=> CAST(:embedding AS vector)) END AS similarity_score,
+                   f.combined_score
+            FROM fused f JOIN content c ON c.id = f.id
+            ORDER BY f.combined_score DESC, c.id
+        """
+        if max_results:
+            sql += " LIMIT :limit"
+            params['limit'] = max_results
+        for row in self._stream_rows(sql, params, batch_size):
+            item = self._row_to_dict_with_scores(
+                row, relevance=row.relevance_score, similarity=row.similarity_score,
+                excerpt=row.matched_excerpt, matched_annotations=row.matched_annotations,
+            )
+            item['combined_score'] = float(row.combined_score)
+            yield item
+    
+    def _keyword_stream_sql(self, query: str, max_results: Optional[int], ids_only: bool = False, **filters) -> Tuple[str, Dict[str, Any]]:
+        tsquery = "plainto_tsquery('english', :query)"
+        columns = "c.id, ts_rank(c.search_vector, {tsquery}) as relevance_score" if ids_only else "c.*, " + self._KEYWORD_COLUMNS
+        sql_parts = [f"SELECT {columns.format(tsquery=tsquery)} FROM content c"]
+        if filters.get('collection_id'):
+            sql_parts.append("JOIN content_collections cc ON c.id = cc.content_id")
+        sql_parts.append(f"WHERE c.user_id = :user_id AND {self._KEYWORD_MATCH.format(tsquery=tsquery)}")
+        params = {'query': query, 'user_id': self.user_id}
+        self._append_filters(sql_parts, params, **filters)
+        sql_parts.append("ORDER BY relevance_score DESC")
+        if max_results:
+            sql_parts.append("LIMIT :max_results")
+            params['max_results'] = max_results
+        return ' '.join(sql_parts), params
+    
+    def _semantic_stream_sql(self, query_embedding, max_results: int, ids_only: bool = False, **filters) -> Tuple[str, Dict[str, Any]]:
+        distance = "c.embedding <=> CAST(:embedding AS vector)"
+        columns = f"c.id, {distance} as distance" if ids_only else f"c.*, 1 - ({distance}) as similarity_score"
+        sql_parts = [f"SELECT {columns} FROM content c"]
+        if filters.get('collection_id'):
+            sql_parts.append("JOIN content_collections cc ON c.id = cc.content_id")
+        sql_parts.append(f"WHERE c.user_id = :user_id AND c.embedding IS NOT NULL AND {distance} <= :max_distance")
+        params = {
+            'embedding': query_embedding,
+            'user_id': self.user_id,
+            'max_distance': 1 - settings.SEARCH_STREAM_MIN_SIMILARITY,
+            'max_results': max_results,
+        }
+        self._append_filters(sql_parts, params, **filters)
+        sql_parts.append(f"ORDER BY {distance} LIMIT :max_results")
+        return ' '.join(sql_parts), params
+    
+    def _stream_rows(self, sql: str, params: Dict[str, Any], batch_size: int):
+        """Execute with a server-side cursor, fetching `batch_size` rows per round trip."""
+        result = self.db.execute(
+            text(sql).execution_options(stream_results=True, yield_per=batch_size), params
+        )
+        try:
+            for row in result:
+                yield row
+        finally:
+            result.close()
+
+    @staticmethod
+    def _append_filters(
+        sql_parts: List[str],
+        params: Dict[str, Any],
+        tags: List[str] = None,
+        domain: str = None,
+        date_from: datetime = None,
+        date_to: datetime = None,
+        difficulty: str = None,
+        is_read: bool = None,
+        collection_id: UUID = None,
+    ) -> None:
+        """Append the shared content filters (aliased as `c`, collections as `cc`) to a query."""
+        if tags:
+            for i, tag in enumerate(tags):
+                sql_parts.append(f"AND c.tags @> :tags{i}")
+                params[f'tags{i}'] = json.dumps([tag])
+        if domain:
+            sql_parts.append("AND c.domain = :domain")
+            params['domain'] = domain
+        if date_from:
+            sql_parts.append("AND c.created_at >= :date_from")
+            params['date_from'] = date_from
+        if date_to:
+            sql_parts.append("AND c.created_at <= :date_to")
+            params['date_to'] = date_to
+        if difficulty:
+            sql_parts.append("AND c.difficulty = :difficulty")
+            params['difficulty'] = difficulty
+        if is_read is not None:
+            sql_parts.append("AND c.is_read = :is_read")
+            params['is_read'] = is_read
+        if collection_id:
+            sql_parts.append("AND cc.collection_id = :collection_id")
+            params['collection_id'] = collection_id
+
     def get_suggestions(self, prefix: str, limit: int = 5) -> List[str]:
         if len(prefix) < 2: return []
         sql = "SELECT DISTINCT title FROM content WHERE user_id = :user_id AND title ILIKE :prefix ORDER BY title LIMIT :limit"
@@ -303,8 +611,10 @@ class ContentSearchService:
         return [row.title for row in result.fetchall()]
 
     def _row_to_dict_with_scores(self, row, relevance=0.0, similarity=0.0, excerpt=None, matched_annotations=None) -> dict:
+        # Values stay native (UUID, datetime) so the response models validate
+        # them without an isoformat/fromisoformat round trip
         d = {
-            'id': str(row.id), 'source_url': row.source_url, 'domain': row.domain,
+            'id': row.id, 'source_url': row.source_url, 'domain': row.domain,
             'og_image_url': row.og_image_url, 'favicon_url': row.favicon_url,
             'title': row.title, 'author': row.author, 'summary': row.summary,
             'suggested_tags': row.suggested_tags or [], 'tags': row.tags or [],
@@ -313,12 +623,13 @@ class ContentSearchService:
             'difficulty': row.difficulty, 'readability_score': row.readability_score,
             'is_truncated': row.is_truncated, 'is_read': row.is_read,
             'reading_progress': row.reading_progress, 'enrichment_status': row.enrichment_status,
-            'published_at': row.published_at.isoformat() if row.published_at else None,
-            'last_opened_at': row.last_opened_at.isoformat() if row.last_opened_at else None,
-            'created_at': row.created_at.isoformat() if row.created_at else None,
-            'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+            'published_at': row.published_at,
+            'last_opened_at': row.last_opened_at,
+            'created_at': row.created_at,
+            'updated_at': row.updated_at,
             'relevance_score': float(relevance) if relevance else 0.0,
             'similarity_score': float(similarity) if similarity else 0.0,
+            'combined_score': None,
             'matched_excerpt': excerpt,
             'matched_annotations': matched_annotations or []
         }
@@ -334,6 +645,15 @@ class SearchHistoryService:
         db.add(history)
         db.commit()
         return history
+
+    @staticmethod
+    def add_history_batch(db: Session, entries: List[Dict[str, Any]]) -> int:
+        """Insert many history entries with a single multi-row INSERT."""
+        if not entries:
+            return 0
+        db.execute(insert(SearchHistory.__table__).values(entries))
+        db.commit()
+        return len(entries)
     
     @staticmethod
     def get_history(db: Session, user_id: str, limit: int = 20) -> List[SearchHistory]:
@@ -347,11 +667,33 @@ class SearchHistoryService:
 
 
 class SavedSearchService:
+    """
+    Saved searches, optionally materialized into `saved_search_results`.
+
+    A materialized search stores every matching content item with its score.
+    Refreshes are incremental: only content created or updated since
+    `last_refreshed_at` is scored against the saved tsquery and query
+    embedding, so opening a saved search is a single indexed read and
+    "new since last view" is just `matched_at > last_viewed_at`. Enrichment
+    refreshes a user's searches (`refresh_for_user`); opening one refreshes
+    it first only when that was more than SAVED_SEARCH_REFRESH_INTERVAL_SECONDS ago.
+    """
+
+    # Rescore a little before the watermark so rows committed by transactions
+    # that started before the last refresh are not missed (upserts are idempotent)
+    REFRESH_OVERLAP = timedelta(minutes=1)
+
     @staticmethod
-    def create(db: Session, user_id: str, name: str, query: str, mode: str = 'hybrid', filters: dict = None) -> SavedSearch:
+    def create(db: Session, user_id: str, name: str, query: str, mode: str = 'hybrid', filters: dict = None, materialize: bool = False) -> SavedSearch:
         saved = SavedSearch(user_id=user_id, name=name, query=query, mode=mode, filters=filters or {})
+        if materialize:
+            saved.materialized = True
+            if mode != 'keyword':
+                saved.query_embedding = active_embedding_service().embed(query)
         db.add(saved)
         db.commit()
+        if materialize:
+            SavedSearchService.refresh(db, saved, full=True)
         return saved
     
     @staticmethod
@@ -363,3 +705,199 @@ class SavedSearchService:
         deleted = db.query(SavedSearch).filter(SavedSearch.id == search_id, SavedSearch.user_id == user_id).delete()
         db.commit()
         return deleted > 0
+
+    @staticmethod
+    def _filter_kwargs(filters: dict) -> Dict[str, Any]:
+        """Translate a saved `filters` dict into ContentSearchService filter arguments."""
+        filters = filters or {}
+        tags = filters.get('tags')
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(',') if t.strip()]
+        kwargs = {
+            'tags': tags or None,
+            'domain': filters.get('domain'),
+            'difficulty': filters.get('difficulty'),
+            'is_read': filters.get('is_read'),
+            'collection_id': filters.get('collection_id'),
+            'date_from': None,
+            'date_to': None,
+        }
+        for key in ('date_from', 'date_to'):
+            value = filters.get(key)
+            if value:
+                parsed = datetime.fromisoformat(str(value))
+                if key == 'date_to' and len(str(value)) == 10:
+                    parsed = datetime.combine(parsed.date(), datetime.max.time())
+                kwargs[key] = parsed
+        return kwargs
+
+    @staticmethod
+    def refresh(db: Session, saved: SavedSearch, full: bool = False) -> None:
+        """
+        Score new or updated content against a materialized saved search.
+
+        Content in the delta that no longer matches (edited, filtered out)
+        is removed; content that still matches keeps its original
+        `matched_at` so it is not reported as new again.
+        """
+        if not saved.materialized:
+            return
+        
+        refreshed_at = db.execute(text("SELECT now()")).scalar()
+        filters = SavedSearchService._filter_kwargs(saved.filters)
+        params = {
+            'saved_search_id': saved.id,
+            'user_id': str(saved.user_id),
+            'query': saved.query,
+            'min_similarity': settings.SAVED_SEARCH_MIN_SIMILARITY,
+            'bm25_weight': settings.HYBRID_SEARCH_BM25_WEIGHT,
+            'semantic_weight': settings.HYBRID_SEARCH_SEMANTIC_WEIGHT,
+        }
+        
+        delta_sql = "SELECT c.id FROM content c WHERE c.user_id = :user_id"
+        if not full and saved.last_refreshed_at:
+            delta_sql += " AND c.updated_at > :since"
+            params['since'] = saved.last_refreshed_at - SavedSearchService.REFRESH_OVERLAP
+        
+        eligible_parts = ["SELECT DISTINCT c.id FROM content c"]
+        if filters['collection_id']:
+            eligible_parts.append("JOIN content_collections cc ON c.id = cc.content_id")
+        eligible_parts.append("WHERE c.id IN (SELECT id FROM delta)")
+        ContentSearchService._append_filters(eligible_parts, params, **filters)
+        
+        relevance_sql = """
+            CASE WHEN c.search_vector @@ plainto_tsquery('english', :query)
+                 THEN ts_rank(c.search_vector, plainto_tsquery('english', :query)) END
+        """
+        if saved.mode != 'keyword' and saved.query_embedding is not None:
+            similarity_sql = "CASE WHEN c.embedding IS NOT NULL THEN 1 - (c.embedding <=> CAST(:embedding AS vector)) END"
+            params['embedding'] = saved.query_embedding
+        else:
+            similarity_sql = "CAST(NULL AS float)"
+        
+        if saved.mode == 'keyword':
+            match_sql = "relevance_score IS NOT NULL"
+            score_sql = "m.relevance_score"
+        elif saved.mode == 'semantic':
+            match_sql = "similarity_score >= :min_similarity"
+            score_sql = "m.similarity_score"
+        else:
+            match_sql = "relevance_score IS NOT NULL OR similarity_score >= :min_similarity"
+            score_sql = ":bm25_weight * COALESCE(m.relevance_score, 0) + :semantic_weight * COALESCE(m.similarity_score, 0)"
+        
+        sql = f"""
+            WITH delta AS ({delta_sql}),
+            eligible AS ({' '.join(eligible_parts)}),
+            scored AS (
+                SELECT c.id, {relevance_sql} AS relevance_score, {similarity_sql} AS similarity_score
+                FROM content c JOIN eligible e ON e.id = c.id
+            ),
+            matched AS (SELECT * FROM scored WHERE {match_sql}),
+            removed AS (
+                DELETE FROM saved_search_results r
+                USING delta d
+                WHERE r.saved_search_id = :saved_search_id
+                  AND r.content_id = d.id
+                  AND d.id NOT IN (SELECT id FROM matched)
+            )
+            INSERT INTO saved_search_results (saved_search_id, content_id, user_id, relevance_score, similarity_score, score)
+            SELECT :saved_search_id, m.id, :user_id, m.relevance_score, m.similarity_score, {score_sql}
+            FROM matched m
+            ON CONFLICT (saved_search_id, content_id) DO UPDATE
+            SET relevance_score = EXCLUDED.relevance_score,
+                similarity_score = EXCLUDED.similarity_score,
+                score = EXCLUDED.score
+        """
+        db.execute(text(sql), params)
+        saved.last_refreshed_at = refreshed_at
+        db.commit()
+
+    @staticmethod
+    def refresh_for_user(db: Session, user_id: str) -> int:
+        """Incrementally refresh every materialized saved search of a user."""
+        saved_searches = db.query(SavedSearch).filter(
+            SavedSearch.user_id == user_id,
+            SavedSearch.materialized.is_(True),
+        ).all()
+        for saved in saved_searches:
+            SavedSearchService.refresh(db, saved)
+        return len(saved_searches)
+
+    @staticmethod
+    def get_results(
+        db: Session,
+        user_id: str,
+        search_id: UUID,
+        limit: int = 20,
+        offset: int = 0,
+        only_new: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the results of a saved search and mark it as viewed.
+
+        Materialized searches are read from `saved_search_results`;
+        others fall back to running the search live.
+        """
+        saved = db.query(SavedSearch).filter(SavedSearch.id == search_id, SavedSearch.user_id == user_id).first()
+        if not saved:
+            return None
+        
+        search_service = ContentSearchService(db, user_id=user_id)
+        if not saved.materialized:
+            result = search_service.search(
+                query=saved.query, mode=saved.mode, limit=limit, offset=offset,
+                **SavedSearchService._filter_kwargs(saved.filters),
+            )
+            for item in result['items']:
+                item['is_new'] = False
+            return {'items': result['items'], 'total': result['total'], 'new_count': 0, 'last_viewed_at': None}
+        
+        max_age = timedelta(seconds=settings.SAVED_SEARCH_REFRESH_INTERVAL_SECONDS)
+        if saved.last_refreshed_at is None or datetime.now(timezone.utc) - saved.last_refreshed_at > max_age:
+            SavedSearchService.refresh(db, saved)
+        
+        last_viewed_at = saved.last_viewed_at
+        params = {'saved_search_id': saved.id, 'limit': limit, 'offset': offset, 'since': last_viewed_at}
+        new_clause = "AND r.matched_at > :since" if only_new and last_viewed_at else ""
+        # Totals come with the page; only a page past the end needs a separate count
+        rows = db.execute(text(f"""
+            SELECT c.*, r.relevance_score AS r_relevance, r.similarity_score AS r_similarity,
+                   r.score AS r_score, r.matched_at AS r_matched_at,
+                   COUNT(*) OVER () AS r_total,
+                   COUNT(*) FILTER (WHERE CAST(:since AS timestamptz) IS NULL OR r.matched_at > :since) OVER () AS r_new_count
+            FROM saved_search_results r
+            JOIN content c ON c.id = r.content_id
+            WHERE r.saved_search_id = :saved_search_id {new_clause}
+            ORDER BY r.score DESC
+            LIMIT :limit OFFSET :offset
+        """), params).fetchall()
+        
+        if rows:
+            total, new_count = rows[0].r_total, rows[0].r_new_count
+        elif offset:
+            counts = db.execute(text(f"""
+                SELECT COUNT(*) AS total,
+                       COUNT(*) FILTER (WHERE CAST(:since AS timestamptz) IS NULL OR r.matched_at > :since) AS new_count
+                FROM saved_search_results r
+                WHERE r.saved_search_id = :saved_search_id {new_clause}
+            """), params).fetchone()
+            total, new_count = counts.total, counts.new_count
+        else:
+            total = new_count = 0
+        
+        items = []
+        for row in rows:
+            item = search_service._row_to_dict_with_scores(row, relevance=row.r_relevance, similarity=row.r_similarity)
+            item['combined_score'] = row.r_score
+            item['is_new'] = last_viewed_at is None or row.r_matched_at > last_viewed_at
+            items.append(item)
+        
+        saved.last_viewed_at = db.execute(text("SELECT now()")).scalar()
+        db.commit()
+        
+        return {
+            'items': items,
+            'total': total,
+            'new_count': new_count,
+            'last_viewed_at': last_viewed_at,
+        }
@@ -3,10 +3,10 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func, or_, and_
 from app.models.content import Content
 from app.services.content_extractor import ContentScraper
-from app.services.enrichment_service import enrichment_service
+from app.services.job_queue import JobQueue, ENRICH_CONTENT
 from app.utils.readability import analyze_readability
 from app.core.config import settings
-from fastapi import BackgroundTasks, HTTPException
+from fastapi import HTTPException
 from uuid import UUID
 from typing import Optional, List, Tuple
 from datetime import datetime
@@ -56,7 +56,12 @@ class ContentService:
         return normalized
 
     @staticmethod
-    async def create_from_url(db: Session, url: str, owner_id: str, background_tasks: BackgroundTasks = None) -> Content:
+    async def create_from_url(db: Session, url: str, owner_id: str) -> Content:
+        return ContentService.create_from_url_sync(db, url, owner_id)
+
+    @staticmethod
+    def create_from_url_sync(db: Session, url: str, owner_id: str) -> Content:
+        """Save a stub for the URL and queue its enrichment; for callers outside the event loop (bulk imports)."""
         # Normalize URL for duplicate checking
         normalized_url = ContentService.normalize_url(url)
         
@@ -74,27 +79,25 @@ class ContentService:
         # We use the raw URL as provided but the normalized one for future checks
         content = Content(
             source_url=normalized_url,
+            domain=urlparse(normalized_url).netloc,  # Column is NOT NULL; enrichment sets it again
             title="Processing...", # Placeholder title
             enrichment_status="pending",
             user_id=owner_id,
         )
         
         db.add(content)
+        db.flush()
+        
+        # Queue scraping and enrichment in the same transaction as the stub
+        JobQueue.enqueue(db, ENRICH_CONTENT, {'content_id': str(content.id)})
         db.commit()
         db.refresh(content)
         
-        # Trigger background scraping and enrichment
-        if background_tasks:
-            background_tasks.add_task(enrichment_service.enrich_content, str(content.id))
-        else:
-            # For testing/sync environments
-            enrichment_service.enrich_content(str(content.id))
-        
         return content
 
     @staticmethod
     def create_manual(db: Session, title: str, body: str, owner_id: str, source_url: Optional[str] = None, 
-                     tags: List[str] = None, notes: str = None, background_tasks: BackgroundTasks = None) -> Content:
+                     tags: List[str] = None, notes: str = None) -> Content:
         # Calculate word count
         word_count = len(body.split()) if body else 0
         
@@ -144,15 +147,13 @@ class ContentService:
         )
         
         db.add(content)
+        db.flush()
+        
+        # Queue enrichment in the same transaction as the content
+        JobQueue.enqueue(db, ENRICH_CONTENT, {'content_id': str(content.id)})
         db.commit()
         db.refresh(content)
         
-        # Trigger background enrichment
-        if background_tasks:
-            background_tasks.add_task(enrichment_service.enrich_content, str(content.id))
-        else:
-            enrichment_service.enrich_content(str(content.id))
-        
         return content
 
     @staticmethod
@@ -329,7 +330,7 @@ class ContentService:
         return export_data
 
     @staticmethod
-    def trigger_enrichment(db: Session, content_id: UUID, owner_id: str, background_tasks: BackgroundTasks = None) -> Content:
+    def trigger_enrichment(db: Session, content_id: UUID, owner_id: str) -> Content:
         content = db.query(Content).filter(Content.id == content_id, Content.user_id == owner_id).first()
         if not content:
             raise ContentNotFoundError(f"Content {content_id} not found")
@@ -337,14 +338,9 @@ class ContentService:
         # Reset enrichment status
         content.enrichment_status = "enriching"
         content.enrichment_error = None
+        JobQueue.enqueue(db, ENRICH_CONTENT, {'content_id': str(content.id)})
         db.commit()
         
-        # Trigger background enrichment
-        if background_tasks:
-            background_tasks.add_task(enrichment_service.enrich_content, str(content.id))
-        else:
-            enrichment_service.enrich_content(str(content.id))
-        
         return content
 
     @staticmethod
@@ -0,0 +1,137 @@
+"""
+Content-hash embedding cache.
+
+Re-enriching unchanged content, or saving an article that another user has
+already saved, used to run the model again for identical text. Vectors are
+cached in the `embedding_cache` table keyed by the SHA-256 of the
+whitespace-normalized text plus the model identifier (model name and
+backend, since quantized backends give slightly different vectors).
+
+Lookups and writes use their own short-lived session so callers running in
+worker threads never share a session. Cache failures are logged and treated
+as misses. Hits and misses are counted in `app.core.metrics`.
+"""
+
+import hashlib
+import logging
+from typing import Callable, Dict, List, Optional, Sequence
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.embedding import EmbeddingCacheEntry
+
+
+logger = logging.getLogger(__name__)
+
+cache_hits = metrics.counter("embedding_cache_hits_total", "Texts whose embedding was served from the cache")
+cache_misses = metrics.counter("embedding_cache_misses_total", "Texts that had to be embedded by the model")
+
+
+def normalize_text(value: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return " ".join((value or "").split())
+
+
+def text_hash(value: str) -> str:
+    return hashlib.sha256(normalize_text(value).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Postgres-backed cache of text embeddings.
+
+    Args:
+        session_factory: Callable returning a new Session (defaults to SessionLocal)
+    """
+
+    def __init__(self, session_factory: Optional[Callable] = None):
+        self._session_factory = session_factory
+
+    @staticmethod
+    def model_key(model_name: Optional[str] = None) -> str:
+        return f"{model_name or settings.EMBEDDING_MODEL}:{settings.EMBEDDING_BACKEND}"
+
+    def get_many(self, texts: Sequence[str], model_name: Optional[str] = None) -> Dict[str, List[float]]:
+        """Return cached vectors for the given texts, keyed by text hash."""
+        hashes = list({text_hash(t) for t in texts})
+        if not hashes:
+            return {}
+        db = self._session()
+        try:
+            rows = db.query(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.embedding).filter(
+                EmbeddingCacheEntry.model == self.model_key(model_name),
+                EmbeddingCacheEntry.text_hash.in_(hashes),
+            ).all()
+            return {row.text_hash: _to_list(row.embedding) for row in rows}
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+        finally:
+            db.close()
+
+    def put_many(self, entries: Dict[str, List[float]], model_name: Optional[str] = None) -> None:
+        """Store vectors keyed by text hash. Existing entries are kept."""
+        if not entries:
+            return
+        db = self._session()
+        try:
+            model = self.model_key(model_name)
+            db.execute(
+                insert(EmbeddingCacheEntry.__table__)
+                .values([{'text_hash': h, 'model': model, 'embedding': vector} for h, vector in entries.items()])
+                .on_conflict_do_nothing(index_elements=['text_hash', 'model'])
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def embed(
+        self,
+        texts: List[str],
+        encode_fn: Callable[[List[str]], Sequence[Sequence[float]]],
+        model_name: Optional[str] = None,
+    ) -> List[List[float]]:
+        """
+        Embed texts, calling encode_fn only for those not in the cache.
+
+        Args:
+            texts: Texts to embed
+            encode_fn: Embeds a list of texts (the cache misses), in order
+            model_name: Model encode_fn uses (defaults to settings.EMBEDDING_MODEL)
+
+        Returns:
+            One vector per input text, in order
+        """
+        hashes = [text_hash(t) for t in texts]
+        cached = self.get_many(texts, model_name) if settings.EMBEDDING_CACHE_ENABLED else {}
+
+        missing = [i for i, h in enumerate(hashes) if h not in cached]
+        cache_hits.inc(len(texts) - len(missing))
+        cache_misses.inc(len(missing))
+
+        computed: Dict[str, List[float]] = {}
+        if missing:
+            vectors = encode_fn([texts[i] for i in missing])
+            for i, vector in zip(missing, vectors):
+                computed[hashes[i]] = _to_list(vector)
+            if settings.EMBEDDING_CACHE_ENABLED:
+                self.put_many(computed, model_name)
+
+        return [cached.get(h) or computed[h] for h in hashes]
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+
+def _to_list(vector) -> List[float]:
+    return vector.tolist() if hasattr(vector, 'tolist') else list(vector)
+
+
+# Singleton instance
+embedding_cache = EmbeddingCache()
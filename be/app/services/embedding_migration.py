@@ -0,0 +1,493 @@
+"""
+Embedding Model Migrations.
+
+Vectors from different models can't be compared, so changing EMBEDDING_MODEL
+used to leave every stored embedding silently incompatible with new query
+vectors. A migration re-embeds all content with the target model into shadow
+columns (`content.embedding_next`, `content_chunks.embedding_next`) while
+search keeps serving the current vectors, then swaps the columns in a single
+transaction once every embedded row is covered:
+
+    python -m app.services.embedding_migration start --model <name>
+    python -m app.services.embedding_migration run        # resumable
+    python -m app.services.embedding_migration status
+    python -m app.services.embedding_migration finalize   # drop the old vectors
+    python -m app.services.embedding_migration abort      # before cutover only
+
+The backfill walks content in id order in batches of
+EMBEDDING_MIGRATION_BATCH_SIZE, pausing EMBEDDING_MIGRATION_THROTTLE_SECONDS
+between batches, and checkpoints its position in `embedding_migrations` in
+the same transaction as each batch, so a killed `run` resumes where it
+stopped. Content edited during the backfill is picked up by the next pass
+(`embedding_next_at` records which version of a row was embedded, i.e. its
+`updated_at`; the content trigger leaves `updated_at` alone for updates that
+only write vector columns, so storing a vector does not make a row stale again).
+
+The migration row also records which model produced the live vectors:
+`active_embedding_service()` follows the latest cutover, re-read every
+EMBEDDING_ACTIVE_MODEL_TTL_SECONDS, so running processes switch query
+embedding without a restart. Rows written by a process that had not yet
+noticed the cutover are re-embedded by a catch-up pass after the swap.
+"""
+
+import argparse
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.embedding import EmbeddingMigration
+from app.services.embedding_service import EmbeddingService
+
+
+logger = logging.getLogger(__name__)
+
+# (checked at, model name, dimension) of the live vectors
+_active: Optional[Tuple[float, str, int]] = None
+_active_lock = threading.Lock()
+
+
+def active_embedding_model() -> Tuple[str, int]:
+    """
+    Model name and dimension of the vectors search currently runs against.
+
+    The target of the latest migration that reached cutover, or
+    settings.EMBEDDING_MODEL if there was none. Cached for
+    EMBEDDING_ACTIVE_MODEL_TTL_SECONDS; on lookup failure the last known
+    value (or the configured model) is used.
+    """
+    global _active
+    cached = _active
+    now = time.monotonic()
+    if cached and now - cached[0] < settings.EMBEDDING_ACTIVE_MODEL_TTL_SECONDS:
+        return cached[1], cached[2]
+
+    with _active_lock:
+        cached = _active
+        if cached and now - cached[0] < settings.EMBEDDING_ACTIVE_MODEL_TTL_SECONDS:
+            return cached[1], cached[2]
+        model, dimension = cached[1:] if cached else (settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSION)
+        db = SessionLocal()
+        try:
+            row = db.query(EmbeddingMigration.target_model, EmbeddingMigration.dimension).filter(
+                EmbeddingMigration.cutover_at.isnot(None),
+            ).order_by(EmbeddingMigration.cutover_at.desc()).first()
+            if row:
+                model, dimension = row.target_model, row.dimension
+            else:
+                model, dimension = settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSION
+        except Exception as e:
+            logger.warning(f"Active embedding model lookup failed, using {model}: {e}")
+        finally:
+            db.close()
+        _active = (now, model, dimension)
+        return model, dimension
+
+
+def active_embedding_service() -> EmbeddingService:
+    """EmbeddingService for the model behind the live vectors; use it for every query and write."""
+    return EmbeddingService.for_model(active_embedding_model()[0])
+
+
+class MigrationError(Exception):
+    """The requested migration step is not possible in the current state."""
+
+
+class EmbeddingMigrationService:
+    """Backfill, cutover and cleanup of an embedding model migration."""
+
+    # Live vector indexes and their shadow counterparts; {col} and {dim} are
+    # filled in for the shadow column. Quantized indexes exist only where
+    # app.services.vector_index built them; missing live indexes are skipped.
+    INDEXES = [
+        ('content', 'idx_content_embedding_hnsw', 'idx_content_embedding_next_hnsw',
+         "USING hnsw ({col} vector_cosine_ops) WITH (m = 16, ef_construction = 64)"),
+        ('content', 'idx_content_embedding_halfvec_hnsw', 'idx_content_embedding_next_halfvec_hnsw',
+         "USING hnsw (({col}::halfvec({dim})) halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)"),
+        ('content', 'idx_content_embedding_binary_hnsw', 'idx_content_embedding_next_binary_hnsw',
+         "USING hnsw ((binary_quantize({col})::bit({dim})) bit_hamming_ops) WITH (m = 16, ef_construction = 64)"),
+        ('content_chunks', 'idx_content_chunks_embedding_hnsw', 'idx_content_chunks_embedding_next_hnsw',
+         "USING hnsw ({col} vector_cosine_ops) WITH (m = 16, ef_construction = 64)"),
+    ]
+
+    # Passes over the table before giving up on reaching full coverage
+    MAX_PASSES = 20
+    CUTOVER_ATTEMPTS = 5
+
+    def __init__(self, db: Optional[Session] = None):
+        self.db = db or SessionLocal()
+
+    def _bypass_rls(self) -> None:
+        # The session may get a different pooled connection after each commit
+        self.db.execute(text("SET SESSION app.bypass_rls = 'on'"))
+
+    def current(self) -> Optional[EmbeddingMigration]:
+        """The migration holding shadow or previous vectors, if any."""
+        return self.db.query(EmbeddingMigration).filter(
+            EmbeddingMigration.status.in_(('backfilling', 'complete')),
+        ).order_by(EmbeddingMigration.started_at.desc()).first()
+
+    def start(self, target_model: str) -> EmbeddingMigration:
+        """
+        Register a migration to target_model and add the shadow columns.
+
+        Adding nullable columns is a catalog-only change, so this does not
+        rewrite or block the tables for longer than the brief ALTER lock.
+        """
+        if self.current():
+            raise MigrationError("Another migration is in progress; finalize or abort it first")
+        if target_model == active_embedding_model()[0]:
+            raise MigrationError(f"{target_model} is already the active model")
+
+        dimension = EmbeddingService.for_model(target_model).dimension
+        self._bypass_rls()
+        self.db.execute(text("SET LOCAL lock_timeout = '5s'"))
+        self.db.execute(text(f"ALTER TABLE content ADD COLUMN embedding_next vector({dimension})"))
+        self.db.execute(text("ALTER TABLE content ADD COLUMN embedding_next_at timestamptz"))
+        self.db.execute(text(f"ALTER TABLE content_chunks ADD COLUMN embedding_next vector({dimension})"))
+        migration = EmbeddingMigration(
+            target_model=target_model,
+            dimension=dimension,
+            total=self.db.execute(text("SELECT count(*) FROM content WHERE embedding IS NOT NULL")).scalar(),
+        )
+        self.db.add(migration)
+        self.db.commit()
+        logger.info(f"Started embedding migration {migration.id} to {target_model} ({dimension} dims)")
+        return migration
+
+    def run(self, cutover: bool = True) -> EmbeddingMigration:
+        """
+        Backfill the shadow columns, then (with cutover) build their indexes and swap them in.
+
+        Safe to interrupt and re-run at any point.
+        """
+        migration = self.current()
+        if migration is None:
+            raise MigrationError("No migration in progress")
+        service = EmbeddingService.for_model(migration.target_model)
+
+        if migration.status == 'backfilling':
+            for _ in range(self.MAX_PASSES):
+                self._backfill_pass(migration, service)
+                if self._stale_count() <= settings.EMBEDDING_MIGRATION_BATCH_SIZE:
+                    break
+            if not cutover:
+                return migration
+            self._build_indexes(migration)
+            for attempt in range(1, self.CUTOVER_ATTEMPTS + 1):
+                if self._cutover(migration, service):
+                    break
+                logger.warning(f"Cutover attempt {attempt} did not complete, catching up and retrying")
+                self._backfill_pass(migration, service)
+            else:
+                raise MigrationError("Cutover did not complete; run again")
+
+        self._catch_up(migration, service)
+        return migration
+
+    def finalize(self) -> EmbeddingMigration:
+        """Drop the previous model's vectors after a cutover."""
+        migration = self.current()
+        if migration is None or migration.status != 'complete':
+            raise MigrationError("Only a migration that has been cut over can be finalized")
+        self._bypass_rls()
+        self.db.execute(text("ALTER TABLE content DROP COLUMN embedding_prev, DROP COLUMN embedding_next_at"))
+        self.db.execute(text("ALTER TABLE content_chunks DROP COLUMN embedding_prev"))
+        # Was nullable while chunks without a shadow vector could still be written
+        self.db.execute(text("ALTER TABLE content_chunks ALTER COLUMN embedding SET NOT NULL"))
+        migration.status = 'finalized'
+        migration.finished_at = self.db.execute(text("SELECT now()")).scalar()
+        self.db.commit()
+        logger.info(f"Finalized embedding migration {migration.id}")
+        return migration
+
+    def abort(self) -> EmbeddingMigration:
+        """
+        Drop the shadow columns of a migration that has not been cut over.
+
+        To go back after a cutover, migrate to the previous model instead.
+        """
+        migration = self.current()
+        if migration is None or migration.status != 'backfilling':
+            raise MigrationError("Only a migration that has not been cut over can be aborted")
+        self._bypass_rls()
+        self.db.execute(text("ALTER TABLE content DROP COLUMN embedding_next, DROP COLUMN embedding_next_at"))
+        self.db.execute(text("ALTER TABLE content_chunks DROP COLUMN embedding_next"))
+        migration.status = 'aborted'
+        migration.finished_at = self.db.execute(text("SELECT now()")).scalar()
+        self.db.commit()
+        logger.info(f"Aborted embedding migration {migration.id}")
+        return migration
+
+    def status(self) -> Dict[str, object]:
+        """Progress of the current (or latest) migration."""
+        migration = self.current() or self.db.query(EmbeddingMigration).order_by(
+            EmbeddingMigration.started_at.desc()).first()
+        if migration is None:
+            return {'active_model': active_embedding_model()[0], 'migration': None}
+        report = {
+            'active_model': active_embedding_model()[0],
+            'migration': str(migration.id),
+            'target_model': migration.target_model,
+            'status': migration.status,
+            'processed': migration.processed,
+            'total': migration.total,
+        }
+        if migration.status == 'backfilling':
+            self._bypass_rls()
+            total = self.db.execute(text("SELECT count(*) FROM content WHERE embedding IS NOT NULL")).scalar()
+            stale = self._stale_count()
+            report['coverage'] = round(1 - stale / total, 4) if total else 1.0
+            self.db.rollback()
+        return report
+
+    # --- backfill ---------------------------------------------------------
+
+    _STALE = """
+        c.embedding IS NOT NULL
+        AND (
+            c.embedding_next_at IS DISTINCT FROM c.updated_at
+            OR EXISTS (SELECT 1 FROM content_chunks ch WHERE ch.content_id = c.id AND ch.embedding_next IS NULL)
+        )
+    """
+
+    def _stale_count(self) -> int:
+        self._bypass_rls()
+        count = self.db.execute(text(f"SELECT count(*) FROM content c WHERE {self._STALE}")).scalar()
+        self.db.commit()
+        return count
+
+    def _stale_ids(self, after: Optional[UUID], limit: Optional[int]) -> List[UUID]:
+        sql = f"SELECT c.id FROM content c WHERE {self._STALE}"
+        params = {}
+        if after is not None:
+            sql += " AND c.id > :after"
+            params['after'] = after
+        sql += " ORDER BY c.id"
+        if limit is not None:
+            sql += " LIMIT :limit"
+            params['limit'] = limit
+        return [row.id for row in self.db.execute(text(sql), params)]
+
+    def _backfill_pass(self, migration: EmbeddingMigration, service: EmbeddingService) -> None:
+        """One keyset walk over stale content, resuming from the checkpoint."""
+        while True:
+            self._bypass_rls()
+            ids = self._stale_ids(migration.last_content_id, settings.EMBEDDING_MIGRATION_BATCH_SIZE)
+            if not ids:
+                break
+            self._embed_contents(ids, service, 'embedding_next')
+            migration.last_content_id = ids[-1]
+            migration.processed += len(ids)
+            self.db.commit()
+            logger.info(f"Embedding migration {migration.id}: {migration.processed} rows re-embedded")
+            time.sleep(settings.EMBEDDING_MIGRATION_THROTTLE_SECONDS)
+
+        # Start the next pass from the beginning
+        migration.last_content_id = None
+        self.db.commit()
+
+    def _embed_contents(self, ids: List[UUID], service: EmbeddingService, column: str) -> None:
+        """
+        Re-embed content rows and their stored chunks into `column` (caller commits).
+
+        Existing chunk texts are re-embedded rather than re-chunked, so the
+        passage rows stay the same; the document vector is pooled from them as
+        in `EmbeddingService.embed_document`. Content without chunks gets its
+        title embedded. With the shadow column, the embedded row version is
+        recorded in `embedding_next_at`.
+        """
+        contents = self.db.execute(
+            text("SELECT id, title, updated_at FROM content WHERE id = ANY(:ids)"), {'ids': ids}
+        ).fetchall()
+        chunks = self.db.execute(text("""
+            SELECT ch.id, ch.content_id, ch.text FROM content_chunks ch
+            WHERE ch.content_id = ANY(:ids)
+            ORDER BY ch.content_id, ch.chunk_index
+        """), {'ids': ids}).fetchall()
+        titles = {row.id: (row.title or "").strip() for row in contents}
+
+        # Every chunk of the batch is embedded in one call
+        chunk_vectors = service.embed_passages([
+            service.passage_text(titles.get(chunk.content_id, ""), chunk.text) for chunk in chunks
+        ])
+        by_content = defaultdict(list)
+        for chunk, vector in zip(chunks, chunk_vectors):
+            by_content[chunk.content_id].append(vector)
+
+        vectors = {content_id: service.pool(np.vstack(v)) for content_id, v in by_content.items()}
+        untitled = [row.id for row in contents if row.id not in by_content]
+        vectors.update(zip(untitled, service.embed_batch_array([titles[i] for i in untitled])))
+
+        if chunks:
+            self.db.execute(
+                text(f"UPDATE content_chunks SET {column} = :embedding WHERE id = :id"),
+                [{'id': chunk.id, 'embedding': vector} for chunk, vector in zip(chunks, chunk_vectors)],
+            )
+        if column == 'embedding_next':
+            update_sql = "UPDATE content SET embedding_next = :embedding, embedding_next_at = :version WHERE id = :id"
+        else:
+            update_sql = f"UPDATE content SET {column} = :embedding WHERE id = :id"
+        self.db.execute(text(update_sql), [
+            {'id': row.id, 'embedding': vectors[row.id], 'version': row.updated_at}
+            for row in contents
+        ])
+
+    def _build_indexes(self, migration: EmbeddingMigration) -> None:
+        """Build the shadow column indexes without blocking writes."""
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for table, live_name, next_name, using in self.INDEXES:
+                exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {'name': live_name}).scalar()
+                if not exists:
+                    continue
+                valid = conn.execute(text("""
+                    SELECT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(:name)
+                """), {'name': next_name}).scalar()
+                if valid:
+                    continue
+                # An interrupted concurrent build leaves an invalid index behind
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {next_name}"))
+                logger.info(f"Building {next_name}")
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY {next_name} ON {table} "
+                    + using.format(col='embedding_next', dim=migration.dimension)
+                ))
+
+    # --- cutover ----------------------------------------------------------
+
+    def _cutover(self, migration: EmbeddingMigration, service: EmbeddingService) -> bool:
+        """
+        Swap the shadow columns in, in one transaction.
+
+        Writes to content, chunks and saved searches are blocked while the
+        last stale rows are embedded and the columns and indexes renamed.
+        Returns False (with nothing changed) if the locks are not granted in
+        time or too many rows went stale meanwhile.
+        """
+        self._bypass_rls()
+        # Saved query vectors are embedded before taking any lock
+        saved_sql = text("SELECT id, query FROM saved_searches WHERE query_embedding IS NOT NULL")
+        saved = self.db.execute(saved_sql).fetchall()
+        saved_vectors = dict(zip((row.id for row in saved), service.embed_batch_array([row.query for row in saved])))
+
+        try:
+            self.db.execute(
+                text("SELECT set_config('lock_timeout', :timeout, true)"),
+                {'timeout': f"{settings.EMBEDDING_MIGRATION_LOCK_TIMEOUT_MS}ms"},
+            )
+            self.db.execute(text("LOCK TABLE content, content_chunks, saved_searches IN SHARE ROW EXCLUSIVE MODE"))
+
+            stale = self._stale_ids(None, settings.EMBEDDING_MIGRATION_BATCH_SIZE + 1)
+            if len(stale) > settings.EMBEDDING_MIGRATION_BATCH_SIZE:
+                self.db.rollback()
+                return False
+            if stale:
+                self._embed_contents(stale, service, 'embedding_next')
+
+            for table in ('content', 'content_chunks'):
+                self.db.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding TO embedding_prev"))
+                self.db.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding_next TO embedding"))
+            # New chunks are only written with the live column from now on
+            self.db.execute(text("ALTER TABLE content_chunks ALTER COLUMN embedding_prev DROP NOT NULL"))
+            for _, live_name, next_name, _ in self.INDEXES:
+                prev_name = live_name.replace('_embedding_', '_embedding_prev_', 1)
+                self.db.execute(text(f"ALTER INDEX IF EXISTS {live_name} RENAME TO {prev_name}"))
+                self.db.execute(text(f"ALTER INDEX IF EXISTS {next_name} RENAME TO {live_name}"))
+
+            saved = self.db.execute(saved_sql).fetchall()
+            created = [row for row in saved if row.id not in saved_vectors]
+            saved_vectors.update(zip((row.id for row in created), service.embed_batch_array([row.query for row in created])))
+            if saved:
+                # Materialized results are rescored in full on their next refresh
+                self.db.execute(
+                    text("UPDATE saved_searches SET query_embedding = :embedding, last_refreshed_at = NULL WHERE id = :id"),
+                    [{'id': row.id, 'embedding': saved_vectors[row.id]} for row in saved],
+                )
+
+            migration.status = 'complete'
+            migration.cutover_at = self.db.execute(text("SELECT now()")).scalar()
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            if 'lock timeout' in str(e).lower():
+                return False
+            raise
+
+        logger.info(f"Embedding migration {migration.id} cut over to {migration.target_model}")
+        return True
+
+    def _catch_up(self, migration: EmbeddingMigration, service: EmbeddingService) -> None:
+        """
+        Re-embed content written around the cutover by processes still on the old model.
+
+        Waits until every process has re-read the active model, then
+        re-embeds rows updated since shortly before the cutover.
+        """
+        ttl = settings.EMBEDDING_ACTIVE_MODEL_TTL_SECONDS
+        wait = migration.cutover_at.timestamp() + 2 * ttl - time.time()
+        if wait > 0:
+            time.sleep(wait)
+
+        after = None
+        while True:
+            self._bypass_rls()
+            sql = """
+                SELECT id FROM content
+                WHERE embedding IS NOT NULL
+                  AND updated_at > :since - make_interval(secs => :ttl)
+            """
+            params = {'since': migration.cutover_at, 'ttl': ttl, 'limit': settings.EMBEDDING_MIGRATION_BATCH_SIZE}
+            if after is not None:
+                sql += " AND id > :after"
+                params['after'] = after
+            ids = [row.id for row in self.db.execute(text(sql + " ORDER BY id LIMIT :limit"), params)]
+            if not ids:
+                break
+            self._embed_contents(ids, service, 'embedding')
+            self.db.commit()
+            after = ids[-1]
+            time.sleep(settings.EMBEDDING_MIGRATION_THROTTLE_SECONDS)
+        self.db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed all content with a new embedding model")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    start_parser = subparsers.add_parser("start", help="register a migration and add the shadow columns")
+    start_parser.add_argument("--model", required=True, help="sentence-transformers model to migrate to")
+    run_parser = subparsers.add_parser("run", help="backfill (resumable), then cut over")
+    run_parser.add_argument("--no-cutover", action="store_true", help="stop after the backfill")
+    subparsers.add_parser("status", help="show progress")
+    subparsers.add_parser("finalize", help="drop the previous model's vectors")
+    subparsers.add_parser("abort", help="drop the shadow columns of an unfinished migration")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = EmbeddingMigrationService()
+    try:
+        if args.command == "start":
+            service.start(args.model)
+        elif args.command == "run":
+            service.run(cutover=not args.no_cutover)
+        elif args.command == "finalize":
+            service.finalize()
+        elif args.command == "abort":
+            service.abort()
+        for key, value in service.status().items():
+            print(f"{key}: {value}")
+    except MigrationError as e:
+        raise SystemExit(str(e))
+    finally:
+        service.db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Process pool for embedding inference.
+
+With EMBEDDING_WORKERS > 0, EmbeddingService runs tokenization, chunking
+and model.encode in dedicated worker processes instead of the API process,
+so CPU-bound inference no longer competes with request handling for the
+GIL. Workers are started with the "spawn" method (forking a process that
+runs threads, or a loaded inference runtime, is unsafe) and each loads the
+model once, in its initializer.
+
+Vectors come back through shared memory: the caller allocates a float32
+buffer of the result shape, the worker writes the `model.encode` output
+into it, and only the buffer name and shape cross the process boundary.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Model loaded by the initializer of each worker process
+_worker_model = None
+
+
+def _init_worker(model_name: str) -> None:
+    global _worker_model
+    from app.services.embedding_service import EmbeddingService
+    _worker_model = EmbeddingService.load_model(model_name)
+
+
+def _model_dimension() -> int:
+    return _worker_model.get_sentence_embedding_dimension()
+
+
+def _encode_into(buffer_name: str, shape: Tuple[int, int], texts: List[str], kwargs: Dict[str, Any]) -> None:
+    buffer = shared_memory.SharedMemory(name=buffer_name)
+    try:
+        out = np.ndarray(shape, dtype=np.float32, buffer=buffer.buf)
+        out[:] = _worker_model.encode(texts, convert_to_numpy=True, **kwargs)
+        # Release the view before closing, or close() fails on the exported buffer
+        del out
+    finally:
+        buffer.close()
+
+
+def _chunk_document(title: str, body: Optional[str]) -> Tuple[List[str], List[int]]:
+    from app.services.embedding_service import EmbeddingService
+    return EmbeddingService.chunk_document(_worker_model, title, body)
+
+
+class EmbeddingProcessPool:
+    """
+    Worker processes that each hold one copy of a model.
+
+    Args:
+        model_name: Model the workers load
+        workers: Number of worker processes
+    """
+
+    def __init__(self, model_name: str, workers: int):
+        self.model_name = model_name
+        self.workers = workers
+        self._dimension: Optional[int] = None
+        self._restart_lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self) -> ProcessPoolExecutor:
+        logger.info(f"Starting {self.workers} embedding worker processes for {self.model_name}")
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name,),
+        )
+
+    def _call(self, fn, *args):
+        executor = self._executor
+        try:
+            return executor.submit(fn, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); replace the pool for later calls
+            self._restart(executor)
+            raise
+
+    def _restart(self, failed: ProcessPoolExecutor) -> None:
+        """Replace a broken pool once, however many concurrent callers saw it fail."""
+        with self._restart_lock:
+            if self._executor is not failed:
+                return
+            logger.error("Embedding worker process died, restarting the pool")
+            failed.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._start()
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            self._dimension = self._call(_model_dimension)
+        return self._dimension
+
+    def warm_up(self) -> None:
+        """Make every worker load its model now rather than on its first task."""
+        for future in [self._executor.submit(_model_dimension) for _ in range(self.workers)]:
+            self._dimension = future.result()
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Encode texts in a worker; returns a (len(texts), dimension) float32 array."""
+        shape = (len(texts), self.dimension)
+        buffer = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * 4))
+        try:
+            self._call(_encode_into, buffer.name, shape, list(texts), kwargs)
+            view = np.ndarray(shape, dtype=np.float32, buffer=buffer.buf)
+            result = view.copy()
+            del view
+            return result
+        finally:
+            buffer.close()
+            buffer.unlink()
+
+    def chunk_document(self, title: str, body: Optional[str]) -> Tuple[List[str], List[int]]:
+        """Run `EmbeddingService.chunk_document` with the worker's tokenizer."""
+        return self._call(_chunk_document, title, body)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
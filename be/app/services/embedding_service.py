@@ -2,12 +2,27 @@
 Embedding Service using sentence-transformers.
 
 This service generates 384-dimensional embeddings using the all-MiniLM-L6-v2 model,
-which runs locally and requires no API key.
+which runs locally and requires no API key. The model runs on PyTorch by default,
+or on ONNX Runtime (optionally int8-quantized) via `EMBEDDING_BACKEND`. With
+`EMBEDDING_WORKERS` set, inference runs in a pool of worker processes
+(see `embedding_pool`) instead of the calling process.
 """
 
+import logging
+import os
+import threading
+import time
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.utils.chunking import chunk_text
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_pool import EmbeddingProcessPool
+from app.services.embedding_cache import embedding_cache
+
+
+logger = logging.getLogger(__name__)
 
 
 class EmbeddingService:
@@ -16,45 +31,229 @@ class EmbeddingService:
     
     Uses the all-MiniLM-L6-v2 model which produces 384-dimensional embeddings.
     This model runs locally and is optimized for semantic search.
+    
+    There is one instance per model (see `for_model`); `embedding_service` is
+    the one for settings.EMBEDDING_MODEL.
     """
     
-    # Singleton instance
-    _instance = None
-    _model = None
+    # Instances by model name
+    _instances: Dict[str, "EmbeddingService"] = {}
+    _instances_lock = threading.Lock()
+    # Caps concurrent model.encode calls across threads and models (EMBEDDING_MAX_CONCURRENCY)
+    _inference_slots = threading.BoundedSemaphore(max(1, settings.EMBEDDING_MAX_CONCURRENCY))
     
     # Embedding dimension for all-MiniLM-L6-v2
     EMBEDDING_DIMENSION = 384
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    # Backend name -> (sentence-transformers backend, default ONNX file)
+    BACKENDS = {
+        'torch': ('torch', None),
+        'onnx': ('onnx', 'onnx/model.onnx'),
+        # Dynamic int8 quantization for AVX2 CPUs, published alongside the model
+        'onnx-int8': ('onnx', 'onnx/model_quint8_avx2.onnx'),
+    }
+    
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self._model = None
+        self._model_lock = threading.Lock()
+        # Worker processes used instead of self._model when EMBEDDING_WORKERS > 0
+        self._pool = None
+        self._batcher = None
+        self._batcher_lock = threading.Lock()
+        # Warm-up state reported by /health
+        self._warm = False
+        self._warmup_ms = None
+    
+    @classmethod
+    def for_model(cls, model_name: str) -> "EmbeddingService":
+        """Return the shared instance for a model, creating it on first use."""
+        with cls._instances_lock:
+            if model_name not in cls._instances:
+                cls._instances[model_name] = cls(model_name)
+            return cls._instances[model_name]
     
     def _get_model(self):
-        """Lazy-load the model on first use."""
+        """Lazy-load the model on first use. Concurrent first calls load it only once."""
         if self._model is None:
-            # Using all-MiniLM-L6-v2 - a fast, lightweight model with 384 dimensions
-            self._model = SentenceTransformer('all-MiniLM-L6-v2')
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self.load_model(self.model_name)
         return self._model
     
+    def _get_pool(self) -> EmbeddingProcessPool:
+        """Lazily start the worker processes (EMBEDDING_WORKERS > 0)."""
+        if self._pool is None:
+            with self._model_lock:
+                if self._pool is None:
+                    self._pool = EmbeddingProcessPool(self.model_name, settings.EMBEDDING_WORKERS)
+        return self._pool
+    
+    @property
+    def dimension(self) -> int:
+        """Size of the vectors this model produces."""
+        if settings.EMBEDDING_WORKERS > 0:
+            return self._get_pool().dimension
+        return self._get_model().get_sentence_embedding_dimension()
+    
+    def _encode(self, texts, **kwargs) -> np.ndarray:
+        """
+        Run model.encode while holding one of the inference slots.
+        
+        With worker processes, the pool size bounds concurrency instead and the
+        float32 result is copied out of shared memory.
+        """
+        if settings.EMBEDDING_WORKERS > 0:
+            return self._get_pool().encode(list(texts), **kwargs)
+        model = self._get_model()
+        with self._inference_slots:
+            return model.encode(texts, convert_to_numpy=True, **kwargs)
+    
+    def preload(self) -> None:
+        """
+        Load the model weights without running inference.
+        
+        Meant to run in the server's master process before workers are forked
+        (gunicorn `preload_app`), so all workers share the weight pages
+        copy-on-write. Inference is deliberately left to `warm_up` in each
+        worker: thread pools started before fork do not survive it. Nothing is
+        loaded with EMBEDDING_WORKERS set, since the worker processes load the
+        model themselves.
+        """
+        if settings.EMBEDDING_WORKERS > 0:
+            return
+        start = time.time()
+        self._get_model()
+        logger.info(f"Preloaded embedding model {self.model_name} ({settings.EMBEDDING_BACKEND}) in {time.time() - start:.1f}s")
+    
+    def warm_up(self) -> None:
+        """Load the model if needed and run a warm-up batch through the micro-batcher."""
+        start = time.time()
+        if settings.EMBEDDING_WORKERS > 0:
+            self._get_pool().warm_up()
+        self._encode(["warm up"] * 4 + ["a longer warm-up sentence " * 20])
+        self.embed("warm up")
+        self._warmup_ms = int((time.time() - start) * 1000)
+        self._warm = True
+        logger.info(f"Embedding model warm in {self._warmup_ms}ms (pid {os.getpid()})")
+    
+    def status(self) -> Dict[str, Any]:
+        """Model readiness for health checks."""
+        return {
+            'model': self.model_name,
+            'backend': settings.EMBEDDING_BACKEND,
+            'loaded': self._model is not None or self._pool is not None,
+            'workers': settings.EMBEDDING_WORKERS,
+            'warm': self._warm,
+            'warmup_ms': self._warmup_ms,
+        }
+    
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        """Worker threads don't survive fork: start fresh batchers in the child."""
+        cls._instances_lock = threading.Lock()
+        cls._inference_slots = threading.BoundedSemaphore(max(1, settings.EMBEDDING_MAX_CONCURRENCY))
+        for service in cls._instances.values():
+            # The parent's worker processes and their manager thread belong to the parent
+            service._pool = None
+            service._batcher = None
+            service._batcher_lock = threading.Lock()
+            service._model_lock = threading.Lock()
+            service._warm = False
+            service._warmup_ms = None
+    
+    @staticmethod
+    def load_model(
+        model_name: Optional[str] = None,
+        backend: Optional[str] = None,
+        onnx_file: Optional[str] = None,
+    ) -> SentenceTransformer:
+        """
+        Load a SentenceTransformer on the configured inference backend.
+        
+        Args:
+            model_name: Model to load (defaults to settings.EMBEDDING_MODEL)
+            backend: "torch", "onnx" or "onnx-int8" (defaults to settings.EMBEDDING_BACKEND)
+            onnx_file: ONNX file inside the model repo (defaults to
+                settings.EMBEDDING_ONNX_FILE, then the backend's default file)
+            
+        Returns:
+            The loaded model
+        """
+        model_name = model_name or settings.EMBEDDING_MODEL
+        backend = backend or settings.EMBEDDING_BACKEND
+        if backend not in EmbeddingService.BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}'. Expected one of: {', '.join(EmbeddingService.BACKENDS)}")
+        
+        st_backend, default_file = EmbeddingService.BACKENDS[backend]
+        num_threads = EmbeddingService.inference_threads()
+        if st_backend == 'torch':
+            import torch
+            torch.set_num_threads(num_threads)
+            return SentenceTransformer(model_name)
+        
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = num_threads
+        file_name = onnx_file or settings.EMBEDDING_ONNX_FILE or default_file
+        return SentenceTransformer(
+            model_name,
+            backend=st_backend,
+            model_kwargs={'file_name': file_name, 'session_options': session_options},
+        )
+    
+    @staticmethod
+    def inference_threads() -> int:
+        """
+        Intra-op threads per encode call.
+        
+        EMBEDDING_NUM_THREADS if set, otherwise the cores split evenly between the
+        EMBEDDING_MAX_CONCURRENCY inference slots (or the EMBEDDING_WORKERS worker
+        processes), so concurrent encodes don't oversubscribe the CPU.
+        """
+        if settings.EMBEDDING_NUM_THREADS:
+            return settings.EMBEDDING_NUM_THREADS
+        concurrency = settings.EMBEDDING_WORKERS or settings.EMBEDDING_MAX_CONCURRENCY
+        return max(1, (os.cpu_count() or 1) // max(1, concurrency))
+    
+    def _get_batcher(self) -> EmbeddingBatcher:
+        """Lazily start the micro-batcher that serves single-text embed() calls."""
+        if self._batcher is None:
+            with self._batcher_lock:
+                if self._batcher is None:
+                    self._batcher = EmbeddingBatcher(self._encode_texts)
+        return self._batcher
+    
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        return self._encode(texts, batch_size=len(texts))
+    
     def embed(self, text: str) -> List[float]:
         """
         Generate embedding for a single text string.
         
+        Concurrent calls from different threads are encoded together in one
+        batch by the micro-batcher (see `embedding_batcher`).
+        
         Args:
             text: The text to embed (typically title + body)
             
         Returns:
             List of 384 float values representing the embedding
         """
-        if not text or not text.strip():
-            return [0.0] * self.EMBEDDING_DIMENSION
+        return self.embed_array(text).tolist()
+    
+    def embed_array(self, text: str) -> np.ndarray:
+        """
+        Like `embed`, but returns a float32 np.ndarray.
         
-        model = self._get_model()
-        # Generate embedding
-        embedding = model.encode(text.strip(), convert_to_numpy=True)
+        Arrays bind directly as pgvector parameters (the adapter is registered on
+        every connection in `app.db.session`), so query vectors never go through
+        Python string formatting.
+        """
+        if not text or not text.strip():
+            return np.zeros(self.dimension, dtype=np.float32)
         
-        return embedding.tolist()
+        return np.asarray(self._get_batcher().encode(text.strip()), dtype=np.float32)
     
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """
@@ -69,19 +268,160 @@ class EmbeddingService:
         if not texts:
             return []
         
+        # Convert to list of lists
+        return [emb.tolist() for emb in self.embed_batch_array(texts)]
+    
+    def embed_batch_array(self, texts: List[str]) -> np.ndarray:
+        """Like `embed_batch`, but returns a (len(texts), dimension) float32 array."""
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        
         # Filter out empty texts
         valid_texts = [t if t and t.strip() else "" for t in texts]
         
-        model = self._get_model()
-        embeddings = model.encode(valid_texts, convert_to_numpy=True, batch_size=32)
+        return np.asarray(self._encode(valid_texts, batch_size=32), dtype=np.float32)
+    
+    @staticmethod
+    def chunk_document(model: SentenceTransformer, title: str, body: Optional[str]) -> Tuple[List[str], List[int]]:
+        """
+        Split a body into chunks that fit the model's input window with the title.
         
-        # Convert to list of lists
-        return [emb.tolist() for emb in embeddings]
+        Token counts come from the model's own tokenizer. Runs wherever the
+        model lives (in a worker process with EMBEDDING_WORKERS).
+        
+        Returns:
+            Tuple of (chunk texts, word pieces per chunk)
+        """
+        def count_tokens(value: str) -> int:
+            return len(model.tokenizer.tokenize(value))
+        
+        # Reserve room for [CLS]/[SEP] and the title prefix
+        budget = min(settings.EMBEDDING_CHUNK_TOKENS, model.max_seq_length) - 2
+        title_tokens = min(count_tokens(title), budget // 4) if title else 0
+        chunks = chunk_text(
+            body or "",
+            max_tokens=budget - title_tokens,
+            count_tokens=count_tokens,
+            overlap_sentences=settings.EMBEDDING_CHUNK_OVERLAP_SENTENCES,
+        )
+        return chunks, [count_tokens(chunk) for chunk in chunks]
+    
+    def embed_document(self, title: str, body: Optional[str]) -> Tuple[List[float], List[Dict[str, Any]]]:
+        """
+        Embed a whole document as token-budgeted chunks.
+        
+        The body is split on sentence boundaries into chunks that fit the model's
+        input window (EMBEDDING_CHUNK_TOKENS), and every chunk is embedded with the
+        title as context in a single batch. The document vector is the normalized
+        mean of the chunk vectors, so text past the first window still counts.
+        Chunks whose text was embedded before (by any user) come from the
+        embedding cache; only the rest are encoded.
+        
+        Args:
+            title: Document title
+            body: Document body text
+            
+        Returns:
+            Tuple of (pooled document embedding, list of chunk dicts with
+            chunk_index, text, token_count and embedding)
+        """
+        title = (title or "").strip()
+        if settings.EMBEDDING_WORKERS > 0:
+            chunks, token_counts = self._get_pool().chunk_document(title, body)
+        else:
+            chunks, token_counts = self.chunk_document(self._get_model(), title, body)
+        if not chunks:
+            return self.embed(title), []
+        
+        vectors = self.embed_passages([self.passage_text(title, chunk) for chunk in chunks])
+        return self.pool(vectors).tolist(), self._chunk_rows(chunks, token_counts, vectors)
+    
+    def embed_documents(self, documents: List[Tuple[str, Optional[str]]]) -> List[Tuple[List[float], List[Dict[str, Any]]]]:
+        """
+        Like `embed_document` for many documents, with one encode for the whole batch.
+        
+        The chunks of every document go through a single `embed_passages`
+        call, and the titles of documents without a body through a single
+        `embed_batch_array` call.
+        
+        Args:
+            documents: (title, body) pairs
+            
+        Returns:
+            One (pooled embedding, chunk dicts) tuple per document, in order
+        """
+        titles = [(title or "").strip() for title, _ in documents]
+        chunked = []
+        for title, (_, body) in zip(titles, documents):
+            if settings.EMBEDDING_WORKERS > 0:
+                chunked.append(self._get_pool().chunk_document(title, body))
+            else:
+                chunked.append(self.chunk_document(self._get_model(), title, body))
+        
+        passages = [self.passage_text(title, chunk) for title, (chunks, _) in zip(titles, chunked) for chunk in chunks]
+        passage_vectors = self.embed_passages(passages)
+        untitled = [i for i, (chunks, _) in enumerate(chunked) if not chunks]
+        title_vectors = dict(zip(untitled, self.embed_batch_array([titles[i] for i in untitled])))
+        
+        results = []
+        offset = 0
+        for i, (chunks, token_counts) in enumerate(chunked):
+            if not chunks:
+                results.append((title_vectors[i].tolist(), []))
+                continue
+            vectors = passage_vectors[offset:offset + len(chunks)]
+            offset += len(chunks)
+            results.append((self.pool(vectors).tolist(), self._chunk_rows(chunks, token_counts, vectors)))
+        return results
+    
+    @staticmethod
+    def _chunk_rows(chunks: List[str], token_counts: List[int], vectors: np.ndarray) -> List[Dict[str, Any]]:
+        return [
+            {
+                'chunk_index': i,
+                'text': chunk,
+                'token_count': token_count,
+                'embedding': vector.tolist(),
+            }
+            for i, (chunk, token_count, vector) in enumerate(zip(chunks, token_counts, vectors))
+        ]
+    
+    def embed_passages(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed passage texts (see `passage_text`) as unit vectors, in one batch.
+        
+        Texts embedded before with this model (by any user) come from the
+        embedding cache; only the rest are encoded.
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return np.asarray(embedding_cache.embed(
+            texts,
+            lambda misses: self._encode(misses, batch_size=32, normalize_embeddings=True),
+            model_name=self.model_name,
+        ), dtype=np.float32)
+    
+    @staticmethod
+    def passage_text(title: str, chunk: str) -> str:
+        """Text embedded for a chunk: the chunk with its document title as context."""
+        return f"{title}\n{chunk}" if title else chunk
+    
+    @staticmethod
+    def pool(vectors: np.ndarray) -> np.ndarray:
+        """Document vector from its chunk vectors: their normalized mean."""
+        pooled = vectors.mean(axis=0)
+        norm = np.linalg.norm(pooled)
+        if norm > 0:
+            pooled = pooled / norm
+        return pooled
     
     def embedding_to_vector_string(self, embedding: List[float]) -> str:
         """
         Convert embedding list to PostgreSQL vector string format.
         
+        Only needed for text-format contexts (exports, logs); query parameters
+        bind np.ndarray values directly.
+        
         Args:
             embedding: List of float values
             
@@ -110,5 +450,8 @@ class EmbeddingService:
         return [float(v) for v in values]
 
 
-# Singleton instance for easy import
-embedding_service = EmbeddingService()
+# Instance for the configured model, for easy import
+embedding_service = EmbeddingService.for_model(settings.EMBEDDING_MODEL)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=EmbeddingService._reset_after_fork)
@@ -0,0 +1,320 @@
+"""
+Batched Enrichment Pipeline.
+
+`EnrichmentService.enrich_content` handles one item end to end with its
+own session and several commits, so a bulk import of thousands of URLs
+became thousands of small transactions and single-item embeddings. The
+pipeline runs a batch of items through the same steps stage by stage:
+
+1. Scrape: items without a body, fetched concurrently on the shared
+   event loop (app.services.scrape_runner)
+2. Readability: score and difficulty per item
+3. Embed: every chunk of every item in one batched encode
+4. LLM: summary and suggested tags for all items concurrently, short
+   documents several to a request, paced by the LLM rate limiter, with the
+   existing tags closest to each document embedding as context
+5. Write: one bulk `UPDATE ... FROM (VALUES ...)` for the content rows,
+   one delete and one insert for their chunks, and a single commit
+
+A failing step only affects its own item, as in `enrich_content`. Items
+whose scrape failed are reported back so the job queue retries them. Each
+batch's stage timings are recorded (app.services.enrichment_profiler).
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from uuid import UUID
+import numpy as np
+from sqlalchemy import text, insert
+from app.db.session import SessionLocal
+from app.models.content import ContentChunk
+from app.services.embedding_migration import active_embedding_service
+from app.services.enrichment_profiler import EnrichmentProfile
+from app.services.event_loop import event_loop
+from app.services.llm_service import llm_service
+from app.services.scrape_runner import scrape_runner
+from app.services.tag_selector import tag_selector
+from app.services.tag_service import TagService
+from app.utils.readability import analyze_readability
+
+
+logger = logging.getLogger(__name__)
+
+# Columns written by the bulk update: name -> SQL type of the VALUES column.
+# NULL means "unchanged" (COALESCE with the stored value), except for the
+# enrichment status and error which are always set.
+_WRITE_COLUMNS = {
+    'title': 'text',
+    'body': 'text',
+    'author': 'text',
+    'og_image_url': 'text',
+    'favicon_url': 'text',
+    'published_at': 'timestamptz',
+    'word_count': 'integer',
+    'domain': 'text',
+    'readability_score': 'double precision',
+    'difficulty': 'text',
+    'summary': 'text',
+    'suggested_tags': 'text[]',
+    'embedding': 'vector',
+}
+
+
+class EnrichmentPipeline:
+    """Enrich content items in batches."""
+
+    @staticmethod
+    def run(content_ids: List[str]) -> Dict[str, str]:
+        """
+        Enrich a batch of content items.
+
+        Args:
+            content_ids: UUID strings of the items
+
+        Returns:
+            Errors by content id for items that should be retried
+        """
+        profile = EnrichmentProfile('pipeline', len(content_ids))
+        db = SessionLocal()
+        try:
+            with profile.stage('load'):
+                EnrichmentPipeline._bypass_rls(db)
+                rows = db.execute(text("""
+                    SELECT id, user_id, source_url, title, body FROM content WHERE id = ANY(:ids)
+                """), {'ids': [UUID(i) for i in content_ids]}).fetchall()
+                if not rows:
+                    return {}
+                items = [dict(row._mapping) for row in rows]
+                for item in items:
+                    item['updates'] = {}
+                    item['failed_steps'] = 0
+
+                db.execute(text("""
+                    UPDATE content
+                    SET enrichment_status = CASE WHEN COALESCE(btrim(body), '') = '' THEN 'scraping' ELSE 'enriching' END,
+                        enrichment_error = NULL
+                    WHERE id = ANY(:ids)
+                """), {'ids': [item['id'] for item in items]})
+                db.commit()
+            profile.items = len(items)
+
+            # No transaction is held open during the slow stages
+            with profile.stage('scrape'):
+                retry = EnrichmentPipeline._scrape(items)
+            ready = [item for item in items if 'error' not in item]
+            with profile.stage('readability'):
+                EnrichmentPipeline._readability(ready)
+            with profile.stage('embed'):
+                EnrichmentPipeline._embed(ready)
+            with profile.stage('llm'):
+                EnrichmentPipeline._llm(db, ready)
+
+            with profile.stage('write'):
+                EnrichmentPipeline._bypass_rls(db)
+                EnrichmentPipeline._write(db, items)
+                db.commit()
+            logger.info(f"Enriched batch of {len(items)} items ({len(retry)} to retry)")
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with profile.stage('refresh'):
+            EnrichmentPipeline._refresh_saved_searches({item['user_id'] for item in ready})
+        profile.finish()
+        return retry
+
+    @staticmethod
+    def _bypass_rls(db) -> None:
+        # A commit may hand the session a different pooled connection
+        db.execute(text("SET SESSION app.bypass_rls = 'on'"))
+
+    @staticmethod
+    def _body(item: Dict[str, Any]) -> Optional[str]:
+        return item['updates'].get('body', item['body'])
+
+    @staticmethod
+    def _scrape(items: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Fetch the items that have no body yet, concurrently on the shared scrape loop."""
+        pending = [item for item in items if not (item['body'] or "").strip()]
+        if not pending:
+            return {}
+
+        retry = {}
+        for item, data in zip(pending, scrape_runner.scrape_many([item['source_url'] for item in pending])):
+            if isinstance(data, Exception):
+                logger.error(f"Scraping failed for {item['id']}: {data}")
+                item['error'] = f"Scraping failed: {data}"
+                retry[str(item['id'])] = item['error']
+                continue
+            body = data.get("content", "")
+            item['updates'].update({
+                'title': data.get("title") or item['title'] or "Untitled",
+                'body': body,
+                'author': data.get("author"),
+                'og_image_url': data.get("og_image_url"),
+                'favicon_url': data.get("favicon_url"),
+                'published_at': data.get("published_at"),
+                'word_count': len(body.split()) if body else 0,
+                'domain': urlparse(item['source_url']).netloc,
+            })
+        return retry
+
+    @staticmethod
+    def _readability(items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            body = EnrichmentPipeline._body(item)
+            try:
+                if not body:
+                    raise ValueError("no body")
+                score = analyze_readability(body).get('flesch_kincaid_score')
+            except Exception as e:
+                logger.error(f"Readability error {item['id']}: {e}")
+                item['failed_steps'] += 1
+                continue
+            item['updates']['readability_score'] = score
+            if score is not None:
+                item['updates']['difficulty'] = 'easy' if score >= 60 else 'intermediate' if score >= 30 else 'advanced'
+
+    @staticmethod
+    def _llm(db, items: List[Dict[str, Any]]) -> None:
+        """Summaries and tags, with each user's existing tags as context."""
+        existing_tags = {}
+        try:
+            EnrichmentPipeline._bypass_rls(db)
+            existing_tags = TagService.get_tags_for_users(db, list({item['user_id'] for item in items}))
+        except Exception as e:
+            logger.error(f"Error fetching existing tags: {e}")
+        db.rollback()
+        # The llm_provider preference picks the backend (Groq or a local Ollama)
+        llm_service.configure_from_preferences(db)
+        db.rollback()
+
+        # Tag selection embeds, so it runs here rather than on the event loop
+        prompts = []
+        for item in items:
+            body = EnrichmentPipeline._body(item)
+            if not body:
+                prompts.append(None)
+                continue
+            # Only the tags closest to the document embedding are listed in the prompt
+            tags = tag_selector.select(existing_tags.get(str(item['user_id']), []), item['updates'].get('embedding', body))
+            prompts.append((body, tags))
+
+        # Short documents share requests; the LLM service's rate limiter paces them
+        try:
+            results = event_loop.run(llm_service.asummarize_and_tag_many(
+                [prompt or ("", []) for prompt in prompts]
+            ))
+        except Exception as e:
+            logger.error(f"LLM error for batch of {len(items)} items: {e}")
+            results = [(None, None)] * len(items)
+
+        for item, (summary, tags_json) in zip(items, results):
+            if not summary and not tags_json:
+                item['failed_steps'] += 1
+                continue
+            if summary:
+                item['updates']['summary'] = summary
+            if tags_json:
+                try:
+                    item['updates']['suggested_tags'] = json.loads(tags_json)
+                except ValueError:
+                    pass
+
+    @staticmethod
+    def _embed(items: List[Dict[str, Any]]) -> None:
+        """Embed the whole batch with one call."""
+        if not items:
+            return
+        try:
+            results = active_embedding_service().embed_documents([
+                (item['updates'].get('title', item['title']), EnrichmentPipeline._body(item)) for item in items
+            ])
+        except Exception as e:
+            if len(items) > 1:
+                # One bad document should only fail itself: embed the items separately
+                logger.error(f"Embedding error for batch of {len(items)}, retrying items one by one: {e}")
+                for item in items:
+                    EnrichmentPipeline._embed([item])
+                return
+            logger.error(f"Embedding error {items[0]['id']}: {e}")
+            items[0]['failed_steps'] += 1
+            return
+        for item, (embedding, chunks) in zip(items, results):
+            item['updates']['embedding'] = np.asarray(embedding, dtype=np.float32)
+            item['chunks'] = chunks
+
+    @staticmethod
+    def _write(db, items: List[Dict[str, Any]]) -> None:
+        """Write every item with one UPDATE ... FROM (VALUES ...), then replace chunks."""
+        # Rows in (user_id, id) order, after taking the users' tag locks in
+        # the same order, so concurrent batches can't deadlock in the
+        # user_tags trigger
+        items = sorted(items, key=lambda item: (item['user_id'], item['id']))
+        TagService.lock_users(db, [item['user_id'] for item in items])
+        columns = list(_WRITE_COLUMNS)
+        params: Dict[str, Any] = {}
+        values = []
+        for n, item in enumerate(items):
+            if 'error' in item:
+                status, error = 'failed', item['error']
+            elif item['failed_steps'] < 3:
+                status, error = 'ready', None
+            else:
+                status, error = 'failed', "All enrichment steps failed"
+            params[f"id_{n}"] = item['id']
+            params[f"status_{n}"] = status
+            params[f"error_{n}"] = error
+            for column in columns:
+                params[f"{column}_{n}"] = item['updates'].get(column)
+            values.append("(" + ", ".join(
+                [f"CAST(:id_{n} AS uuid)", f":status_{n}", f"CAST(:error_{n} AS text)"]
+                + [f"CAST(:{column}_{n} AS {_WRITE_COLUMNS[column]})" for column in columns]
+            ) + ")")
+
+        assignments = ",\n                ".join(f"{column} = COALESCE(v.{column}, c.{column})" for column in columns)
+        db.execute(text(f"""
+            UPDATE content AS c
+            SET {assignments},
+                enrichment_status = v.enrichment_status,
+                enrichment_error = v.enrichment_error,
+                updated_at = now()
+            FROM (VALUES {', '.join(values)})
+                AS v(id, enrichment_status, enrichment_error, {', '.join(columns)})
+            WHERE c.id = v.id
+        """), params)
+
+        embedded = [item for item in items if 'chunks' in item]
+        if embedded:
+            db.execute(text("DELETE FROM content_chunks WHERE content_id = ANY(:ids)"),
+                       {'ids': [item['id'] for item in embedded]})
+            chunk_rows = [
+                {**chunk, 'content_id': item['id'], 'user_id': item['user_id']}
+                for item in embedded for chunk in item['chunks']
+            ]
+            if chunk_rows:
+                db.execute(insert(ContentChunk.__table__).values(chunk_rows))
+
+    @staticmethod
+    def _refresh_saved_searches(user_ids) -> None:
+        """Score the enriched items against each user's materialized saved searches."""
+        from app.services.content_search_service import SavedSearchService
+        db = SessionLocal()
+        try:
+            for user_id in user_ids:
+                try:
+                    EnrichmentPipeline._bypass_rls(db)
+                    SavedSearchService.refresh_for_user(db, str(user_id))
+                except Exception as e:
+                    logger.error(f"Error refreshing saved searches for user {user_id}: {e}")
+                    db.rollback()
+        finally:
+            db.close()
+
+
+# Singleton instance
+enrichment_pipeline = EnrichmentPipeline()
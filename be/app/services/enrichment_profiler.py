@@ -0,0 +1,266 @@
+"""
+Per-stage timing of content enrichment.
+
+`enrich_content` and the batched pipeline only logged when they started and
+finished, so nothing showed which stage (scraping, readability, embedding,
+the LLM or the database writes) a slow import was waiting on. Each run now
+times its stages with an `EnrichmentProfile`:
+
+- wall-clock and CPU seconds per stage go to the `enrichment_stage_seconds`
+  and `enrichment_stage_cpu_seconds` histograms (`GET /metrics` in the API,
+  WORKER_METRICS_PORT in the job worker)
+- the run itself is stored in the `enrichment_runs` table
+
+CPU time is that of the thread running the stage. Work a stage waits for on
+the shared event loop (scrapes, LLM calls) only shows in its wall time, so a
+large gap between the two means the stage is waiting on I/O.
+
+Percentiles per stage over the most recent runs:
+
+    python -m app.services.enrichment_profiler [--last 500] [--mode pipeline] [--per-item]
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+# Report order; stages not listed here follow in alphabetical order
+STAGES = ('load', 'scrape', 'readability', 'embed', 'llm', 'write', 'refresh')
+TOTAL = 'total'
+
+stage_seconds = metrics.histogram(
+    "enrichment_stage_seconds", "Wall-clock seconds per enrichment stage", ("mode", "stage"),
+)
+stage_cpu_seconds = metrics.histogram(
+    "enrichment_stage_cpu_seconds", "CPU seconds per enrichment stage, in the thread that ran it", ("mode", "stage"),
+)
+
+
+class EnrichmentProfile:
+    """
+    Stage timings of one enrichment run.
+
+    Stages may be timed from several threads, and timing a stage again adds
+    to its total.
+
+    Args:
+        mode: "pipeline" (one batch) or "single" (one `enrich_content` call)
+        items: Content items in the run
+    """
+
+    def __init__(self, mode: str, items: int = 1):
+        self.mode = mode
+        self.items = items
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as stage `name`, whether or not it raises."""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add(self, name: str, wall: float, cpu: float) -> None:
+        with self._lock:
+            timing = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0})
+            timing['wall'] += wall
+            timing['cpu'] += cpu
+
+    def finish(self) -> None:
+        """Record the run in the histograms and the enrichment_runs table; never raises."""
+        if not settings.ENRICHMENT_PROFILING:
+            return
+        wall = time.perf_counter() - self._started
+        with self._lock:
+            stages = {name: dict(timing) for name, timing in self.stages.items()}
+        cpu = sum(timing['cpu'] for timing in stages.values())
+
+        for name, timing in stages.items():
+            stage_seconds.observe(timing['wall'], mode=self.mode, stage=name)
+            stage_cpu_seconds.observe(timing['cpu'], mode=self.mode, stage=name)
+        stage_seconds.observe(wall, mode=self.mode, stage=TOTAL)
+        stage_cpu_seconds.observe(cpu, mode=self.mode, stage=TOTAL)
+
+        try:
+            enrichment_runs.save(self.mode, self.items, wall, cpu, stages)
+        except Exception as e:
+            logger.warning(f"Recording enrichment run timings failed: {e}")
+
+
+class EnrichmentRunStore:
+    """
+    The `enrichment_runs` table.
+
+    Args:
+        session_factory: Session factory (defaults to SessionLocal)
+        max_rows: Runs to keep (defaults to ENRICHMENT_RUNS_MAX_ROWS)
+        prune_every: Remove runs beyond max_rows after this many saves
+    """
+
+    def __init__(self, session_factory: Optional[Callable] = None, max_rows: int = None, prune_every: int = 100):
+        self._session_factory = session_factory
+        self.max_rows = max_rows or settings.ENRICHMENT_RUNS_MAX_ROWS
+        self.prune_every = prune_every
+        self._saves = 0
+        self._lock = threading.Lock()
+
+    def save(self, mode: str, items: int, wall: float, cpu: float, stages: Dict[str, Dict[str, float]]) -> None:
+        db = self._session()
+        try:
+            db.execute(text("""
+                INSERT INTO enrichment_runs (mode, items, wall_seconds, cpu_seconds, stages)
+                VALUES (:mode, :items, :wall, :cpu, CAST(:stages AS jsonb))
+            """), {'mode': mode, 'items': items, 'wall': wall, 'cpu': cpu, 'stages': json.dumps(stages)})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._saves += 1
+            due = self._saves % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete runs beyond max_rows, oldest first; returns the number deleted."""
+        db = self._session()
+        try:
+            deleted = db.execute(text("""
+                DELETE FROM enrichment_runs WHERE id <= (
+                    SELECT id FROM enrichment_runs ORDER BY id DESC OFFSET :max_rows LIMIT 1
+                )
+            """), {'max_rows': self.max_rows}).rowcount
+            db.commit()
+            return deleted
+        except Exception as e:
+            logger.warning(f"Pruning enrichment runs failed: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def recent(self, limit: int, mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The newest `limit` runs (optionally of one mode), newest first."""
+        db = self._session()
+        try:
+            rows = db.execute(text("""
+                SELECT mode, items, wall_seconds, cpu_seconds, stages, created_at
+                FROM enrichment_runs
+                WHERE CAST(:mode AS text) IS NULL OR mode = :mode
+                ORDER BY id DESC
+                LIMIT :limit
+            """), {'mode': mode, 'limit': limit}).fetchall()
+            return [dict(row._mapping) for row in rows]
+        finally:
+            db.close()
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+
+def percentile(values: List[float], q: float) -> float:
+    """The q-th percentile (0-100) of values, interpolating linearly between ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def stage_report(runs: List[Dict[str, Any]], per_item: bool = False) -> List[Dict[str, Any]]:
+    """
+    Percentiles per stage over runs as returned by `EnrichmentRunStore.recent`.
+
+    Args:
+        runs: Runs with `items`, `wall_seconds`, `cpu_seconds` and `stages`
+        per_item: Divide each run's timings by its number of items
+
+    Returns:
+        One row per stage, in pipeline order, then the whole run as "total". `share`
+        is the stage's fraction of the total wall-clock time of all runs
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    for run in runs:
+        scale = max(run['items'], 1) if per_item else 1
+        stages = dict(run['stages'] or {})
+        stages[TOTAL] = {'wall': run['wall_seconds'], 'cpu': run['cpu_seconds']}
+        for name, timing in stages.items():
+            stage = samples.setdefault(name, {'wall': [], 'cpu': []})
+            stage['wall'].append(timing.get('wall', 0.0) / scale)
+            stage['cpu'].append(timing.get('cpu', 0.0) / scale)
+
+    total_wall = sum(samples.get(TOTAL, {'wall': []})['wall'])
+    order = [name for name in STAGES if name in samples]
+    order += sorted(name for name in samples if name not in STAGES and name != TOTAL)
+    if TOTAL in samples:
+        order.append(TOTAL)
+    return [
+        {
+            'stage': name,
+            'runs': len(samples[name]['wall']),
+            'wall_p50': percentile(samples[name]['wall'], 50),
+            'wall_p95': percentile(samples[name]['wall'], 95),
+            'cpu_p50': percentile(samples[name]['cpu'], 50),
+            'cpu_p95': percentile(samples[name]['cpu'], 95),
+            'share': sum(samples[name]['wall']) / total_wall if total_wall else 0.0,
+        }
+        for name in order
+    ]
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    """Render `stage_report` rows as a text table (seconds)."""
+    header = f"{'stage':<12} {'runs':>6} {'wall p50':>10} {'wall p95':>10} {'cpu p50':>10} {'cpu p95':>10} {'share':>7}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['stage']:<12} {row['runs']:>6} {row['wall_p50']:>10.3f} {row['wall_p95']:>10.3f} "
+            f"{row['cpu_p50']:>10.3f} {row['cpu_p95']:>10.3f} {row['share']:>6.0%}"
+        )
+    return "\n".join(lines)
+
+
+# Singleton instance
+enrichment_runs = EnrichmentRunStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report enrichment stage timings over recent runs")
+    parser.add_argument("--last", type=int, default=500, help="number of most recent runs (default: 500)")
+    parser.add_argument("--mode", choices=["pipeline", "single"], help="only runs of this kind")
+    parser.add_argument("--per-item", action="store_true", help="divide each run's timings by its item count")
+    args = parser.parse_args()
+
+    runs = enrichment_runs.recent(args.last, args.mode)
+    if not runs:
+        print("No enrichment runs recorded")
+        return
+    items = sum(run['items'] for run in runs)
+    print(f"{len(runs)} runs, {items} items, {runs[-1]['created_at']} to {runs[0]['created_at']}")
+    print(format_report(stage_report(runs, per_item=args.per_item)))
+
+
+if __name__ == "__main__":
+    main()
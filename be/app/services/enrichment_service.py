@@ -8,14 +8,19 @@ This service handles background tasks for:
 4. Reading time and difficulty calculation
 
 All these operations are computationally expensive and run asynchronously.
+Stage timings of every run are recorded (app.services.enrichment_profiler).
 """
 
 import logging
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from app.models.content import Content
-from app.services.embedding_service import embedding_service
+from sqlalchemy import text, insert, delete
+from typing import Any, Dict, List
+from app.models.content import Content, ContentChunk
+from app.services.embedding_migration import active_embedding_service
+from app.services.enrichment_profiler import EnrichmentProfile
 from app.services.llm_service import llm_service
+from app.services.tag_selector import tag_selector
+from app.services.tag_service import TagService
 from app.utils.readability import analyze_readability
 from app.db.session import SessionLocal
 from uuid import UUID
@@ -36,7 +41,7 @@ class EnrichmentService:
     """
     
     @staticmethod
-    def enrich_content(content_id: str) -> None:
+    def enrich_content(content_id: str, raise_on_error: bool = False) -> None:
         """
         Perform full enrichment on a content item.
         
@@ -45,46 +50,55 @@ class EnrichmentService:
         2. Readability calculation
         3. LLM summarization & tagging
         4. Vector embedding generation
+        
+        Args:
+            content_id: The UUID string of the content
+            raise_on_error: Re-raise scraping and unexpected errors after
+                recording them, so the job queue retries the job
         """
-        from app.services.content_extractor import ContentScraper
+        from app.services.scrape_runner import scrape_runner
+        profile = EnrichmentProfile('single')
         db = SessionLocal()
         try:
-            db.execute(text("SET SESSION app.bypass_rls = 'on'"))
-            content = db.query(Content).filter(Content.id == UUID(content_id)).first()
-            if not content:
-                logger.warning(f"Content {content_id} not found for enrichment")
-                return
+            with profile.stage('load'):
+                db.execute(text("SET SESSION app.bypass_rls = 'on'"))
+                content = db.query(Content).filter(Content.id == UUID(content_id)).first()
+                if not content:
+                    logger.warning(f"Content {content_id} not found for enrichment")
+                    return
             
             # Step 1: Scrape content if body is missing
-            if not content.body or content.body.strip() == "":
-                content.enrichment_status = 'scraping'
-                db.commit()
-                try:
-                    logger.info(f"Starting async scraping for content {content_id} from {content.source_url}")
-                    # ContentScraper.scrape_url is async, but we are in a sync worker. 
-                    # We need to run it in a loop.
-                    import asyncio
-                    data = asyncio.run(ContentScraper.scrape_url(content.source_url))
+            with profile.stage('scrape'):
+                if not content.body or content.body.strip() == "":
+                    content.enrichment_status = 'scraping'
+                    db.commit()
+                    try:
+                        logger.info(f"Starting async scraping for content {content_id} from {content.source_url}")
+                        # ContentScraper.scrape_url is async, but we are in a sync worker,
+                        # so it runs on the shared scrape loop and its pooled client
+                        data = scrape_runner.scrape(content.source_url)
                     
-                    logger.info(f"Scraping successful for {content_id}: extracted title '{data.get('title')}'")
-                    content.title = data.get("title", content.title or "Untitled")
-                    content.body = data.get("content", "")
-                    content.author = data.get("author")
-                    content.og_image_url = data.get("og_image_url")
-                    content.favicon_url = data.get("favicon_url")
-                    content.published_at = data.get("published_at")
-                    content.word_count = len(content.body.split()) if content.body else 0
+                        logger.info(f"Scraping successful for {content_id}: extracted title '{data.get('title')}'")
+                        content.title = data.get("title", content.title or "Untitled")
+                        content.body = data.get("content", "")
+                        content.author = data.get("author")
+                        content.og_image_url = data.get("og_image_url")
+                        content.favicon_url = data.get("favicon_url")
+                        content.published_at = data.get("published_at")
+                        content.word_count = len(content.body.split()) if content.body else 0
                     
-                    from urllib.parse import urlparse
-                    content.domain = urlparse(content.source_url).netloc
+                        from urllib.parse import urlparse
+                        content.domain = urlparse(content.source_url).netloc
                     
-                    db.commit()
-                except Exception as e:
-                    logger.error(f"Scraping failed for {content_id}: {str(e)}", exc_info=True)
-                    content.enrichment_status = 'failed'
-                    content.enrichment_error = f"Scraping failed: {str(e)}"
-                    db.commit()
-                    return
+                        db.commit()
+                    except Exception as e:
+                        logger.error(f"Scraping failed for {content_id}: {str(e)}", exc_info=True)
+                        content.enrichment_status = 'failed'
+                        content.enrichment_error = f"Scraping failed: {str(e)}"
+                        db.commit()
+                        if raise_on_error:
+                            raise
+                        return
 
             # Step 2: Enriching (Readability, LLM, Embeddings)
             logger.info(f"Starting parallel enrichment for content {content_id}")
@@ -97,25 +111,13 @@ class EnrichmentService:
             user_id = content.user_id
             
             # Fetch existing tags for the user to provide semantic context to the LLM
-            existing_tags = []
-            try:
-                tags_query = text("""
-                    SELECT DISTINCT tag
-                    FROM (
-                        SELECT unnest(tags) as tag
-                        FROM content
-                        WHERE user_id = :user_id AND tags IS NOT NULL
-                        UNION
-                        SELECT unnest(suggested_tags) as tag
-                        FROM content
-                        WHERE user_id = :user_id AND suggested_tags IS NOT NULL
-                    ) tags_combined
-                    WHERE tag IS NOT NULL AND tag != ''
-                """)
-                tags_result = db.execute(tags_query, {"user_id": user_id})
-                existing_tags = [row[0] for row in tags_result]
-            except Exception as e:
-                logger.error(f"Error fetching existing tags for enrichment: {e}")
+            with profile.stage('load'):
+                existing_tags = []
+                try:
+                    existing_tags = TagService.get_user_tags(db, str(user_id))
+                except Exception as e:
+                    logger.error(f"Error fetching existing tags for enrichment: {e}")
+                llm_service.configure_from_preferences(db)
 
             from concurrent.futures import ThreadPoolExecutor
             
@@ -132,6 +134,8 @@ class EnrichmentService:
             def run_llm(text_content, tags_list):
                 try:
                     if text_content:
+                        # The document vector is still being computed, so rank against the text
+                        tags_list = tag_selector.select(tags_list, text_content)
                         summary, suggested_tags_json = llm_service.summarize_and_tag(text_content, tags_list)
                         return {'summary': summary, 'tags': suggested_tags_json, 'success': True}
                 except Exception as e:
@@ -140,66 +144,83 @@ class EnrichmentService:
 
             def run_embedding(title, text_content):
                 try:
-                    text_to_embed = f"{title} {text_content or ''}"
-                    embedding = embedding_service.embed(text_to_embed)
-                    return {'embedding': embedding, 'success': True}
+                    embedding, chunks = active_embedding_service().embed_document(title, text_content)
+                    return {'embedding': embedding, 'chunks': chunks, 'success': True}
                 except Exception as e:
                     logger.error(f"Embedding error {content_id}: {e}")
                 return {'success': False}
 
+            def timed(stage, task, *args):
+                with profile.stage(stage):
+                    return task(*args)
+
             # Run enrichment tasks in parallel
             with ThreadPoolExecutor(max_workers=3) as executor:
-                future_readability = executor.submit(run_readability, content_body)
-                future_llm = executor.submit(run_llm, content_body, existing_tags)
-                future_embedding = executor.submit(run_embedding, content_title, content_body)
+                future_readability = executor.submit(timed, 'readability', run_readability, content_body)
+                future_llm = executor.submit(timed, 'llm', run_llm, content_body, existing_tags)
+                future_embedding = executor.submit(timed, 'embed', run_embedding, content_title, content_body)
                 
                 res_readability = future_readability.result()
                 res_llm = future_llm.result()
                 res_embedding = future_embedding.result()
 
-            # Apply results to the model (back in the main background thread with the main session)
-            if res_readability.get('success'):
-                score = res_readability.get('score')
-                content.readability_score = score
-                if score is not None:
-                    if score >= 60: content.difficulty = 'easy'
-                    elif score >= 30: content.difficulty = 'intermediate'
-                    else: content.difficulty = 'advanced'
+            with profile.stage('write'):
+                # Apply results to the model (back in the main background thread with the main session)
+                if res_readability.get('success'):
+                    score = res_readability.get('score')
+                    content.readability_score = score
+                    if score is not None:
+                        if score >= 60: content.difficulty = 'easy'
+                        elif score >= 30: content.difficulty = 'intermediate'
+                        else: content.difficulty = 'advanced'
             
-            if res_llm.get('success'):
-                if res_llm.get('summary'):
-                    content.summary = res_llm.get('summary')
-                if res_llm.get('tags'):
-                    try:
-                        import json
-                        content.suggested_tags = json.loads(res_llm.get('tags'))
-                    except: pass
+                if res_llm.get('success'):
+                    if res_llm.get('summary'):
+                        content.summary = res_llm.get('summary')
+                    if res_llm.get('tags'):
+                        try:
+                            import json
+                            content.suggested_tags = json.loads(res_llm.get('tags'))
+                        except: pass
             
-            if res_embedding.get('success'):
-                content.embedding = res_embedding.get('embedding')
+                if res_embedding.get('success'):
+                    content.embedding = res_embedding.get('embedding')
+                    EnrichmentService._replace_chunks(db, content, res_embedding.get('chunks'))
 
-            # Finalize
-            if res_embedding.get('success') or res_readability.get('success') or res_llm.get('success'):
-                content.enrichment_status = 'ready'
-            else:
-                content.enrichment_status = 'failed'
-                content.enrichment_error = "All enrichment steps failed"
+                # Finalize
+                if res_embedding.get('success') or res_readability.get('success') or res_llm.get('success'):
+                    content.enrichment_status = 'ready'
+                else:
+                    content.enrichment_status = 'failed'
+                    content.enrichment_error = "All enrichment steps failed"
             
-            content.updated_at = datetime.utcnow()
-            db.commit()
+                content.updated_at = datetime.utcnow()
+                db.commit()
             logger.info(f"Enrichment complete for content {content_id}")
             
+            # Score the enriched item against the user's materialized saved searches
+            with profile.stage('refresh'):
+                try:
+                    from app.services.content_search_service import SavedSearchService
+                    SavedSearchService.refresh_for_user(db, str(user_id))
+                except Exception as e:
+                    logger.error(f"Error refreshing saved searches after enriching {content_id}: {e}")
+                    db.rollback()
+            profile.finish()
+            
         except Exception as e:
             logger.error(f"Error in enrichment process for {content_id}: {e}")
             try:
                 db.rollback()
                 content = db.query(Content).filter(Content.id == UUID(content_id)).first()
-                if content:
+                if content and content.enrichment_status != 'failed':
                     content.enrichment_status = 'failed'
                     content.enrichment_error = str(e)
                     db.commit()
             except Exception:
                 pass
+            if raise_on_error:
+                raise
         finally:
             db.close()
     
@@ -218,9 +239,9 @@ class EnrichmentService:
             if not content:
                 return
             
-            text_to_embed = f"{content.title} {content.body or ''}"
-            embedding = embedding_service.embed(text_to_embed)
+            embedding, chunks = active_embedding_service().embed_document(content.title, content.body)
             content.embedding = embedding
+            EnrichmentService._replace_chunks(db, content, chunks)
             db.commit()
             logger.info(f"Generated embedding for content {content_id}")
         except Exception as e:
@@ -228,6 +249,16 @@ class EnrichmentService:
         finally:
             db.close()
     
+    @staticmethod
+    def _replace_chunks(db: Session, content: Content, chunks: List[Dict[str, Any]]) -> None:
+        """Replace the stored passage chunks of a content item (caller commits)."""
+        db.execute(delete(ContentChunk).where(ContentChunk.content_id == content.id))
+        if chunks:
+            db.execute(insert(ContentChunk.__table__).values([
+                {**chunk, 'content_id': content.id, 'user_id': content.user_id}
+                for chunk in chunks
+            ]))
+    
     @staticmethod
     def calculate_readability_only(content_id: str) -> None:
         """
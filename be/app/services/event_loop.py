@@ -0,0 +1,69 @@
+"""
+Shared background event loop for synchronous code.
+
+Worker threads (enrichment, the job worker) are synchronous, while scraping
+and LLM calls are async. Instead of paying for `asyncio.run` (a new loop and
+new HTTP clients) per call, each process keeps one loop running in a
+daemon thread. Async clients created on it (see scrape_runner and
+llm_service) live as long as the loop and are shared by every caller.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Coroutine, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopThread:
+    """
+    An asyncio loop running forever in a daemon thread, started on first use.
+
+    Args:
+        name: Name of the loop thread
+    """
+
+    def __init__(self, name: str = "event-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop from any other thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and wait for its result. Never call this from the loop itself."""
+        return self.submit(coro).result(timeout)
+
+    def shutdown(self) -> None:
+        """Stop the loop and join its thread; the next call starts a new loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None:
+                return
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(10)
+            loop.close()
+            self._loop = self._thread = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+
+# Singleton instance
+event_loop = EventLoopThread("async-loop")
@@ -10,13 +10,13 @@ Provides:
 """
 
 import logging
+import numpy as np
 from typing import Dict, Any, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import text, func
 from app.models.content import Content
 from app.models.annotation import Annotation
-from app.services.embedding_service import embedding_service
-from app.core.config import settings
+from app.services.embedding_migration import active_embedding_model
 from datetime import datetime, timedelta
 from uuid import UUID
 import json
@@ -77,7 +77,7 @@ class ExploreService:
                 c1 = content_items[i]
                 c2 = content_items[j]
                 
-                if c1.embedding and c2.embedding:
+                if c1.embedding is not None and c2.embedding is not None:
                     # Compute cosine similarity
                     similarity = ExploreService._cosine_similarity(
                         c1.embedding, c2.embedding
@@ -96,19 +96,16 @@ class ExploreService:
         }
     
     @staticmethod
-    def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
+    def _cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
         """Compute cosine similarity between two vectors."""
-        if not vec1 or not vec2 or len(vec1) != len(vec2):
+        if vec1 is None or vec2 is None or len(vec1) != len(vec2):
             return 0.0
         
-        dot = sum(a * b for a, b in zip(vec1, vec2))
-        mag1 = sum(a * a for a in vec1) ** 0.5
-        mag2 = sum(b * b for b in vec2) ** 0.5
-        
-        if mag1 == 0 or mag2 == 0:
+        mag = np.linalg.norm(vec1) * np.linalg.norm(vec2)
+        if mag == 0:
             return 0.0
         
-        return dot / (mag1 * mag2)
+        return float(np.dot(vec1, vec2) / mag)
     
     @staticmethod
     def get_similar_pairs(
@@ -145,7 +142,7 @@ class ExploreService:
                 c1 = content_items[i]
                 c2 = content_items[j]
                 
-                if c1.embedding and c2.embedding:
+                if c1.embedding is not None and c2.embedding is not None:
                     similarity = ExploreService._cosine_similarity(
                         c1.embedding, c2.embedding
                     )
@@ -292,12 +289,9 @@ class ExploreService:
         if not source:
             return []
         
-        if not source.embedding:
+        if source.embedding is None:
             return []
         
-        # Generate embedding string
-        embedding_string = '[' + ','.join(str(v) for v in source.embedding) + ']'
-        
         # Query for similar items using pgvector
         sql = text("""
             SELECT 
@@ -307,20 +301,20 @@ class ExploreService:
                 is_truncated, is_read, reading_progress,
                 enrichment_status, published_at, last_opened_at,
                 created_at, updated_at,
-                1 - (embedding\:\:vector <=> :embedding\:\:vector) as similarity
+                1 - (embedding <=> CAST(:embedding AS vector)) as similarity
             FROM content
             WHERE id != :content_id
               AND embedding IS NOT NULL
-              AND array_length(embedding, 1) = :dim
-            ORDER BY embedding\:\:vector <=> :embedding2\:\:vector
+              AND vector_dims(embedding) = :dim
+            ORDER BY embedding <=> CAST(:embedding AS vector)
             LIMIT :limit
         """)
         
+        # The stored vector (np.ndarray) is bound as-is through the pgvector adapter
         result = db.execute(sql, {
-            'embedding': embedding_string,
-            'embedding2': embedding_string,
+            'embedding': source.embedding,
             'content_id': str(content_id),
-            'dim': settings.EMBEDDING_DIMENSION,
+            'dim': active_embedding_model()[1],
             'limit': limit
         })
         
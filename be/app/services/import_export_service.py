@@ -194,7 +194,7 @@ class ImportExportService:
         return buffer.read()
     
     @staticmethod
-    def import_pocket(db: Session, file_content: bytes, background_tasks: BackgroundTasks) -> str:
+    def import_pocket(db: Session, file_content: bytes, background_tasks: BackgroundTasks, owner_id: str) -> str:
         """Import Pocket export JSON."""
         try:
             data = json.loads(file_content)
@@ -227,13 +227,14 @@ class ImportExportService:
         background_tasks.add_task(
             bulk_import_task,
             job_id,
-            urls_to_import
+            urls_to_import,
+            owner_id,
         )
         
         return job_id
     
     @staticmethod
-    def import_raindrop(db: Session, file_content: bytes, background_tasks: BackgroundTasks) -> str:
+    def import_raindrop(db: Session, file_content: bytes, background_tasks: BackgroundTasks, owner_id: str) -> str:
         """Import Raindrop CSV export."""
         try:
             # Try to parse as CSV
@@ -262,13 +263,14 @@ class ImportExportService:
         background_tasks.add_task(
             bulk_import_task,
             job_id,
-            urls_to_import
+            urls_to_import,
+            owner_id,
         )
         
         return job_id
     
     @staticmethod
-    def import_bookmarks(db: Session, file_content: bytes, background_tasks: BackgroundTasks) -> str:
+    def import_bookmarks(db: Session, file_content: bytes, background_tasks: BackgroundTasks, owner_id: str) -> str:
         """Import browser HTML bookmark export (Netscape format)."""
         try:
             html = file_content.decode('utf-8', errors='ignore')
@@ -297,7 +299,8 @@ class ImportExportService:
         background_tasks.add_task(
             bulk_import_task,
             job_id,
-            urls_to_import
+            urls_to_import,
+            owner_id,
         )
         
         return job_id
@@ -311,7 +314,7 @@ class ImportExportService:
         return None
 
 
-def bulk_import_task(job_id: str, urls: List[Dict[str, str]]) -> None:
+def bulk_import_task(job_id: str, urls: List[Dict[str, str]], owner_id: str) -> None:
     """
     Background task for bulk importing URLs.
     
@@ -322,6 +325,7 @@ def bulk_import_task(job_id: str, urls: List[Dict[str, str]]) -> None:
     Args:
         job_id: The job ID for tracking
         urls: List of dicts with 'url' and optional 'title'
+        owner_id: ID of the importing user, who owns the saved content
     """
     job = _import_jobs.get(job_id)
     if not job:
@@ -344,9 +348,8 @@ def bulk_import_task(job_id: str, urls: List[Dict[str, str]]) -> None:
             try:
                 db.execute(text("SET SESSION app.bypass_rls = 'on'"))
                 # Try to create content from URL
-                # Note: We don't use background_tasks here to avoid nested tasks
-                # Instead, we call the service directly
-                content = ContentService.create_from_url(db, url, background_tasks=None)
+                # Enrichment is queued as a job by the service
+                content = ContentService.create_from_url_sync(db, url, owner_id)
                 job.completed += 1
                 logger.debug(f"Imported: {url}")
             except DuplicateURLError:
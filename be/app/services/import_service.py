@@ -52,7 +52,7 @@ class ImportService:
     """Service for importing data from external sources."""
     
     @staticmethod
-    def import_pocket(db: Session, file_content: bytes, background_tasks: BackgroundTasks) -> str:
+    def import_pocket(db: Session, file_content: bytes, background_tasks: BackgroundTasks, owner_id: str) -> str:
         """Import Pocket export JSON."""
         try:
             data = json.loads(file_content)
@@ -83,13 +83,14 @@ class ImportService:
         background_tasks.add_task(
             bulk_import_task,
             job_id,
-            urls_to_import
+            urls_to_import,
+            owner_id,
         )
         
         return job_id
     
     @staticmethod
-    def import_raindrop(db: Session, file_content: bytes, background_tasks: BackgroundTasks) -> str:
+    def import_raindrop(db: Session, file_content: bytes, background_tasks: BackgroundTasks, owner_id: str) -> str:
         """Import Raindrop CSV export."""
         try:
             # Try to parse as CSV
@@ -118,13 +119,14 @@ class ImportService:
         background_tasks.add_task(
             bulk_import_task,
             job_id,
-            urls_to_import
+            urls_to_import,
+            owner_id,
         )
         
         return job_id
     
     @staticmethod
-    def import_bookmarks(db: Session, file_content: bytes, background_tasks: BackgroundTasks) -> str:
+    def import_bookmarks(db: Session, file_content: bytes, background_tasks: BackgroundTasks, owner_id: str) -> str:
         """Import browser HTML bookmark export (Netscape format)."""
         try:
             html = file_content.decode('utf-8', errors='ignore')
@@ -153,7 +155,8 @@ class ImportService:
         background_tasks.add_task(
             bulk_import_task,
             job_id,
-            urls_to_import
+            urls_to_import,
+            owner_id,
         )
         
         return job_id
@@ -167,7 +170,7 @@ class ImportService:
         return None
 
 
-def bulk_import_task(job_id: str, urls: List[Dict[str, str]]) -> None:
+def bulk_import_task(job_id: str, urls: List[Dict[str, str]], owner_id: str) -> None:
     """
     Background task for bulk importing URLs.
     
@@ -178,6 +181,7 @@ def bulk_import_task(job_id: str, urls: List[Dict[str, str]]) -> None:
     Args:
         job_id: The job ID for tracking
         urls: List of dicts with 'url' and optional 'title'
+        owner_id: ID of the importing user, who owns the saved content
     """
     job = _import_jobs.get(job_id)
     if not job:
@@ -199,7 +203,7 @@ def bulk_import_task(job_id: str, urls: List[Dict[str, str]]) -> None:
             try:
                 db.execute(text("SET SESSION app.bypass_rls = 'on'"))
                 # Try to create content from URL
-                content = ContentService.create_from_url(db, url, background_tasks=None)
+                content = ContentService.create_from_url_sync(db, url, owner_id)
                 job.completed += 1
                 logger.debug(f"Imported: {url}")
             except DuplicateURLError:
@@ -0,0 +1,144 @@
+"""
+Postgres-backed job queue.
+
+Background work (enrichment) is stored in the `jobs` table instead of being
+run on the API worker, so it survives restarts and its throughput scales
+with the number of worker processes (`python -m app.worker`):
+
+1. `enqueue` adds a job in the caller's transaction, so a job exists
+   exactly when the row it refers to was committed
+2. Workers `claim` due jobs with `FOR UPDATE SKIP LOCKED`; concurrent
+   workers skip each other's rows instead of blocking on them
+3. A claimed job is leased until `locked_until` (the visibility timeout);
+   the worker renews the lease while it runs, and a job whose worker died
+   is claimed again once the lease expires
+4. Failed attempts are rescheduled with exponential backoff until
+   `max_attempts` is reached
+"""
+
+import logging
+import random
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from app.core.config import settings
+from app.models.job import Job
+
+
+logger = logging.getLogger(__name__)
+
+# Job kinds
+ENRICH_CONTENT = "enrich_content"
+
+
+class JobQueue:
+    """Enqueue, claim and settle jobs. Callers own the session and commit."""
+
+    @staticmethod
+    def enqueue(db: Session, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Job:
+        """Add a job to the caller's transaction."""
+        job = Job(kind=kind, payload=payload, max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS)
+        db.add(job)
+        return job
+
+    @staticmethod
+    def claim(db: Session, worker_id: str, limit: int, kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Lease up to `limit` due jobs to worker_id and commit.
+
+        Due jobs are queued jobs whose `run_at` has passed and running jobs
+        whose lease expired. An expired job that has used all its attempts is
+        marked failed instead of being claimed again.
+        """
+        params: Dict[str, Any] = {
+            'worker_id': worker_id,
+            'limit': limit,
+            'visibility': settings.JOB_VISIBILITY_TIMEOUT_SECONDS,
+        }
+        kind_filter = ""
+        if kinds:
+            kind_filter = "AND kind = ANY(:kinds)"
+            params['kinds'] = list(kinds)
+
+        db.execute(text(f"""
+            UPDATE jobs
+            SET status = 'failed', finished_at = now(), locked_by = NULL, locked_until = NULL,
+                last_error = COALESCE(last_error || E'\\n', '') || 'visibility timeout expired on the last attempt'
+            WHERE status = 'running' AND locked_until < now() AND attempts >= max_attempts {kind_filter}
+        """), params)
+
+        rows = db.execute(text(f"""
+            UPDATE jobs
+            SET status = 'running',
+                attempts = attempts + 1,
+                locked_by = :worker_id,
+                locked_until = now() + make_interval(secs => :visibility),
+                updated_at = now()
+            WHERE id IN (
+                SELECT id FROM jobs
+                WHERE (
+                    (status = 'queued' AND run_at <= now())
+                    OR (status = 'running' AND locked_until < now())
+                ) {kind_filter}
+                ORDER BY run_at
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING id, kind, payload, attempts, max_attempts
+        """), params).fetchall()
+        db.commit()
+        return [dict(row._mapping) for row in rows]
+
+    @staticmethod
+    def heartbeat(db: Session, worker_id: str, job_ids: List[UUID]) -> None:
+        """Renew the leases of jobs worker_id is still running."""
+        if not job_ids:
+            return
+        db.execute(text("""
+            UPDATE jobs SET locked_until = now() + make_interval(secs => :visibility)
+            WHERE id = ANY(:ids) AND locked_by = :worker_id AND status = 'running'
+        """), {'ids': list(job_ids), 'worker_id': worker_id, 'visibility': settings.JOB_VISIBILITY_TIMEOUT_SECONDS})
+        db.commit()
+
+    @staticmethod
+    def complete(db: Session, worker_id: str, job_id: UUID) -> None:
+        """Mark a job succeeded, unless its lease was lost to another worker."""
+        db.execute(text("""
+            UPDATE jobs
+            SET status = 'succeeded', finished_at = now(), locked_by = NULL, locked_until = NULL, updated_at = now()
+            WHERE id = :id AND locked_by = :worker_id AND status = 'running'
+        """), {'id': job_id, 'worker_id': worker_id})
+        db.commit()
+
+    @staticmethod
+    def fail(db: Session, worker_id: str, job: Dict[str, Any], error: str) -> None:
+        """Schedule a retry with backoff, or mark the job failed after its last attempt."""
+        final = job['attempts'] >= job['max_attempts']
+        db.execute(text("""
+            UPDATE jobs
+            SET status = :status,
+                run_at = now() + make_interval(secs => :delay),
+                finished_at = CASE WHEN :final THEN now() END,
+                locked_by = NULL, locked_until = NULL,
+                last_error = :error, updated_at = now()
+            WHERE id = :id AND locked_by = :worker_id AND status = 'running'
+        """), {
+            'id': job['id'],
+            'worker_id': worker_id,
+            'status': 'failed' if final else 'queued',
+            'final': final,
+            'delay': 0 if final else JobQueue.backoff_seconds(job['attempts']),
+            'error': error[:2000],
+        })
+        db.commit()
+
+    @staticmethod
+    def backoff_seconds(attempt: int) -> float:
+        """Delay before the retry following the given (1-based) attempt, with +/-20% jitter."""
+        delay = min(settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempt - 1), settings.JOB_RETRY_MAX_SECONDS)
+        return delay * random.uniform(0.8, 1.2)
+
+
+# Singleton instance
+job_queue = JobQueue()
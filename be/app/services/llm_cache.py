@@ -0,0 +1,236 @@
+"""
+LLM response cache.
+
+Re-enriching unchanged content, or enriching an article another user has
+already saved, used to call Groq again for an identical prompt. Results
+of `LLMService.summarize_and_tag` are cached under the SHA-256 of:
+
+- the whitespace-normalized content
+- the model
+- the prompt version (`PROMPT_VERSION` in llm_service, bumped whenever
+  the prompt changes)
+- the tag context listed in the prompt
+
+Backends (LLM_CACHE_BACKEND):
+
+- "postgres": the `llm_cache` table, shared by every process
+- "memory": a per-process dict, used by tests and local runs
+- "none": caching disabled
+
+Entries expire after LLM_CACHE_TTL_SECONDS. Beyond LLM_CACHE_MAX_ENTRIES
+the oldest entries are evicted. Cache failures are logged and treated as
+misses. Code on the shared event loop uses `aget`/`aput`, which run the
+(possibly database-backed) lookups in a worker thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models.llm import LLMCacheEntry
+from app.services.embedding_cache import normalize_text
+
+
+logger = logging.getLogger(__name__)
+
+cache_hits = metrics.counter("llm_cache_hits_total", "LLM enrichments served from the cache")
+cache_misses = metrics.counter("llm_cache_misses_total", "LLM enrichments that had to call the model")
+
+# (summary, suggested tags as a JSON array)
+CachedResult = Tuple[Optional[str], Optional[str]]
+
+
+class MemoryLLMCacheBackend:
+    """In-process LRU with expiry; the stand-in for Postgres in tests and local runs."""
+
+    def __init__(self, ttl_seconds: float = None, max_entries: int = None):
+        self.ttl = ttl_seconds or settings.LLM_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self._entries: "OrderedDict[str, Tuple[float, CachedResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result
+
+    def put(self, key: str, model: str, prompt_version: str, result: CachedResult) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class PostgresLLMCacheBackend:
+    """
+    The `llm_cache` table.
+
+    Args:
+        session_factory: Callable returning a new Session (defaults to SessionLocal)
+        prune_every: Remove expired and excess entries after this many writes
+    """
+
+    def __init__(self, session_factory: Optional[Callable] = None, ttl_seconds: int = None,
+                 max_entries: int = None, prune_every: int = 100):
+        self._session_factory = session_factory
+        self.ttl = ttl_seconds or settings.LLM_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or settings.LLM_CACHE_MAX_ENTRIES
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        db = self._session()
+        try:
+            row = db.execute(text("""
+                SELECT summary, tags FROM llm_cache
+                WHERE key = :key AND created_at > now() - make_interval(secs => :ttl)
+            """), {'key': key, 'ttl': self.ttl}).first()
+            return (row.summary, row.tags) if row else None
+        finally:
+            db.close()
+
+    def put(self, key: str, model: str, prompt_version: str, result: CachedResult) -> None:
+        db = self._session()
+        try:
+            summary, tags = result
+            stmt = insert(LLMCacheEntry.__table__).values(
+                key=key, model=model, prompt_version=prompt_version, summary=summary, tags=tags,
+            )
+            # An expired entry with the same key is replaced
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=['key'],
+                set_={'summary': stmt.excluded.summary, 'tags': stmt.excluded.tags, 'created_at': text("now()")},
+            ))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        """Delete expired entries and the oldest beyond max_entries; returns the number deleted."""
+        db = self._session()
+        try:
+            deleted = db.execute(text("""
+                DELETE FROM llm_cache WHERE created_at <= now() - make_interval(secs => :ttl)
+            """), {'ttl': self.ttl}).rowcount
+            deleted += db.execute(text("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY created_at DESC OFFSET :max_entries
+                )
+            """), {'max_entries': self.max_entries}).rowcount
+            db.commit()
+            if deleted:
+                logger.info(f"Pruned {deleted} LLM cache entries")
+            return deleted
+        except Exception as e:
+            logger.warning(f"LLM cache prune failed: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def _session(self):
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+
+class LLMCache:
+    """
+    Cache of summarize_and_tag results.
+
+    Args:
+        backend: Storage backend (defaults to the one named by LLM_CACHE_BACKEND)
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._resolved = backend is not None
+        self._backend_lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if not self._resolved:
+            with self._backend_lock:
+                if not self._resolved:
+                    self._backend = _backend_from_settings()
+                    self._resolved = True
+        return self._backend
+
+    @staticmethod
+    def key(content: str, model: str, prompt_version: str, existing_tags: Optional[List[str]]) -> str:
+        payload = json.dumps([normalize_text(content), model, prompt_version, list(existing_tags or [])])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        backend = self.backend
+        if backend is None:
+            return None
+        try:
+            result = backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            result = None
+        if result is None:
+            cache_misses.inc()
+        else:
+            cache_hits.inc()
+        return result
+
+    def put(self, key: str, model: str, prompt_version: str, result: CachedResult) -> None:
+        backend = self.backend
+        if backend is None:
+            return
+        try:
+            backend.put(key, model, prompt_version, result)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    async def aget(self, key: str) -> Optional[CachedResult]:
+        """`get` without blocking the event loop."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, model: str, prompt_version: str, result: CachedResult) -> None:
+        """`put` without blocking the event loop."""
+        await asyncio.to_thread(self.put, key, model, prompt_version, result)
+
+
+def _backend_from_settings():
+    name = settings.LLM_CACHE_BACKEND
+    if name == "postgres":
+        return PostgresLLMCacheBackend()
+    if name == "memory":
+        return MemoryLLMCacheBackend()
+    if name != "none":
+        logger.warning(f"Unknown LLM_CACHE_BACKEND {name!r}; LLM responses will not be cached")
+    return None
+
+
+# Singleton instance
+llm_cache = LLMCache()
@@ -0,0 +1,303 @@
+"""
+LLM provider backends.
+
+`LLMService` builds prompts and parses results; a provider sends chat
+requests to one backend and returns the reply text:
+
+- `GroqProvider`: the hosted Groq API through the async Groq client, paced
+  by the token-bucket limiter (app.services.rate_limiter)
+- `OllamaProvider`: a self-hosted Ollama server over its HTTP API
+  (`POST /api/chat`), with no rate limit beyond its concurrency
+
+Each provider has its own connection pool, concurrency limit and timeout,
+so a local Ollama install can be kept busy on every core while Groq calls
+stay within the account's limits. Transient failures (timeouts, connection
+errors, 5xx, 429) are retried with the shared backoff; rejected requests
+(other 4xx) are not.
+
+Providers are async and used from the shared event loop
+(app.services.event_loop).
+"""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional
+import httpx
+from groq import AsyncGroq, APIConnectionError, APIStatusError, RateLimitError
+from app.core.config import settings
+from app.services.rate_limiter import RateLimiter, parse_duration
+from app.services.tag_selector import estimate_tokens
+
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ('groq', 'ollama')
+
+
+class LLMProviderError(Exception):
+    """A call failed in a way that may succeed when retried."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMProviderError):
+    """The backend asked us to slow down (HTTP 429)."""
+
+
+class LLMRequestRejected(Exception):
+    """The backend refused the request itself (bad input, unknown model, auth)."""
+
+
+@dataclass
+class LLMResponse:
+    """Reply text of a chat completion and, if reported, the tokens it used."""
+    content: str
+    total_tokens: Optional[int] = None
+    headers: Optional[Mapping[str, str]] = None
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Delay after the given (1-based) failed attempt: exponential, with the upper half jittered."""
+    delay = min(settings.LLM_RETRY_BASE_SECONDS * 2 ** (attempt - 1), settings.LLM_RETRY_MAX_SECONDS)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Provider-requested wait from a 429 response, if any."""
+    if not headers:
+        return None
+    for name in ('retry-after', 'x-ratelimit-reset-tokens', 'x-ratelimit-reset-requests'):
+        delay = parse_duration(headers.get(name))
+        if delay is not None:
+            return min(delay, settings.LLM_RETRY_MAX_SECONDS)
+    return None
+
+
+class LLMProvider:
+    """
+    Base class: concurrency, pacing and retries around `_send`.
+
+    Args:
+        model: Model name sent with each request
+        max_concurrency: Requests in flight at once
+        limiter: Request and token budgets to pace calls to, if the backend has any
+    """
+
+    name = "base"
+
+    def __init__(self, model: str, max_concurrency: int, limiter: Optional[RateLimiter] = None):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.limiter = limiter
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+
+    @property
+    def available(self) -> bool:
+        """Whether the provider is configured well enough to be called."""
+        return True
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int = None) -> Optional[LLMResponse]:
+        """
+        Send a JSON-mode chat request, retrying transient failures up to LLM_MAX_RETRIES times.
+
+        Returns:
+            The response, or None if the request was rejected or every attempt failed
+        """
+        max_tokens = max_tokens or settings.LLM_MAX_TOKENS
+        estimated = sum(estimate_tokens(message["content"]) for message in messages) + max_tokens
+        error = None
+        for attempt in range(1, settings.LLM_MAX_RETRIES + 1):
+            if self.limiter:
+                await self.limiter.acquire(estimated)
+            try:
+                async with self._semaphore():
+                    response = await self._send(messages, max_tokens)
+                if self.limiter:
+                    self.limiter.observe(estimated, response.total_tokens, response.headers)
+                return response
+            except LLMRequestRejected as e:
+                logger.error(f"LLM request rejected by {self.name}: {e}")
+                return None
+            except LLMRateLimitError as e:
+                delay = e.retry_after or backoff_seconds(attempt)
+                if self.limiter:
+                    # Every caller shares the limit, so every caller waits
+                    self.limiter.pause(delay)
+                else:
+                    await asyncio.sleep(delay)
+                error = e
+            except LLMProviderError as e:
+                delay, error = backoff_seconds(attempt), e
+                await asyncio.sleep(delay)
+            if attempt < settings.LLM_MAX_RETRIES:
+                logger.warning(f"{self.name} call failed (attempt {attempt}/{settings.LLM_MAX_RETRIES}), retrying in {delay:.1f}s: {error}")
+
+        logger.error(f"{self.name} call failed after {settings.LLM_MAX_RETRIES} attempts: {error}")
+        return None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            # Like the limiter's queue, the semaphore belongs to one loop
+            self._slots, self._slots_loop = asyncio.Semaphore(self.max_concurrency), loop
+        return self._slots
+
+    async def _send(self, messages: List[Dict[str, str]], max_tokens: int) -> LLMResponse:
+        """One request. Raises LLMProviderError (retried) or LLMRequestRejected."""
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        """Close the provider's connections."""
+
+
+class GroqProvider(LLMProvider):
+    """
+    The Groq API, paced to LLM_REQUESTS_PER_MINUTE and LLM_TOKENS_PER_MINUTE.
+
+    Args:
+        api_key: Groq API key (defaults to GROQ_API_KEY)
+        client: Async Groq client to use instead of creating one (tests)
+    """
+
+    name = "groq"
+
+    def __init__(self, api_key: str = None, client=None):
+        super().__init__(
+            settings.LLM_MODEL,
+            settings.GROQ_MAX_CONCURRENCY,
+            RateLimiter(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE),
+        )
+        if api_key is None and settings.GROQ_API_KEY:
+            api_key = settings.GROQ_API_KEY.get_secret_value()
+        self._api_key = api_key
+        self._client = client
+
+    @property
+    def available(self) -> bool:
+        return self._client is not None or bool(self._api_key)
+
+    def _get_client(self) -> AsyncGroq:
+        if self._client is None:
+            # Retries are paced by `complete` and the limiter instead
+            self._client = AsyncGroq(
+                api_key=self._api_key,
+                max_retries=0,
+                timeout=settings.GROQ_TIMEOUT_SECONDS,
+                http_client=httpx.AsyncClient(
+                    timeout=settings.GROQ_TIMEOUT_SECONDS,
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency,
+                        max_keepalive_connections=self.max_concurrency,
+                    ),
+                ),
+            )
+        return self._client
+
+    async def _send(self, messages: List[Dict[str, str]], max_tokens: int) -> LLMResponse:
+        try:
+            raw = await self._get_client().chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=settings.LLM_TEMPERATURE,
+                response_format={"type": "json_object"}
+            )
+        except RateLimitError as e:
+            raise LLMRateLimitError(str(e), retry_after(e.response.headers))
+        except APIStatusError as e:
+            if e.status_code < 500:
+                raise LLMRequestRejected(f"{e.status_code}: {e}")
+            raise LLMProviderError(str(e))
+        except APIConnectionError as e:
+            raise LLMProviderError(str(e))
+
+        response = raw.parse()
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            content=response.choices[0].message.content,
+            total_tokens=getattr(usage, "total_tokens", None),
+            headers=raw.headers,
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class OllamaProvider(LLMProvider):
+    """
+    A self-hosted Ollama server.
+
+    Args:
+        base_url: Server URL (defaults to OLLAMA_BASE_URL)
+        transport: httpx transport for the client (tests)
+    """
+
+    name = "ollama"
+
+    def __init__(self, base_url: str = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        super().__init__(settings.OLLAMA_MODEL, settings.OLLAMA_MAX_CONCURRENCY)
+        self.base_url = (base_url or settings.OLLAMA_BASE_URL).rstrip('/')
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                # Generation on CPU can take minutes; connecting should not
+                timeout=httpx.Timeout(settings.OLLAMA_TIMEOUT_SECONDS, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def _send(self, messages: List[Dict[str, str]], max_tokens: int) -> LLMResponse:
+        try:
+            response = await self._get_client().post("/api/chat", json={
+                "model": self.model,
+                "messages": messages,
+                "stream": False,
+                "format": "json",
+                "options": {"num_predict": max_tokens, "temperature": settings.LLM_TEMPERATURE},
+            })
+        except httpx.HTTPError as e:
+            raise LLMProviderError(f"{type(e).__name__}: {e}")
+
+        if response.status_code == 429:
+            raise LLMRateLimitError("429 Too Many Requests", retry_after(response.headers))
+        if response.status_code >= 500:
+            raise LLMProviderError(f"{response.status_code}: {response.text[:200]}")
+        if response.status_code >= 400:
+            raise LLMRequestRejected(f"{response.status_code}: {response.text[:200]}")
+
+        try:
+            data = response.json()
+            content = data["message"]["content"]
+        except (ValueError, KeyError, TypeError) as e:
+            raise LLMProviderError(f"Unexpected Ollama response: {e}")
+        tokens = (data.get("prompt_eval_count") or 0) + (data.get("eval_count") or 0)
+        return LLMResponse(content=content, total_tokens=tokens or None)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_provider(name: str, base_url: str = None, api_key: str = None) -> LLMProvider:
+    """Provider for a `Preferences.llm_provider` value."""
+    if name == 'groq':
+        return GroqProvider(api_key=api_key)
+    if name == 'ollama':
+        return OllamaProvider(base_url=base_url)
+    raise ValueError(f"Unknown LLM provider: {name}")
@@ -1,47 +1,117 @@
 """
 LLM Service for auto-summarization and tag suggestion.
 
-This service uses Groq API with Llama3-8b-8192 model to:
+This service uses an LLM (Llama3 on Groq or a local Ollama server) to:
 1. Generate 2-3 sentence summaries of content
 2. Suggest 3-5 relevant tags
 
-The service runs asynchronously and doesn't block API responses.
+The service runs asynchronously and doesn't block API responses. Calls go
+through an async provider backend (app.services.llm_providers) on the
+shared event loop, so any number of enrichments can be in flight at once.
+The backend is Groq (paced to LLM_REQUESTS_PER_MINUTE and
+LLM_TOKENS_PER_MINUTE) or a self-hosted Ollama server, chosen by
+LLM_PROVIDER or the `llm_provider` preference.
+
+For bulk enrichment, `asummarize_and_tag_many` packs several short
+documents into one request that returns a JSON array of results, which
+saves the per-request overhead (system prompt, instructions, request
+budget) of one call per document. Documents missing from a batch response
+are summarized on their own.
 """
 
+import asyncio
 import json
 import logging
-import time
-from typing import Tuple, Optional, List
-from groq import Groq
+from typing import Any, Dict, Tuple, Optional, List
 from app.core.config import settings
+from app.models.preferences import Preferences
+from app.services.event_loop import event_loop
+from app.services.llm_cache import llm_cache
+from app.services.llm_providers import PROVIDERS, LLMProvider, create_provider
+from app.services.tag_selector import estimate_tokens, fit_to_budget
 
 
 logger = logging.getLogger(__name__)
 
-# Retry configuration
-MAX_RETRIES = 3
-RETRY_DELAY_BASE = 1.0  # seconds
+SYSTEM_PROMPT = "You are a highly intelligent content analysis engine. Return only JSON."
+
+# Part of the LLM cache key: bump whenever the combined prompt or its parsing
+# changes, so results produced by the old prompt are no longer served
+PROMPT_VERSION = "combined-v1"
+# The same for answers from packed requests (`_build_batch_prompt`), which are
+# cached apart so that single-document calls never get a batch answer
+BATCH_PROMPT_VERSION = "combined-batch-v1"
+
+# Prompt tokens per packed document beyond its content and tags (heading, labels)
+_BATCH_DOCUMENT_OVERHEAD = 20
 
 
 class LLMService:
     """
-    Service for LLM-powered summarization and tag suggestion using Groq.
+    Service for LLM-powered summarization and tag suggestion.
     
-    Uses the Llama3-8b-8192 model which is fast and has a free tier.
-    """
+    Uses the Llama3-8b-8192 model on Groq, which is fast and has a free tier,
+    or a self-hosted Ollama model.
     
-    def __init__(self):
-        self._client = None
+    Args:
+        provider: Backend to use instead of the configured one (tests)
+    """
     
-    def _get_client(self) -> Optional[Groq]:
-        """Lazy-initialize the Groq client."""
-        if self._client is None:
-            api_key = settings.GROQ_API_KEY.get_secret_value() if settings.GROQ_API_KEY else None
-            if not api_key:
-                logger.warning("GROQ_API_KEY not configured. LLM enrichment will not be available.")
-                return None
-            self._client = Groq(api_key=api_key)
-        return self._client
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        # Providers by (name, base URL, API key); switching back reuses the pool
+        self._providers: Dict[Tuple[str, Optional[str], Optional[str]], LLMProvider] = {}
+        self._config = (settings.LLM_PROVIDER, None, None)
+        if provider is not None:
+            self._config = (provider.name, None, None)
+            self._providers[self._config] = provider
+
+    def configure(self, provider: str, base_url: str = None, api_key: str = None) -> None:
+        """
+        Switch backends, e.g. to follow the `llm_provider` preference.
+        
+        Args:
+            provider: 'groq' or 'ollama'
+            base_url: Ollama server URL (defaults to OLLAMA_BASE_URL)
+            api_key: Groq API key (defaults to GROQ_API_KEY)
+        """
+        if provider not in PROVIDERS:
+            logger.warning(f"Unknown LLM provider {provider!r}, keeping {self._config[0]}")
+            return
+        if provider == 'groq':
+            base_url = None
+        else:
+            api_key = None
+        config = (provider, base_url or None, api_key or None)
+        if config != self._config:
+            logger.info(f"LLM provider set to {provider}")
+            self._config = config
+
+    def configure_from_preferences(self, db) -> None:
+        """Use the provider selected in the preferences row, if there is one."""
+        try:
+            prefs = db.query(Preferences).first()
+            if prefs is not None:
+                self.configure(prefs.llm_provider, prefs.ollama_base_url, prefs.groq_api_key)
+        except Exception as e:
+            logger.error(f"Error reading LLM preferences: {e}")
+            db.rollback()
+
+    def _get_provider(self) -> LLMProvider:
+        """Provider for the current configuration, created on first use."""
+        provider = self._providers.get(self._config)
+        if provider is None:
+            provider = self._providers[self._config] = create_provider(*self._config)
+        return provider
+
+    def close(self) -> None:
+        """Close every provider's connections (before the event loop shuts down)."""
+        if event_loop.running:
+            for provider in self._providers.values():
+                try:
+                    event_loop.run(provider.aclose(), timeout=10)
+                except Exception as e:
+                    logger.warning(f"Closing the {provider.name} client failed: {e}")
+        self._providers.clear()
     
     def _build_summary_prompt(self, content: str) -> str:
         """Build prompt for summarization."""
@@ -57,6 +127,8 @@ Summary (2-3 sentences):"""
         """Build prompt for tag suggestion."""
         existing_context = ""
         if existing_tags:
+            # Callers preselect relevant tags (see tag_selector); this only caps the listing
+            existing_tags = fit_to_budget(existing_tags, settings.LLM_TAG_CONTEXT_TOKENS)
             existing_context = f"\nExisting tags in the user's library: {', '.join(existing_tags)}\n"
 
         return f"""You are a highly intelligent librarian that suggests precise, semantically relevant tags for documents.
@@ -74,36 +146,12 @@ Content:
 
 Return ONLY a JSON array, like ["tag1", "tag2", "tag3"]. No other text.:"""
 
-    def _call_api_with_retry(self, create_func):
-        """
-        Call a Groq API function with exponential backoff retry.
-        
-        Args:
-            create_func: Function that creates the API request
-            
-        Returns:
-            API response or None if all retries fail
-        """
-        last_exception = None
-        
-        for attempt in range(MAX_RETRIES):
-            try:
-                return create_func()
-            except Exception as e:
-                last_exception = e
-                if attempt < MAX_RETRIES - 1:
-                    delay = RETRY_DELAY_BASE * (2 ** attempt)  # Exponential backoff
-                    logger.warning(f"API call failed (attempt {attempt + 1}/{MAX_RETRIES}), retrying in {delay}s: {e}")
-                    time.sleep(delay)
-                else:
-                    logger.error(f"API call failed after {MAX_RETRIES} attempts: {e}")
-        
-        return None
-
     def _build_combined_prompt(self, content: str, existing_tags: List[str] = None) -> str:
         """Build a combined prompt for summary and tags."""
         existing_context = ""
         if existing_tags:
+            # Callers preselect relevant tags (see tag_selector); this only caps the listing
+            existing_tags = fit_to_budget(existing_tags, settings.LLM_TAG_CONTEXT_TOKENS)
             existing_context = f"\nExisting tags in the user's library: {', '.join(existing_tags)}\n"
 
         return f"""You are a helpful assistant that summarizes web content and suggests precise, semantically relevant tags.
@@ -124,50 +172,188 @@ Content:
 Return ONLY a JSON object. Example:
 {{"summary": "This is a brief summary...", "tags": ["tag1", "tag2", "tag3"]}}"""
 
+    def _build_batch_prompt(self, documents: List[Tuple[str, List[str]]]) -> str:
+        """Build one combined prompt for several documents, numbered from 1."""
+        sections = []
+        for number, (content, existing_tags) in enumerate(documents, 1):
+            existing_context = ""
+            if existing_tags:
+                existing_context = f"Existing tags in the user's library: {', '.join(existing_tags)}\n"
+            sections.append(f"### Document {number}\n{existing_context}Content:\n{content}")
+        documents_text = "\n\n".join(sections)
+
+        return f"""You are a helpful assistant that summarizes web content and suggests precise, semantically relevant tags.
+Below are {len(documents)} numbered documents. For EACH document, produce:
+1. "summary": A brief 2-3 sentence summary that captures the main points.
+2. "tags": A list of 3-5 relevant tags.
+
+Tag Guidelines:
+- Priority 1: Use the document's existing tags if they are semantically relevant to its content.
+- Priority 2: Create new tags ONLY if existing tags don't cover the main topics.
+- Tags should be short (1-3 words each), lowercase, with hyphens for multi-word tags.
+- Focus on high-level concepts, specific entities, and domain-specific terminology.
+- Summarize and tag each document on its own; never mix content between documents.
+
+{documents_text}
+
+Return ONLY a JSON object with a "results" array holding one entry per document, in order. Example:
+{{"results": [{{"id": 1, "summary": "This is a brief summary...", "tags": ["tag1", "tag2"]}}, {{"id": 2, "summary": "...", "tags": ["tag3"]}}]}}"""
+
+    @staticmethod
+    def _parse_result(result: Any) -> Tuple[Optional[str], Optional[str]]:
+        """(summary, suggested_tags_json) from one parsed JSON result object."""
+        if not isinstance(result, dict):
+            return None, None
+        summary = result.get("summary")
+        if not isinstance(summary, str) or not summary.strip():
+            summary = None
+        tags = result.get("tags", [])
+        suggested_tags_json = None
+        if tags and isinstance(tags, list):
+            suggested_tags_json = json.dumps(tags)
+        return summary, suggested_tags_json
+
+    @staticmethod
+    def _pack(documents: List[Tuple[str, List[str]]]) -> List[List[int]]:
+        """
+        Group document indexes into requests.
+        
+        Short documents are packed in order, up to LLM_BATCH_MAX_DOCUMENTS and
+        LLM_BATCH_MAX_PROMPT_TOKENS per group; longer ones get a group of their own.
+        """
+        groups, current, current_tokens = [], [], 0
+        for index, (content, existing_tags) in enumerate(documents):
+            if len(content) > settings.LLM_BATCH_MAX_DOCUMENT_CHARS:
+                groups.append([index])
+                continue
+            tokens = estimate_tokens(content) + estimate_tokens(", ".join(existing_tags or [])) + _BATCH_DOCUMENT_OVERHEAD
+            if current and (len(current) >= settings.LLM_BATCH_MAX_DOCUMENTS
+                            or current_tokens + tokens > settings.LLM_BATCH_MAX_PROMPT_TOKENS):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+
     def summarize_and_tag(self, content: str, existing_tags: List[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Blocking `asummarize_and_tag` for synchronous callers (worker threads).
+        
+        Runs on the shared event loop; must not be called from that loop.
+        """
+        return event_loop.run(self.asummarize_and_tag(content, existing_tags))
+
+    async def asummarize_and_tag(self, content: str, existing_tags: List[str] = None) -> Tuple[Optional[str], Optional[str]]:
         """
         Generate summary and suggested tags for content in a single pass.
         
         Args:
             content: The text content to summarize and tag
-            existing_tags: List of existing tags in the user's library for semantic consistency
+            existing_tags: Existing tags in the user's library for semantic consistency,
+                most relevant first; the listing is cut at LLM_TAG_CONTEXT_TOKENS
             
         Returns:
             Tuple of (summary, suggested_tags_json) or (None, None) if failed
         """
-        client = self._get_client()
-        if not client:
-            logger.warning("Groq client not available. Skipping LLM enrichment.")
+        provider = self._get_provider()
+        if existing_tags:
+            existing_tags = fit_to_budget(existing_tags, settings.LLM_TAG_CONTEXT_TOKENS)
+        cache_key = llm_cache.key(content, provider.model, PROMPT_VERSION, existing_tags)
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+        if not provider.available:
+            logger.warning(f"LLM provider {provider.name} is not configured. Skipping LLM enrichment.")
             return None, None
+        return await self._summarize_one(provider, content, existing_tags, cache_key)
+
+    async def asummarize_and_tag_many(
+        self, documents: List[Tuple[str, List[str]]]
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Summarize and tag several documents, packing short ones into shared requests.
         
-        try:
-            # Generate combined response with retry
-            def create_combined():
-                return client.chat.completions.create(
-                    model=settings.LLM_MODEL,
-                    messages=[
-                        {"role": "system", "content": "You are a highly intelligent content analysis engine. Return only JSON."},
-                        {"role": "user", "content": self._build_combined_prompt(content, existing_tags)}
-                    ],
-                    max_tokens=settings.LLM_MAX_TOKENS,
-                    temperature=settings.LLM_TEMPERATURE,
-                    response_format={"type": "json_object"}
-                )
+        Results are cached per document. Results of `asummarize_and_tag` are
+        reused here; answers from packed requests are cached under
+        BATCH_PROMPT_VERSION, which only this method reads.
+        
+        Args:
+            documents: (content, existing_tags) per document, tags most relevant first
             
-            response = self._call_api_with_retry(create_combined)
+        Returns:
+            (summary, suggested_tags_json) per document, (None, None) where it failed
+        """
+        provider = self._get_provider()
+        results: List[Tuple[Optional[str], Optional[str]]] = [(None, None)] * len(documents)
+        pending, keys, batch_keys, prepared = [], {}, {}, {}
+        for index, (content, existing_tags) in enumerate(documents):
+            if not content:
+                continue
+            if existing_tags:
+                existing_tags = fit_to_budget(existing_tags, settings.LLM_TAG_CONTEXT_TOKENS)
+            keys[index] = llm_cache.key(content, provider.model, PROMPT_VERSION, existing_tags)
+            batch_keys[index] = llm_cache.key(content, provider.model, BATCH_PROMPT_VERSION, existing_tags)
+            prepared[index] = (content, existing_tags)
+
+        async def lookup(index: int):
+            cached = await llm_cache.aget(keys[index])
+            if cached is None:
+                cached = await llm_cache.aget(batch_keys[index])
+            return cached
+
+        cached = await asyncio.gather(*(lookup(index) for index in keys))
+        for index, result in zip(keys, cached):
+            if result is not None:
+                results[index] = result
+            else:
+                pending.append((index, *prepared[index]))
+        if not pending:
+            return results
+
+        if not provider.available:
+            logger.warning(f"LLM provider {provider.name} is not configured. Skipping LLM enrichment.")
+            return results
+
+        async def run(group: List[int]):
+            batch = [pending[i] for i in group]
+            if len(batch) > 1:
+                parsed = await self._summarize_batch(provider, [(content, tags) for _, content, tags in batch])
+                missing = []
+                for entry, result in zip(batch, parsed):
+                    if result is None:
+                        missing.append(entry)
+                        continue
+                    index = entry[0]
+                    results[index] = result
+                    await llm_cache.aput(batch_keys[index], provider.model, BATCH_PROMPT_VERSION, result)
+                if missing:
+                    logger.warning(f"Batch response left {len(missing)} of {len(batch)} documents, summarizing them one by one")
+                batch = missing
+            for index, content, existing_tags in batch:
+                results[index] = await self._summarize_one(provider, content, existing_tags, keys[index])
+
+        await asyncio.gather(*(run(group) for group in self._pack([(content, tags) for _, content, tags in pending])))
+        return results
+
+    async def _summarize_one(self, provider: LLMProvider, content: str, existing_tags: Optional[List[str]],
+                             cache_key: str) -> Tuple[Optional[str], Optional[str]]:
+        """One document per request; caches the result."""
+        try:
+            response = await provider.complete([
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": self._build_combined_prompt(content, existing_tags)}
+            ])
             if not response:
                 return None, None
             
-            result_text = response.choices[0].message.content.strip()
-            result = json.loads(result_text)
-            
-            summary = result.get("summary")
-            tags = result.get("tags", [])
+            result_text = response.content.strip()
+            summary, suggested_tags_json = self._parse_result(json.loads(result_text))
             
-            suggested_tags_json = None
-            if tags and isinstance(tags, list):
-                suggested_tags_json = json.dumps(tags)
-                
+            if summary or suggested_tags_json:
+                await llm_cache.aput(cache_key, provider.model, PROMPT_VERSION, (summary, suggested_tags_json))
             return summary, suggested_tags_json
             
         except json.JSONDecodeError as e:
@@ -177,6 +363,49 @@ Return ONLY a JSON object. Example:
             
         return None, None
 
+    async def _summarize_batch(
+        self, provider: LLMProvider, documents: List[Tuple[str, List[str]]]
+    ) -> List[Optional[Tuple[Optional[str], Optional[str]]]]:
+        """
+        Several short documents in one request.
+        
+        Returns:
+            A result per document, None for documents the response did not cover
+            (all of them if the request failed or its JSON could not be parsed)
+        """
+        parsed: List[Optional[Tuple[Optional[str], Optional[str]]]] = [None] * len(documents)
+        try:
+            response = await provider.complete([
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": self._build_batch_prompt(documents)}
+            ], max_tokens=settings.LLM_BATCH_TOKENS_PER_DOCUMENT * len(documents))
+            if not response:
+                return parsed
+
+            entries = json.loads(response.content.strip()).get("results")
+            if not isinstance(entries, list):
+                logger.error("Batch LLM response has no results array")
+                return parsed
+            for position, entry in enumerate(entries):
+                if not isinstance(entry, dict):
+                    continue
+                # Entries are matched by id; fall back to their position if it is missing
+                number = entry.get("id", position + 1)
+                if isinstance(number, str) and number.isdigit():
+                    number = int(number)
+                if not isinstance(number, int) or not 1 <= number <= len(documents):
+                    continue
+                summary, suggested_tags_json = self._parse_result(entry)
+                if summary or suggested_tags_json:
+                    parsed[number - 1] = summary, suggested_tags_json
+
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.error(f"Error parsing batch LLM JSON: {e}")
+        except Exception as e:
+            logger.error(f"Error in batch LLM enrichment: {e}")
+
+        return parsed
+
 
 # Singleton instance
 llm_service = LLMService()
@@ -0,0 +1,149 @@
+"""
+Async token-bucket rate limiter for LLM calls.
+
+Groq limits each API key by requests per minute and tokens per minute.
+Retrying blindly after 429s made throughput oscillate between bursts and
+backoff. Callers instead `acquire` one request and their estimated tokens
+before each call, and waiters are served in FIFO order at the refill rate,
+so a large import runs steadily at the configured limit.
+
+The limiter also follows the provider's feedback:
+
+- `pause` stops all callers until a `retry-after` delay has passed
+- `observe` settles the token estimate against actual usage and clamps the
+  buckets to the `x-ratelimit-remaining-*` headers
+
+All methods must be called on the event loop the limiter is used from
+(app.services.event_loop).
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Mapping, Optional
+
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds in a rate-limit header value: "12", "7.66s", "2m59.56s" or "250ms"."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """
+    Refills continuously at per_minute / 60 per second, up to capacity.
+
+    Args:
+        per_minute: Sustained budget per minute
+        capacity: Burst size (defaults to one second's worth of budget, at least 1)
+        clock: Monotonic time source (tests)
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate)
+        self._clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount (capped at capacity) is available."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        # A call larger than the bucket leaves it in debt, which later calls wait out
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        """Return unused budget (or take more, if amount is negative)."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def clamp(self, remaining: float) -> None:
+        """Never assume more budget than the provider reports."""
+        self._refill()
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """
+    Request and token budgets shared by every LLM call in the process.
+
+    Args:
+        requests_per_minute: Request budget
+        tokens_per_minute: Token budget (prompt plus completion)
+        clock: Monotonic time source (tests)
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, clock=time.monotonic):
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        # Allow a single call of up to a tenth of the minute's tokens through at once
+        self.tokens = TokenBucket(tokens_per_minute, capacity=max(1.0, tokens_per_minute / 10), clock=clock)
+        self._clock = clock
+        self._paused_until = 0.0
+        self._queue: Optional[asyncio.Lock] = None
+        self._queue_loop = None
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and `tokens` tokens may be spent, then spend them."""
+        loop = asyncio.get_running_loop()
+        if self._queue_loop is not loop:
+            # The lock belongs to one loop; a restarted loop gets a new one
+            self._queue, self._queue_loop = asyncio.Lock(), loop
+        # Holding the lock while sleeping queues callers in arrival order
+        async with self._queue:
+            while True:
+                delay = max(
+                    self._paused_until - self._clock(),
+                    self.requests.wait_time(1),
+                    self.tokens.wait_time(tokens),
+                )
+                if delay <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for `seconds` (e.g. after a 429 with retry-after)."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+        logger.warning(f"LLM rate limit reached, pausing calls for {seconds:.1f}s")
+
+    def observe(self, estimated_tokens: int, used_tokens: Optional[int] = None,
+                headers: Optional[Mapping[str, str]] = None) -> None:
+        """Reconcile a finished call with what it actually cost and what the provider reports."""
+        if used_tokens is not None:
+            self.tokens.give(estimated_tokens - used_tokens)
+        if headers:
+            for bucket, name in ((self.requests, 'x-ratelimit-remaining-requests'),
+                                 (self.tokens, 'x-ratelimit-remaining-tokens')):
+                try:
+                    bucket.clamp(float(headers[name]))
+                except (KeyError, TypeError, ValueError):
+                    pass
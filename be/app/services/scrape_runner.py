@@ -0,0 +1,121 @@
+"""
+Scraping from synchronous workers on the shared event loop.
+
+Enrichment runs in worker threads, which used to call
+`asyncio.run(ContentScraper.scrape_url(url))` per item: a new event loop
+and a new `httpx.AsyncClient` every time, so no connection was ever
+reused and items were fetched one after another. The runner submits
+scrapes to the process's long-lived loop (app.services.event_loop), where
+one pooled `AsyncClient` (HTTP/2 when SCRAPE_HTTP2 is set) serves them all.
+
+Concurrency is limited to SCRAPE_MAX_CONCURRENCY fetches in total and
+SCRAPE_PER_DOMAIN_CONCURRENCY per domain, so a batch full of links to one
+site does not hammer it.
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
+import httpx
+from app.core.config import settings
+from app.services.content_extractor import BROWSER_HEADERS, ContentScraper
+from app.services.event_loop import EventLoopThread, event_loop
+
+
+logger = logging.getLogger(__name__)
+
+
+class _DomainLimit:
+    """Semaphore for one domain, dropped once nobody holds or waits on it."""
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.users = 0
+
+
+class ScrapeRunner:
+    """
+    Scrapes on a shared event loop with a shared HTTP client.
+
+    Args:
+        max_concurrency: Fetches in flight at once across all domains
+        per_domain: Fetches in flight at once for a single domain
+        transport: httpx transport for the shared client (tests)
+        loop: Loop thread to run on (defaults to the process-wide one)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        per_domain: int = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        loop: Optional[EventLoopThread] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.SCRAPE_MAX_CONCURRENCY
+        self.per_domain = per_domain or settings.SCRAPE_PER_DOMAIN_CONCURRENCY
+        self._transport = transport
+        self._loop = loop or event_loop
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limit: Optional[asyncio.Semaphore] = None
+        self._domains: Dict[str, _DomainLimit] = {}
+
+    def scrape(self, url: str) -> dict:
+        """Scrape one URL with the shared client. Raises like `ContentScraper.scrape_url`."""
+        return self._loop.run(self._scrape(url))
+
+    def scrape_many(self, urls: List[str]) -> List[Union[dict, Exception]]:
+        """Scrape URLs concurrently; each result is the scraped dict or the exception raised."""
+        if not urls:
+            return []
+
+        async def scrape_all():
+            return await asyncio.gather(*(self._scrape(url) for url in urls), return_exceptions=True)
+
+        return self._loop.run(scrape_all())
+
+    def close(self) -> None:
+        """Close the shared client (before the loop shuts down)."""
+        if self._client is None or not self._loop.running:
+            return
+        try:
+            self._loop.run(self._close_client(), timeout=10)
+        except Exception as e:
+            logger.warning(f"Closing the scrape client failed: {e}")
+
+    async def _scrape(self, url: str) -> dict:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=BROWSER_HEADERS,
+                follow_redirects=True,
+                http2=settings.SCRAPE_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                transport=self._transport,
+            )
+            self._limit = asyncio.Semaphore(self.max_concurrency)
+
+        domain = urlparse(url).netloc.lower()
+        domain_limit = self._domains.get(domain)
+        if domain_limit is None:
+            domain_limit = self._domains[domain] = _DomainLimit(self.per_domain)
+        domain_limit.users += 1
+        try:
+            async with domain_limit.semaphore, self._limit:
+                return await ContentScraper.scrape_url(url, client=self._client)
+        finally:
+            domain_limit.users -= 1
+            if domain_limit.users == 0:
+                del self._domains[domain]
+
+    async def _close_client(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._limit = None
+
+
+# Singleton instance
+scrape_runner = ScrapeRunner()
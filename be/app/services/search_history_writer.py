@@ -0,0 +1,165 @@
+"""
+Buffered search history writer.
+
+`/search` used to commit a `search_history` row before returning, so every
+search paid for an extra write transaction. This writer queues history
+entries in memory and a background thread flushes them with a single
+multi-row INSERT whenever `SEARCH_HISTORY_FLUSH_SIZE` entries are pending or
+`SEARCH_HISTORY_FLUSH_INTERVAL_MS` has elapsed since the last flush.
+
+The buffer is capped at `SEARCH_HISTORY_BUFFER_MAX` entries; when it is full
+the oldest entries are dropped (history is best-effort). A batch that fails
+to write is put back, as far as the buffer has room, and retried on the next
+flush. Pending entries are flushed on application shutdown.
+"""
+
+import logging
+import threading
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import text
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class SearchHistoryWriter:
+    """
+    In-memory queue of search history entries flushed in batches.
+
+    Args:
+        flush_fn: Callable that persists a list of entry dicts. Defaults to
+            a multi-row INSERT via `SearchHistoryService.add_history_batch`.
+        flush_size: Flush as soon as this many entries are pending
+        flush_interval_ms: Maximum time an entry waits in the buffer
+        max_buffer: Maximum number of pending entries kept in memory
+    """
+
+    def __init__(
+        self,
+        flush_fn: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        flush_size: int = None,
+        flush_interval_ms: int = None,
+        max_buffer: int = None,
+    ):
+        self._flush_fn = flush_fn or _write_batch
+        self.flush_size = flush_size or settings.SEARCH_HISTORY_FLUSH_SIZE
+        self.flush_interval = (flush_interval_ms or settings.SEARCH_HISTORY_FLUSH_INTERVAL_MS) / 1000.0
+        self.max_buffer = max_buffer or settings.SEARCH_HISTORY_BUFFER_MAX
+
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def add(self, user_id: str, query: str, mode: str, result_count: int) -> None:
+        """Queue a history entry. Never blocks on the database."""
+        entry = {
+            'id': uuid.uuid4(),
+            'user_id': user_id,
+            'query': query,
+            'mode': mode,
+            'result_count': result_count,
+            # Stamp now so ordering reflects search time, not flush time
+            'searched_at': datetime.now(timezone.utc),
+        }
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._buffer.popleft()
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warning(f"Search history buffer full, dropped {self.dropped} entries so far")
+            self._buffer.append(entry)
+            pending = len(self._buffer)
+        self._ensure_started()
+        if pending >= self.flush_size:
+            self._wakeup.set()
+
+    def discard(self, user_id: str) -> None:
+        """Drop pending entries for a user (used when their history is cleared)."""
+        with self._lock:
+            self._buffer = deque(e for e in self._buffer if str(e['user_id']) != str(user_id))
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self) -> int:
+        """Write all pending entries now. Returns the number of entries written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._buffer:
+                        break
+                    batch = [self._buffer.popleft() for _ in range(min(self.flush_size, len(self._buffer)))]
+                try:
+                    self._flush_fn(batch)
+                    written += len(batch)
+                except Exception as e:
+                    requeued = self._requeue(batch)
+                    logger.error(
+                        f"Failed to flush {len(batch)} search history entries ({requeued} requeued, "
+                        f"{len(batch) - requeued} dropped): {e}"
+                    )
+                    break
+        return written
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> int:
+        """Put a failed batch back at the front of the buffer; returns how many entries fit."""
+        with self._lock:
+            # Entries added while the batch was in flight are newer and take precedence
+            room = max(0, self.max_buffer - len(self._buffer))
+            kept = batch[len(batch) - room:] if room < len(batch) else batch
+            self._buffer.extendleft(reversed(kept))
+            self.dropped += len(batch) - len(kept)
+            return len(kept)
+
+    def shutdown(self) -> None:
+        """Stop the background thread and flush whatever is left."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="search-history-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            self.flush()
+
+
+def _write_batch(entries: List[Dict[str, Any]]) -> None:
+    """Persist a batch of entries in one transaction."""
+    from app.db.session import SessionLocal
+    from app.services.content_search_service import SearchHistoryService
+
+    db = SessionLocal()
+    try:
+        # Entries belong to many users; RLS is enforced on the request path
+        db.execute(text("SET SESSION app.bypass_rls = 'on'"))
+        SearchHistoryService.add_history_batch(db, entries)
+    finally:
+        db.close()
+
+
+# Singleton instance
+search_history_writer = SearchHistoryWriter()
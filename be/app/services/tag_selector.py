@@ -0,0 +1,129 @@
+"""
+Tag context selection for LLM prompts.
+
+The tagging prompt lists the user's existing tags so the model reuses
+them. Listing the whole vocabulary made the prompt (and the latency and
+cost of every Groq call) grow with the library. The selector ranks the
+vocabulary by cosine similarity to the document embedding and keeps the
+top LLM_TAG_CONTEXT_MAX_TAGS that fit in LLM_TAG_CONTEXT_TOKENS.
+
+Tag vectors come from an in-process LRU, backed by the shared embedding
+cache, so each tag is embedded once per model.
+"""
+
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Union
+import numpy as np
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(value: str) -> int:
+    """Rough LLM token count (about four characters per token)."""
+    return max(1, math.ceil(len(value) / 4))
+
+
+def fit_to_budget(tags: List[str], budget: int) -> List[str]:
+    """Longest prefix of tags whose comma-separated listing fits in budget tokens."""
+    selected, used = [], 0
+    for tag in tags:
+        # One extra token for the separator
+        cost = estimate_tokens(tag) + 1
+        if used + cost > budget:
+            break
+        selected.append(tag)
+        used += cost
+    return selected
+
+
+class TagSelector:
+    """
+    Picks the existing tags worth listing in a prompt.
+
+    Args:
+        max_tags: Most tags listed (defaults to LLM_TAG_CONTEXT_MAX_TAGS)
+        budget: Token budget for the listing (defaults to LLM_TAG_CONTEXT_TOKENS)
+        cache_size: Tag vectors kept in memory (defaults to TAG_VECTOR_CACHE_SIZE)
+    """
+
+    def __init__(self, max_tags: int = None, budget: int = None, cache_size: int = None):
+        self.max_tags = max_tags or settings.LLM_TAG_CONTEXT_MAX_TAGS
+        self.budget = budget or settings.LLM_TAG_CONTEXT_TOKENS
+        self.cache_size = cache_size or settings.TAG_VECTOR_CACHE_SIZE
+        self._vectors: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def select(self, tags: List[str], document: Union[np.ndarray, str, None]) -> List[str]:
+        """
+        Select the tags most relevant to a document.
+
+        Args:
+            tags: The user's tag vocabulary
+            document: Document embedding, or text to embed when none is at hand
+
+        Returns:
+            Tags to list in the prompt, most similar first. The whole
+            vocabulary (unranked) when it already fits.
+        """
+        if not tags:
+            return []
+        if len(tags) <= self.max_tags and len(fit_to_budget(tags, self.budget)) == len(tags):
+            return list(tags)
+
+        try:
+            ranked = self._rank(tags, document)
+        except Exception as e:
+            # Without vectors, fall back to an arbitrary but bounded listing
+            logger.warning(f"Tag preselection failed, listing the first tags instead: {e}")
+            ranked = list(tags)
+        return fit_to_budget(ranked[:self.max_tags], self.budget)
+
+    def _rank(self, tags: List[str], document: Union[np.ndarray, str, None]) -> List[str]:
+        from app.services.embedding_migration import active_embedding_service
+        service = active_embedding_service()
+        if document is None or isinstance(document, str):
+            document = service.embed_array(document or "")
+        query = np.asarray(document, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if not norm:
+            return list(tags)
+
+        vectors = self._tag_vectors(service, tags)
+        scores = vectors @ (query / norm)
+        order = np.argsort(-scores, kind="stable")
+        return [tags[i] for i in order]
+
+    def _tag_vectors(self, service, tags: List[str]) -> np.ndarray:
+        """Unit-length tag vectors, one row per tag."""
+        model_name = service.model_name
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for tag in tags:
+                vector = self._vectors.get((model_name, tag))
+                if vector is not None:
+                    self._vectors.move_to_end((model_name, tag))
+                    found[tag] = vector
+
+        missing = [tag for tag in tags if tag not in found]
+        if missing:
+            from app.services.embedding_cache import embedding_cache
+            computed = embedding_cache.embed(missing, service.embed_batch_array, model_name)
+            with self._lock:
+                for tag, vector in zip(missing, computed):
+                    vector = np.asarray(vector, dtype=np.float32)
+                    norm = np.linalg.norm(vector)
+                    found[tag] = vector / norm if norm else vector
+                    self._vectors[(model_name, tag)] = found[tag]
+                while len(self._vectors) > self.cache_size:
+                    self._vectors.popitem(last=False)
+
+        return np.stack([found[tag] for tag in tags])
+
+
+# Singleton instance
+tag_selector = TagSelector()
@@ -14,6 +14,71 @@ logger = logging.getLogger(__name__)
 class TagService:
     """Service for tag analytics and suggestions."""
     
+    @staticmethod
+    def get_user_tags(db: Session, user_id: str) -> List[str]:
+        """
+        Get a user's tag vocabulary (all distinct tags and suggested tags).
+        
+        Reads the trigger-maintained user_tags table rather than unnesting
+        every content row.
+        
+        Args:
+            db: Database session
+            user_id: Owner of the tags
+            
+        Returns:
+            Tags in alphabetical order
+        """
+        return TagService.get_tags_for_users(db, [user_id]).get(str(user_id), [])
+    
+    @staticmethod
+    def get_tags_for_users(db: Session, user_ids: List[Any]) -> Dict[str, List[str]]:
+        """
+        Get the tag vocabularies of several users with one query.
+        
+        Args:
+            db: Database session
+            user_ids: Owners of the tags
+            
+        Returns:
+            Alphabetical tag lists keyed by user id string; users without
+            tags are omitted
+        """
+        if not user_ids:
+            return {}
+        sql = """
+            SELECT user_id, tag
+            FROM user_tags
+            WHERE user_id = ANY(CAST(:user_ids AS uuid[]))
+            ORDER BY user_id, tag
+        """
+        vocabularies: Dict[str, List[str]] = {}
+        for row in db.execute(text(sql), {"user_ids": [str(user_id) for user_id in user_ids]}):
+            vocabularies.setdefault(str(row.user_id), []).append(row.tag)
+        return vocabularies
+    
+    @staticmethod
+    def lock_users(db: Session, user_ids: List[Any]) -> None:
+        """
+        Take the user_tags locks of several users in user id order, until the transaction ends.
+        
+        The content_user_tags_sync trigger locks each row's user before
+        updating user_tags. A statement writing content of several users
+        would take those locks in whatever order it visits its rows, so two
+        such statements could deadlock; taking them all first, in a fixed
+        order, makes them queue instead. The keys match the trigger's.
+        
+        Args:
+            db: Database session (the caller's transaction)
+            user_ids: Users whose content the transaction is about to write
+        """
+        if not user_ids:
+            return
+        db.execute(text("""
+            SELECT count(pg_advisory_xact_lock(hashtext('user_tags'), hashtext(u::text)))
+            FROM (SELECT DISTINCT u FROM unnest(CAST(:user_ids AS uuid[])) AS u ORDER BY u) users
+        """), {"user_ids": [str(user_id) for user_id in user_ids]})
+    
     @staticmethod
     def get_tag_stats(
         db: Session,
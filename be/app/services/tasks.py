@@ -42,7 +42,7 @@ def enrich_content_task(content_id: UUID) -> None:
         logger.error(f"Enrichment task failed for content {content_id}: {e}")
 
 
-def bulk_import_task_wrapper(job_id: str, urls: List[Dict[str, Any]]) -> None:
+def bulk_import_task_wrapper(job_id: str, urls: List[Dict[str, Any]], owner_id: str) -> None:
     """
     Background task for bulk importing URLs.
     
@@ -54,10 +54,11 @@ def bulk_import_task_wrapper(job_id: str, urls: List[Dict[str, Any]]) -> None:
     Args:
         job_id: UUID string for tracking the import job
         urls: List of dicts with 'url' and optional 'title'
+        owner_id: ID of the importing user
     """
     logger.info(f"Starting bulk import task for job {job_id} with {len(urls)} URLs")
     try:
-        bulk_import_task(job_id, urls)
+        bulk_import_task(job_id, urls, owner_id)
         logger.info(f"Bulk import task completed for job {job_id}")
     except Exception as e:
         logger.error(f"Bulk import task failed for job {job_id}: {e}")
@@ -0,0 +1,205 @@
+"""
+Vector Index Management.
+
+With EMBEDDING_QUANTIZATION set, semantic search takes its candidates from a
+compact HNSW expression index over a half-precision or 1-bit copy of each
+vector, then re-ranks them with the float32 column. Only the configured
+mode's index should exist (each one is a full HNSW graph), so the indexes are
+built here, after the setting is chosen, rather than by an Alembic migration:
+
+    python -m app.services.vector_index status
+    python -m app.services.vector_index build [--mode halfvec] [--drop-exact]
+
+`build` creates the index for the mode with CREATE INDEX CONCURRENTLY, so
+writes are not blocked, and drops the quantized index of the other mode.
+halfvec and binary_quantize need pgvector 0.7; on older versions nothing is
+built and the command says so. `--drop-exact` also drops the float32 index
+(idx_content_embedding_hnsw) once a quantized index has replaced it. Streamed
+search and saved search semantic legs still order by exact distance and then
+scan the user's rows without an index. Running `build --mode none` recreates it.
+"""
+
+import argparse
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.db.session import engine
+from app.services.embedding_migration import EmbeddingMigrationService, active_embedding_model
+
+
+logger = logging.getLogger(__name__)
+
+# halfvec and binary_quantize were added in pgvector 0.7.0
+QUANTIZATION_MIN_PGVECTOR = (0, 7, 0)
+
+
+class VectorIndexError(Exception):
+    """The requested index change is not possible in the current state."""
+
+
+class VectorIndexService:
+    """Builds and drops the content vector indexes behind each search mode."""
+
+    # Index that serves each EMBEDDING_QUANTIZATION mode; definitions are shared
+    # with embedding migrations, which rebuild them on the shadow column
+    MODE_INDEXES = {
+        'none': 'idx_content_embedding_hnsw',
+        'halfvec': 'idx_content_embedding_halfvec_hnsw',
+        'binary': 'idx_content_embedding_binary_hnsw',
+    }
+    EXACT_INDEX = MODE_INDEXES['none']
+
+    def __init__(self, bind: Optional[Engine] = None):
+        self.engine = bind or engine
+
+    @staticmethod
+    def pgvector_version(conn: Connection) -> Optional[Tuple[int, ...]]:
+        """Installed pgvector version, or None if the extension is missing."""
+        version = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+        if version is None:
+            return None
+        return tuple(int(part) for part in version.split('.') if part.isdigit())
+
+    @staticmethod
+    def _index_states(conn: Connection) -> Dict[str, Optional[bool]]:
+        """Validity of each mode's index (None if it does not exist)."""
+        names = list(VectorIndexService.MODE_INDEXES.values())
+        rows = conn.execute(text("""
+            SELECT c.relname, i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+            WHERE c.relname = ANY(:names)
+        """), {'names': names})
+        valid = {row.relname: row.indisvalid for row in rows}
+        return {name: valid.get(name) for name in names}
+
+    @staticmethod
+    def _definition(name: str, dimension: int) -> str:
+        for table, live_name, _, using in EmbeddingMigrationService.INDEXES:
+            if live_name == name:
+                return f"CREATE INDEX CONCURRENTLY {name} ON {table} " + using.format(col='embedding', dim=dimension)
+        raise KeyError(name)
+
+    @staticmethod
+    def plan(
+        mode: str,
+        states: Dict[str, Optional[bool]],
+        drop_exact: bool = False,
+        keep_unused: bool = False,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Indexes to (re)build and to drop to serve `mode`.
+
+        Args:
+            mode: EMBEDDING_QUANTIZATION mode to serve
+            states: Validity of each mode's index (None if missing), as from `status`
+            drop_exact: Also drop the float32 index (quantized modes only)
+            keep_unused: Keep the quantized index of the other mode
+
+        Returns:
+            (index names to build, index names to drop)
+        """
+        if mode not in VectorIndexService.MODE_INDEXES:
+            raise VectorIndexError(
+                f"Unknown quantization mode '{mode}'. Expected one of: {', '.join(VectorIndexService.MODE_INDEXES)}"
+            )
+        if drop_exact and mode == 'none':
+            raise VectorIndexError("The exact index serves EMBEDDING_QUANTIZATION=none and can't be dropped")
+
+        target = VectorIndexService.MODE_INDEXES[mode]
+        build = [] if states.get(target) else [target]
+        drop = []
+        for other_mode, name in VectorIndexService.MODE_INDEXES.items():
+            if name == target or states.get(name) is None:
+                continue
+            if other_mode == 'none':
+                if drop_exact:
+                    drop.append(name)
+            elif not keep_unused:
+                drop.append(name)
+        return build, drop
+
+    def status(self) -> Dict[str, object]:
+        """pgvector version and the state of each mode's index."""
+        with self.engine.connect() as conn:
+            version = self.pgvector_version(conn)
+            states = self._index_states(conn)
+        return {
+            'quantization': settings.EMBEDDING_QUANTIZATION,
+            'pgvector': '.'.join(map(str, version)) if version else None,
+            **{name: 'missing' if valid is None else ('valid' if valid else 'invalid') for name, valid in states.items()},
+        }
+
+    def build(
+        self,
+        mode: Optional[str] = None,
+        drop_exact: bool = False,
+        keep_unused: bool = False,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Build the index for `mode` (default EMBEDDING_QUANTIZATION) without blocking writes.
+
+        Skipped, with a warning, when the mode needs a newer pgvector than
+        the one installed. Safe to re-run after an interruption: an invalid
+        index left by a failed concurrent build is dropped and rebuilt.
+
+        Returns:
+            (index names built, index names dropped)
+        """
+        mode = mode or settings.EMBEDDING_QUANTIZATION
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            version = self.pgvector_version(conn)
+            if version is None:
+                raise VectorIndexError("The pgvector extension is not installed")
+            if mode != 'none' and version < QUANTIZATION_MIN_PGVECTOR:
+                logger.warning(
+                    f"Skipping the {mode} index: it needs pgvector >= "
+                    f"{'.'.join(map(str, QUANTIZATION_MIN_PGVECTOR))}, installed is {'.'.join(map(str, version))}"
+                )
+                return [], []
+            in_progress = conn.execute(text("SELECT 1 FROM embedding_migrations WHERE status = 'backfilling'")).first()
+            if in_progress:
+                # Its cutover would rename the live indexes away without a shadow counterpart
+                raise VectorIndexError("An embedding migration is in progress; build indexes after its cutover")
+
+            build, drop = self.plan(mode, self._index_states(conn), drop_exact=drop_exact, keep_unused=keep_unused)
+            dimension = active_embedding_model()[1]
+            for name in build:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                logger.info(f"Building {name}")
+                conn.execute(text(self._definition(name, dimension)))
+            # Only once the replacement is in place
+            for name in drop:
+                logger.info(f"Dropping {name}")
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        return build, drop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the vector index for the semantic search mode")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="show pgvector version and index states")
+    build_parser = subparsers.add_parser("build", help="build the mode's index and drop unused ones")
+    build_parser.add_argument("--mode", choices=list(VectorIndexService.MODE_INDEXES),
+                              help="quantization mode (default: EMBEDDING_QUANTIZATION)")
+    build_parser.add_argument("--drop-exact", action="store_true",
+                              help="also drop the float32 index once the quantized index is built")
+    build_parser.add_argument("--keep-unused", action="store_true",
+                              help="keep the other mode's quantized index (e.g. for benchmarks)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = VectorIndexService()
+    try:
+        if args.command == "build":
+            service.build(args.mode, drop_exact=args.drop_exact, keep_unused=args.keep_unused)
+        for key, value in service.status().items():
+            print(f"{key}: {value}")
+    except VectorIndexError as e:
+        raise SystemExit(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Text chunking utilities for document embeddings.
+
+The embedding model truncates its input at a fixed number of word pieces
+(256 for all-MiniLM-L6-v2), so long bodies must be split before embedding.
+This module provides:
+1. Sentence splitting on punctuation and paragraph boundaries
+2. Packing sentences into chunks that fit a token budget
+"""
+
+import re
+from typing import Callable, List
+
+
+# Sentence end (., !, ? optionally followed by quotes/brackets) then whitespace,
+# or a blank line between paragraphs
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n\s*\n')
+
+
+def approximate_token_count(text: str) -> int:
+    """
+    Estimate word pieces for a text without a tokenizer.
+
+    WordPiece splits roughly 1.3 tokens per English word.
+    """
+    words = len(text.split())
+    return (words * 13 + 9) // 10
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, dropping empty fragments."""
+    if not text:
+        return []
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int,
+    count_tokens: Callable[[str], int] = approximate_token_count,
+    overlap_sentences: int = 0,
+) -> List[str]:
+    """
+    Split text into chunks of whole sentences that fit within max_tokens.
+
+    Sentences longer than the budget on their own are split on word
+    boundaries. Consecutive chunks can share `overlap_sentences` trailing
+    sentences so a passage is not cut off from its context.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk
+        count_tokens: Function returning the token count of a string
+        overlap_sentences: Sentences repeated at the start of the next chunk
+
+    Returns:
+        List of chunk strings, in document order
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+
+    # (sentence, tokens) pairs, with oversized sentences broken up
+    pieces = []
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if tokens <= max_tokens:
+            pieces.append((sentence, tokens))
+        else:
+            pieces.extend(_split_long_sentence(sentence, max_tokens, count_tokens))
+
+    chunks = []
+    current: List[tuple] = []
+    current_tokens = 0
+    for piece, tokens in pieces:
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(p for p, _ in current))
+            # Carry the overlap only if it leaves room for the new piece
+            carried = current[-overlap_sentences:] if overlap_sentences else []
+            while carried and sum(t for _, t in carried) + tokens > max_tokens:
+                carried = carried[1:]
+            current = list(carried)
+            current_tokens = sum(t for _, t in current)
+        current.append((piece, tokens))
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(p for p, _ in current))
+
+    return chunks
+
+
+def _split_long_sentence(sentence: str, max_tokens: int, count_tokens: Callable[[str], int]) -> List[tuple]:
+    """Break a sentence that exceeds the budget into word-boundary pieces."""
+    pieces = []
+    words: List[str] = []
+    for word in sentence.split():
+        candidate = " ".join(words + [word])
+        if words and count_tokens(candidate) > max_tokens:
+            piece = " ".join(words)
+            pieces.append((piece, count_tokens(piece)))
+            words = [word]
+        else:
+            words.append(word)
+    if words:
+        piece = " ".join(words)
+        pieces.append((piece, count_tokens(piece)))
+    return pieces
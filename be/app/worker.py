@@ -0,0 +1,193 @@
+"""
+Background job worker.
+
+Runs jobs from the Postgres job queue (app.services.job_queue), separately
+from the API processes:
+
+    python -m app.worker [--concurrency 4] [--kinds enrich_content] [--metrics-port 9100]
+
+Each process runs up to --concurrency (JOB_WORKER_CONCURRENCY) batches at
+once in threads and renews their leases while they run; add processes (on
+any host) to scale throughput. Jobs of a kind listed in BATCH_SIZES are
+claimed and handled together, e.g. enrichment runs through the batched
+pipeline ENRICHMENT_BATCH_SIZE items at a time. SIGTERM/SIGINT stop claiming new jobs and wait
+for the running ones to finish. The process's metrics (e.g. enrichment stage
+timings) are served on --metrics-port (WORKER_METRICS_PORT).
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics, serve
+from app.db.session import SessionLocal
+from app.services.enrichment_pipeline import enrichment_pipeline
+from app.services.event_loop import event_loop
+from app.services.job_queue import ENRICH_CONTENT, JobQueue
+from app.services.llm_service import llm_service
+from app.services.scrape_runner import scrape_runner
+
+
+logger = logging.getLogger(__name__)
+
+
+def _enrich_content(payloads: List[Dict[str, Any]]) -> Dict[int, str]:
+    retry = enrichment_pipeline.run([payload['content_id'] for payload in payloads])
+    return {
+        i: retry[payload['content_id']]
+        for i, payload in enumerate(payloads) if payload['content_id'] in retry
+    }
+
+
+# Job kind -> handler taking a batch of job payloads and returning errors by
+# position for the jobs to retry; raising retries the whole batch
+HANDLERS: Dict[str, Callable[[List[Dict[str, Any]]], Dict[int, str]]] = {
+    ENRICH_CONTENT: _enrich_content,
+}
+
+# Jobs claimed per handler call (default 1)
+BATCH_SIZES: Dict[str, int] = {
+    ENRICH_CONTENT: settings.ENRICHMENT_BATCH_SIZE,
+}
+
+
+class Worker:
+    """Claims batches of jobs and runs them on a thread pool."""
+
+    def __init__(self, concurrency: int, kinds: Optional[List[str]] = None):
+        self.concurrency = concurrency
+        self.kinds = kinds or list(HANDLERS)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._running: Dict[Any, Dict[str, Any]] = {}
+        self._batches = 0
+        self._lock = threading.Lock()
+        self._slot_free = threading.Event()
+        self._stopping = threading.Event()
+        self._done = threading.Event()
+
+    def stop(self, *args) -> None:
+        logger.info(f"Worker {self.worker_id} stopping after running jobs finish")
+        self._stopping.set()
+        self._slot_free.set()
+
+    def run(self) -> None:
+        logger.info(f"Worker {self.worker_id} started (concurrency {self.concurrency}, kinds {', '.join(self.kinds)})")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job") as executor:
+            while not self._stopping.is_set():
+                with self._lock:
+                    free = self.concurrency - self._batches
+                    self._slot_free.clear()
+                if free <= 0:
+                    self._slot_free.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+                    continue
+
+                claimed = False
+                for kind in self.kinds:
+                    while free > 0 and not self._stopping.is_set():
+                        try:
+                            jobs = self._claim(kind, BATCH_SIZES.get(kind, 1))
+                        except Exception as e:
+                            logger.error(f"Claiming {kind} jobs failed: {e}")
+                            jobs = []
+                        if not jobs:
+                            break
+                        claimed = True
+                        free -= 1
+                        with self._lock:
+                            self._batches += 1
+                            self._running.update((job['id'], job) for job in jobs)
+                        executor.submit(self._execute, kind, jobs)
+                if not claimed:
+                    self._stopping.wait(settings.JOB_POLL_INTERVAL_SECONDS)
+        self._done.set()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def _claim(self, kind: str, limit: int) -> List[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            return JobQueue.claim(db, self.worker_id, limit, [kind])
+        finally:
+            db.close()
+
+    def _execute(self, kind: str, jobs: List[Dict[str, Any]]) -> None:
+        try:
+            logger.info(f"Running {len(jobs)} {kind} job(s): {', '.join(str(job['id']) for job in jobs)}")
+            errors = HANDLERS[kind]([job['payload'] for job in jobs])
+        except Exception as e:
+            logger.error(f"{kind} batch of {len(jobs)} failed: {e}", exc_info=True)
+            errors = dict.fromkeys(range(len(jobs)), f"{type(e).__name__}: {e}")
+
+        db = SessionLocal()
+        try:
+            for i, job in enumerate(jobs):
+                try:
+                    if i in errors:
+                        logger.warning(f"{kind} job {job['id']} failed (attempt {job['attempts']}/{job['max_attempts']}): {errors[i]}")
+                        JobQueue.fail(db, self.worker_id, job, errors[i])
+                    else:
+                        JobQueue.complete(db, self.worker_id, job['id'])
+                except Exception as e:
+                    # The lease expires and another worker retries the job
+                    logger.error(f"Recording the result of job {job['id']} failed: {e}")
+                    db.rollback()
+        finally:
+            db.close()
+            with self._lock:
+                self._batches -= 1
+                for job in jobs:
+                    self._running.pop(job['id'], None)
+            self._slot_free.set()
+
+    def _heartbeat_loop(self) -> None:
+        """Renew the leases of running jobs well before they expire."""
+        interval = settings.JOB_VISIBILITY_TIMEOUT_SECONDS / 3
+        while not self._done.wait(interval):
+            with self._lock:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            db = SessionLocal()
+            try:
+                JobQueue.heartbeat(db, self.worker_id, job_ids)
+            except Exception as e:
+                logger.warning(f"Renewing job leases failed: {e}")
+            finally:
+                db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs from the Postgres job queue")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+    parser.add_argument("--kinds", nargs="+", choices=sorted(HANDLERS), help="job kinds to run (default: all)")
+    parser.add_argument("--metrics-port", type=int, default=settings.WORKER_METRICS_PORT,
+                        help="port serving GET /metrics (0 disables)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics_port:
+        try:
+            serve(metrics, args.metrics_port)
+        except OSError as e:
+            # e.g. another worker on this host already has the port
+            logger.warning(f"Not serving metrics on port {args.metrics_port}: {e}")
+    worker = Worker(max(1, args.concurrency), args.kinds)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    try:
+        worker.run()
+    finally:
+        scrape_runner.close()
+        llm_service.close()
+        event_loop.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Embedding backend benchmark.
+
+Loads the embedding model on each backend in a fresh subprocess and reports
+load time, single-text latency, batch throughput and peak RSS:
+
+    python benchmarks/bench_embedding_backends.py [--backends torch onnx onnx-int8]
+
+Each backend runs in its own process so RSS numbers are not polluted by the
+other backends' weights.
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+SAMPLE = (
+    "PostgreSQL full-text search ranks documents with ts_rank, while pgvector "
+    "orders them by cosine distance between sentence embeddings. "
+)
+
+
+def run_backend(backend: str, single_rounds: int, batch_size: int) -> dict:
+    from app.services.embedding_service import EmbeddingService
+
+    start = time.perf_counter()
+    model = EmbeddingService.load_model(backend=backend)
+    load_s = time.perf_counter() - start
+
+    model.encode(SAMPLE)  # warm up
+    latencies = []
+    for i in range(single_rounds):
+        start = time.perf_counter()
+        model.encode(f"{SAMPLE} {i}")
+        latencies.append(time.perf_counter() - start)
+
+    texts = [f"{SAMPLE * 3} {i}" for i in range(batch_size)]
+    start = time.perf_counter()
+    model.encode(texts, batch_size=32)
+    batch_s = time.perf_counter() - start
+
+    # ru_maxrss is KiB on Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'backend': backend,
+        'load_s': load_s,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000,
+        'batch_texts_per_s': batch_size / batch_s,
+        'peak_rss_mb': rss_mb,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--single-rounds", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.single_rounds, args.batch_size)))
+        return
+
+    print(f"{'backend':<10} {'load s':>7} {'p50 ms':>7} {'p95 ms':>7} {'batch/s':>8} {'RSS MB':>7}")
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", backend,
+             "--single-rounds", str(args.single_rounds), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend:<10} failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr else proc.returncode}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"{r['backend']:<10} {r['load_s']:7.2f} {r['p50_ms']:7.2f} {r['p95_ms']:7.2f} "
+              f"{r['batch_texts_per_s']:8.1f} {r['peak_rss_mb']:7.0f}")
+
+
+if __name__ == "__main__":
+    main()
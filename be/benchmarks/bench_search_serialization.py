@@ -0,0 +1,162 @@
+"""
+Search response serialization benchmark.
+
+Compares the per-item cost of turning search rows into a JSON response body:
+
+- legacy: row -> dict of ISO strings -> datetime.fromisoformat -> SearchResultItem
+  -> FastAPI jsonable_encoder + json.dumps (the path /search used before)
+- direct: row -> dict of native values -> SearchResponse validation and
+  dump_json (what FastAPI does with a plain dict and a response_model)
+
+Run from the be directory:
+
+    python benchmarks/bench_search_serialization.py [--items 100] [--rounds 200]
+"""
+
+import argparse
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.search import SearchResponse, SearchResultItem
+from app.services.content_search_service import ContentSearchService
+
+
+def make_rows(n: int):
+    now = datetime.now(timezone.utc)
+    rows = []
+    for i in range(n):
+        rows.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            source_url=f"https://example.com/articles/{i}",
+            domain="example.com",
+            og_image_url=f"https://example.com/img/{i}.png",
+            favicon_url="https://example.com/favicon.ico",
+            title=f"Article {i} about memory management",
+            author="Jane Doe",
+            summary="A short summary of the article. " * 4,
+            suggested_tags=["python", "memory"],
+            tags=["programming", "performance", "gc"],
+            notes=None,
+            word_count=1200 + i,
+            difficulty="intermediate",
+            readability_score=54.2,
+            is_truncated=False,
+            is_read=bool(i % 2),
+            reading_progress=0.3,
+            enrichment_status="complete",
+            published_at=now - timedelta(days=i),
+            last_opened_at=now - timedelta(hours=i),
+            created_at=now - timedelta(days=i, hours=1),
+            updated_at=now,
+            body="Body text " * 300,
+        ))
+    return rows
+
+
+def legacy_row_to_dict(row, relevance):
+    d = {
+        'id': str(row.id), 'source_url': row.source_url, 'domain': row.domain,
+        'og_image_url': row.og_image_url, 'favicon_url': row.favicon_url,
+        'title': row.title, 'author': row.author, 'summary': row.summary,
+        'suggested_tags': row.suggested_tags or [], 'tags': row.tags or [],
+        'notes': row.notes, 'word_count': row.word_count,
+        'reading_time_minutes': (row.word_count + 199) // 200 if row.word_count else 0,
+        'difficulty': row.difficulty, 'readability_score': row.readability_score,
+        'is_truncated': row.is_truncated, 'is_read': row.is_read,
+        'reading_progress': row.reading_progress, 'enrichment_status': row.enrichment_status,
+        'published_at': row.published_at.isoformat() if row.published_at else None,
+        'last_opened_at': row.last_opened_at.isoformat() if row.last_opened_at else None,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        'updated_at': row.updated_at.isoformat() if row.updated_at else None,
+        'relevance_score': float(relevance), 'similarity_score': 0.0,
+        'matched_excerpt': "<b>memory</b> management", 'matched_annotations': [],
+        'body': row.body,
+    }
+    return d
+
+
+def legacy_to_result_item(item):
+    return SearchResultItem(
+        id=uuid.UUID(item['id']),
+        source_url=item['source_url'], domain=item['domain'],
+        og_image_url=item.get('og_image_url'), favicon_url=item.get('favicon_url'),
+        title=item['title'], author=item.get('author'), summary=item.get('summary'),
+        suggested_tags=item.get('suggested_tags', []), tags=item.get('tags', []),
+        notes=item.get('notes'), word_count=item.get('word_count'),
+        reading_time_minutes=item.get('reading_time_minutes', 0),
+        difficulty=item.get('difficulty'), readability_score=item.get('readability_score'),
+        is_truncated=item.get('is_truncated', False), is_read=item.get('is_read', False),
+        reading_progress=item.get('reading_progress', 0.0),
+        enrichment_status=item.get('enrichment_status', 'pending'),
+        published_at=datetime.fromisoformat(item['published_at']) if item.get('published_at') else None,
+        last_opened_at=datetime.fromisoformat(item['last_opened_at']) if item.get('last_opened_at') else None,
+        created_at=datetime.fromisoformat(item['created_at']),
+        updated_at=datetime.fromisoformat(item['updated_at']),
+        relevance_score=item.get('relevance_score'), similarity_score=item.get('similarity_score'),
+        combined_score=item.get('combined_score'), matched_excerpt=item.get('matched_excerpt'),
+    )
+
+
+def legacy(rows):
+    items = [legacy_to_result_item(legacy_row_to_dict(row, 0.5)) for row in rows]
+    response = SearchResponse(items=items, total=len(items), query="memory", mode="keyword",
+                              latency_ms=12, filters_applied={})
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+RESPONSE_ADAPTER = TypeAdapter(SearchResponse)
+
+
+def direct(rows, service):
+    items = [
+        service._row_to_dict_with_scores(row, relevance=0.5, excerpt="<b>memory</b> management")
+        for row in rows
+    ]
+    response = RESPONSE_ADAPTER.validate_python({
+        'items': items, 'total': len(items), 'query': "memory",
+        'mode': "keyword", 'latency_ms': 12, 'filters_applied': {},
+    })
+    return RESPONSE_ADAPTER.dump_json(response)
+
+
+def timeit(fn, rounds):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    service = ContentSearchService(db=None, user_id=None)
+
+    # Both paths must describe the same response
+    assert SearchResponse.model_validate_json(legacy(rows)) == SearchResponse.model_validate_json(direct(rows, service))
+
+    legacy_s = timeit(lambda: legacy(rows), args.rounds)
+    direct_s = timeit(lambda: direct(rows, service), args.rounds)
+
+    print(f"{args.items} items, {args.rounds} rounds")
+    print(f"  legacy: {legacy_s * 1000:8.3f} ms/response  {legacy_s / args.items * 1e6:7.2f} us/item")
+    print(f"  direct: {direct_s * 1000:8.3f} ms/response  {direct_s / args.items * 1e6:7.2f} us/item")
+    print(f"  speedup: {legacy_s / direct_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Quantized vector index benchmark.
+
+Measures recall@k and latency of semantic search for each EMBEDDING_QUANTIZATION
+mode against exact (sequential scan) float32 search, and reports the size of
+each HNSW index. Needs both quantized indexes and a user with embedded content:
+
+    python -m app.services.vector_index build --mode halfvec --keep-unused
+    python -m app.services.vector_index build --mode binary --keep-unused
+    python benchmarks/bench_vector_quantization.py --user-id <uuid> [--queries 100] [--k 10]
+
+Queries are titles of the user's own content, so every query has real neighbours.
+Latencies include embedding the query text.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.content_search_service import ContentSearchService
+
+
+INDEXES = [
+    'idx_content_embedding_hnsw',
+    'idx_content_embedding_halfvec_hnsw',
+    'idx_content_embedding_binary_hnsw',
+]
+
+
+def run(service, queries, k, exact=False):
+    results, latencies = [], []
+    for query in queries:
+        if exact:
+            service.db.execute(text("SET LOCAL enable_indexscan = off"))
+        start = time.perf_counter()
+        items = service.semantic_search(query, limit=k)['items']
+        latencies.append(time.perf_counter() - start)
+        results.append([item['id'] for item in items])
+        service.db.rollback()
+    return results, latencies
+
+
+def recall(truth, found, k):
+    hits = sum(len(set(t[:k]) & set(f[:k])) for t, f in zip(truth, found))
+    total = sum(min(len(t), k) for t in truth)
+    return hits / total if total else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--factors", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    db.execute(text("SET SESSION app.current_user_id = :user_id"), {'user_id': args.user_id})
+    queries = [row.title for row in db.execute(text("""
+        SELECT title FROM content
+        WHERE user_id = :user_id AND embedding IS NOT NULL
+        ORDER BY random() LIMIT :n
+    """), {'user_id': args.user_id, 'n': args.queries})]
+    db.rollback()
+    if not queries:
+        sys.exit("No embedded content for this user")
+    service = ContentSearchService(db, user_id=args.user_id)
+
+    settings.EMBEDDING_QUANTIZATION = 'none'
+    run(service, queries[:5], args.k)  # warm up model and caches
+    truth, exact_lat = run(service, queries, args.k, exact=True)
+
+    print(f"{len(queries)} queries, recall@{args.k} against exact float32 search")
+    print(f"{'mode':<10} {'factor':>6} {'recall':>7} {'p50 ms':>7} {'p95 ms':>7}")
+    print(f"{'exact':<10} {'-':>6} {1.0:7.3f} {statistics.median(exact_lat) * 1000:7.2f} "
+          f"{sorted(exact_lat)[int(len(exact_lat) * 0.95) - 1] * 1000:7.2f}")
+
+    configs = [('none', None)] + [(mode, f) for mode in ('halfvec', 'binary') for f in args.factors]
+    for mode, factor in configs:
+        settings.EMBEDDING_QUANTIZATION = mode
+        if factor:
+            settings.SEMANTIC_RERANK_FACTOR = factor
+        found, lat = run(service, queries, args.k)
+        print(f"{mode:<10} {factor or '-':>6} {recall(truth, found, args.k):7.3f} "
+              f"{statistics.median(lat) * 1000:7.2f} {sorted(lat)[int(len(lat) * 0.95) - 1] * 1000:7.2f}")
+
+    print("\nSizes")
+    table_size = db.execute(text("SELECT pg_size_pretty(pg_table_size('content'))")).scalar()
+    print(f"  content table: {table_size}")
+    for name in INDEXES:
+        size = db.execute(text("SELECT pg_size_pretty(pg_relation_size(CAST(:name AS regclass)))"), {'name': name}).scalar()
+        print(f"  {name}: {size}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
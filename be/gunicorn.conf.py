@@ -0,0 +1,33 @@
+"""
+Gunicorn configuration for running the API with several uvicorn workers.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+`preload_app` imports app.main once in the master process. With
+EMBEDDING_PRELOAD=true the embedding model is loaded there, before the
+workers are forked, so its weights are shared copy-on-write instead of being
+loaded once per worker. Set EMBEDDING_WARMUP=true to run a warm-up batch in
+each worker and have /health report readiness.
+
+With EMBEDDING_WORKERS=n, each gunicorn worker instead starts n embedding
+processes of its own (on first use, or at warm-up), so size n with the
+number of gunicorn workers in mind; preloading is skipped in that mode.
+
+Preloading looks up the active embedding model in the database, so the master
+holds pooled connections when it forks; each worker drops its inherited copies
+(without closing the master's sockets) and opens its own.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count(), 4)))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+
+def post_fork(server, worker):
+    from app.db.session import engine
+    engine.dispose(close=False)
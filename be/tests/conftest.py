@@ -4,7 +4,9 @@ Pytest configuration for SmartKeep backend tests.
 This file ensures the correct Python path is set up for imports
 and provides shared test fixtures.
 """
+import os
 import sys
+import uuid
 from pathlib import Path
 
 # Add the be directory to Python path so 'app' imports work
@@ -13,8 +15,8 @@ be_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(be_dir))
 
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 # Create a shared in-memory database for all tests
@@ -33,3 +35,51 @@ TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_eng
 def db_engine():
     """Provide a shared test database engine."""
     return test_engine
+
+
+@pytest.fixture(scope="function")
+def postgres_db():
+    """
+    Provide a session on the Postgres database at TEST_POSTGRES_URL.
+
+    Triggers and other Postgres-only SQL can't run on SQLite; tests using
+    this fixture are skipped unless the variable points at a database
+    migrated to head. Everything runs in one transaction (RLS bypassed)
+    that is rolled back afterwards.
+    """
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    connection = engine.connect()
+    # Bind np.ndarray parameters as vectors, as app.db.session does
+    if engine.dialect.driver == "psycopg":
+        from pgvector.psycopg import register_vector
+    else:
+        from pgvector.psycopg2 import register_vector
+    register_vector(connection.connection.dbapi_connection)
+    transaction = connection.begin()
+    session = Session(bind=connection)
+    session.execute(text("SET LOCAL app.bypass_rls = 'on'"))
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+
+
+@pytest.fixture(scope="function")
+def make_postgres_user(postgres_db):
+    """Provide a function inserting a user into `postgres_db` and returning its id."""
+    def make() -> uuid.UUID:
+        user_id = uuid.uuid4()
+        postgres_db.execute(
+            text("INSERT INTO users (id, email, hashed_password, is_verified) VALUES (:id, :email, 'x', true)"),
+            {"id": user_id, "email": f"{user_id}@example.com"},
+        )
+        return user_id
+
+    return make
@@ -0,0 +1,71 @@
+"""
+Bulk Import Tests
+
+Validates, against Postgres (TEST_POSTGRES_URL), that the bulk import task
+saves every URL for the importing user, queues its enrichment, and counts
+duplicates and failures on the import job.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services import import_export_service as import_module
+from app.services.import_export_service import ImportJob, bulk_import_task
+
+
+@pytest.fixture
+def db(postgres_db, monkeypatch):
+    # The task opens a session per URL; give it sessions on the test's connection
+    monkeypatch.setattr(import_module, "SessionLocal", lambda: Session(bind=postgres_db.connection()))
+    return postgres_db
+
+
+def run_import(urls, owner_id):
+    job = ImportJob("job-1")
+    import_module._import_jobs[job.job_id] = job
+    try:
+        bulk_import_task(job.job_id, [{'url': url, 'title': ""} for url in urls], str(owner_id))
+    finally:
+        del import_module._import_jobs[job.job_id]
+    return job
+
+
+class TestBulkImport:
+
+    def test_urls_are_saved_for_the_importing_user(self, db, make_postgres_user):
+        user = make_postgres_user()
+        job = run_import(["https://example.com/a", "https://example.com/b/"], user)
+
+        assert (job.status, job.completed, job.failed) == ("completed", 2, 0)
+        rows = db.execute(text("SELECT id, source_url, user_id, enrichment_status FROM content WHERE user_id = :user"),
+                          {'user': user}).fetchall()
+        assert sorted(row.source_url for row in rows) == ["https://example.com/a", "https://example.com/b"]
+        assert all(row.enrichment_status == 'pending' for row in rows)
+
+        queued = db.execute(text("SELECT payload->>'content_id' FROM jobs WHERE kind = 'enrich_content'")).scalars().all()
+        assert {str(row.id) for row in rows} <= set(queued)
+
+    def test_duplicates_are_skipped(self, db, make_postgres_user):
+        user = make_postgres_user()
+        job = run_import(["https://example.com/a", "https://EXAMPLE.com/a/?utm_source=x", ""], user)
+
+        assert (job.completed, job.failed) == (2, 0)
+        count = db.execute(text("SELECT count(*) FROM content WHERE user_id = :user"), {'user': user}).scalar()
+        assert count == 1
+
+    def test_failures_are_recorded(self, db, make_postgres_user, monkeypatch):
+        user = make_postgres_user()
+
+        def fail(db, url, owner_id):
+            raise RuntimeError("scraper unavailable")
+
+        monkeypatch.setattr(import_module.ContentService, "create_from_url_sync", staticmethod(fail))
+        job = run_import(["https://example.com/a"], user)
+
+        assert (job.completed, job.failed) == (0, 1)
+        assert job.errors == [{'url': "https://example.com/a", 'error': "scraper unavailable"}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
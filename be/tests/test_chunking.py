@@ -0,0 +1,66 @@
+"""
+Chunking Tests
+
+Validates that document bodies are split on sentence boundaries into
+chunks that respect the token budget.
+"""
+
+import pytest
+
+from app.utils.chunking import split_sentences, chunk_text, approximate_token_count
+
+
+def word_count(text):
+    """Token counter used by the tests: one token per word."""
+    return len(text.split())
+
+
+class TestSplitSentences:
+
+    def test_splits_on_punctuation_and_paragraphs(self):
+        text = "First sentence. Second one! Is this third?\n\nNew paragraph without period"
+        assert split_sentences(text) == [
+            "First sentence.", "Second one!", "Is this third?", "New paragraph without period",
+        ]
+
+    def test_empty_text(self):
+        assert split_sentences("") == []
+        assert split_sentences(None) == []
+
+
+class TestChunkText:
+
+    def test_short_text_is_one_chunk(self):
+        assert chunk_text("One. Two. Three.", max_tokens=10, count_tokens=word_count) == ["One. Two. Three."]
+
+    def test_chunks_respect_budget_and_keep_sentences_whole(self):
+        text = " ".join(f"Sentence number {i} here." for i in range(20))
+        chunks = chunk_text(text, max_tokens=10, count_tokens=word_count)
+
+        assert len(chunks) == 10
+        assert all(word_count(c) <= 10 for c in chunks)
+        assert all(c.endswith("here.") for c in chunks)
+        assert " ".join(chunks) == text
+
+    def test_long_sentence_is_split_on_words(self):
+        text = " ".join(f"w{i}" for i in range(25)) + "."
+        chunks = chunk_text(text, max_tokens=10, count_tokens=word_count)
+
+        assert [word_count(c) for c in chunks] == [10, 10, 5]
+
+    def test_overlap_repeats_trailing_sentence(self):
+        text = "A b c. D e f. G h i. J k l."
+        chunks = chunk_text(text, max_tokens=6, count_tokens=word_count, overlap_sentences=1)
+
+        assert chunks == ["A b c. D e f.", "D e f. G h i.", "G h i. J k l."]
+
+    def test_invalid_budget(self):
+        with pytest.raises(ValueError):
+            chunk_text("text", max_tokens=0)
+
+    def test_approximate_token_count(self):
+        assert approximate_token_count("one two three four five six seven eight nine ten") == 13
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
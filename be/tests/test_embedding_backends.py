@@ -0,0 +1,56 @@
+"""
+Embedding Backend Tests
+
+Validates that the ONNX Runtime backends produce embeddings within a fixed
+cosine tolerance of the PyTorch reference model (skipped unless
+sentence-transformers[onnx] is installed), and that unknown backends are rejected.
+"""
+
+import pytest
+import numpy as np
+
+from app.services.embedding_service import EmbeddingService
+
+
+TEXTS = [
+    "Garbage collection in the JVM reclaims memory from unreachable objects.",
+    "How to make sourdough bread at home",
+    "PostgreSQL HNSW indexes trade recall for query speed.",
+    "",
+    "A very long document " * 200,
+]
+
+# Minimum per-text cosine similarity to the PyTorch output
+TOLERANCES = {
+    'onnx': 0.999,
+    'onnx-int8': 0.97,
+}
+
+
+@pytest.fixture(scope="module")
+def reference():
+    # Only the ONNX comparisons need the optional dependencies
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum")
+    model = EmbeddingService.load_model(backend='torch')
+    return model.encode(TEXTS, convert_to_numpy=True, normalize_embeddings=True)
+
+
+class TestEmbeddingBackends:
+
+    @pytest.mark.parametrize("backend", sorted(TOLERANCES))
+    def test_backend_matches_torch(self, reference, backend):
+        model = EmbeddingService.load_model(backend=backend)
+        embeddings = model.encode(TEXTS, convert_to_numpy=True, normalize_embeddings=True)
+
+        assert embeddings.shape == reference.shape
+        cosines = np.sum(embeddings * reference, axis=1)
+        assert cosines.min() >= TOLERANCES[backend], f"{backend} cosine to torch: {cosines.tolist()}"
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            EmbeddingService.load_model(backend='tensorrt')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,89 @@
+"""
+Embedding Batcher Tests
+
+Validates that concurrent single-text requests are coalesced into batched
+encode calls and that every caller gets back its own vector.
+"""
+
+import threading
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+
+class RecordingEncoder:
+    """Fake encode function: the 'vector' for a text is its length."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+
+class TestEmbeddingBatcher:
+
+    def test_single_request_is_encoded(self):
+        encoder = RecordingEncoder()
+        batcher = EmbeddingBatcher(encoder, max_batch_size=8, max_wait_ms=1)
+
+        assert batcher.encode("hello") == [5.0]
+        assert encoder.batches == [["hello"]]
+        batcher.shutdown()
+
+    def test_concurrent_requests_share_batches(self):
+        encoder = RecordingEncoder()
+        batcher = EmbeddingBatcher(encoder, max_batch_size=64, max_wait_ms=50)
+        texts = ["x" * i for i in range(1, 33)]
+        results = {}
+        start = threading.Barrier(len(texts))
+
+        def call(text):
+            start.wait()
+            results[text] = batcher.encode(text)
+
+        threads = [threading.Thread(target=call, args=(t,)) for t in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Each caller gets the vector for its own text
+        assert all(results[t] == [float(len(t))] for t in texts)
+        # ...computed in far fewer encode calls than requests
+        assert len(encoder.batches) < len(texts)
+        assert sum(len(b) for b in encoder.batches) == len(texts)
+        batcher.shutdown()
+
+    def test_batches_respect_max_size(self):
+        encoder = RecordingEncoder()
+        batcher = EmbeddingBatcher(encoder, max_batch_size=4, max_wait_ms=50)
+        futures = [batcher.submit(f"text {i}") for i in range(10)]
+
+        assert [f.result(timeout=5) for f in futures] == [[6.0]] * 10
+        assert max(len(b) for b in encoder.batches) <= 4
+        batcher.shutdown()
+
+    def test_encode_error_reaches_every_caller(self):
+        def failing_encoder(texts):
+            raise RuntimeError("model unavailable")
+
+        batcher = EmbeddingBatcher(failing_encoder, max_batch_size=8, max_wait_ms=20)
+        futures = [batcher.submit("a"), batcher.submit("b")]
+
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        batcher.shutdown()
+
+    def test_submit_after_shutdown_fails(self):
+        batcher = EmbeddingBatcher(RecordingEncoder(), max_batch_size=8, max_wait_ms=1)
+        batcher.shutdown()
+
+        with pytest.raises(RuntimeError):
+            batcher.submit("late")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,72 @@
+"""
+Embedding Cache Tests
+
+Validates that only uncached texts reach the model, that keys ignore
+whitespace differences, and that hits and misses are counted.
+"""
+
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache, text_hash, cache_hits, cache_misses
+
+
+class InMemoryCache(EmbeddingCache):
+    """EmbeddingCache with the Postgres table replaced by a dict."""
+
+    def __init__(self):
+        super().__init__()
+        self.store = {}
+
+    def get_many(self, texts, model_name=None):
+        return {h: self.store[h] for h in (text_hash(t) for t in texts) if h in self.store}
+
+    def put_many(self, entries, model_name=None):
+        self.store.update(entries)
+
+
+class RecordingEncoder:
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+class TestEmbeddingCache:
+
+    def test_second_embed_hits_cache(self):
+        cache, encoder = InMemoryCache(), RecordingEncoder()
+        first = cache.embed(["alpha", "beta"], encoder)
+        second = cache.embed(["alpha", "beta"], encoder)
+
+        assert first == second
+        assert encoder.calls == [["alpha", "beta"]]
+
+    def test_only_misses_are_encoded_in_order(self):
+        cache, encoder = InMemoryCache(), RecordingEncoder()
+        cache.embed(["bb"], encoder)
+
+        vectors = cache.embed(["a", "bb", "cccc"], encoder)
+
+        assert encoder.calls[-1] == ["a", "cccc"]
+        assert [v[0] for v in vectors] == [1.0, 2.0, 4.0]
+
+    def test_whitespace_differences_share_entry(self):
+        assert text_hash("Hello   world\n") == text_hash(" Hello world")
+        assert text_hash("Hello world") != text_hash("hello world")
+
+    def test_hits_and_misses_are_counted(self):
+        cache, encoder = InMemoryCache(), RecordingEncoder()
+        hits, misses = cache_hits.value(), cache_misses.value()
+
+        cache.embed(["x", "y"], encoder)
+        cache.embed(["x", "z"], encoder)
+
+        assert cache_hits.value() - hits == 1
+        assert cache_misses.value() - misses == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
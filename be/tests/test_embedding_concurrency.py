@@ -0,0 +1,76 @@
+"""
+Embedding Concurrency Tests
+
+Validates that concurrent first calls load the model only once and that
+the number of simultaneous encode calls is capped.
+"""
+
+import threading
+import time
+import numpy as np
+import pytest
+
+from app.services.embedding_service import EmbeddingService, embedding_service
+
+
+class SlowModel:
+    """Stand-in model that records how many encodes overlap."""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return np.zeros((len(texts), 384), dtype=np.float32)
+
+
+def run_concurrently(fn, n=8):
+    start = threading.Barrier(n)
+
+    def call():
+        start.wait()
+        fn()
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+class TestEmbeddingConcurrency:
+
+    def test_model_loaded_once(self, monkeypatch):
+        loads = []
+
+        def slow_load(*args, **kwargs):
+            loads.append(1)
+            time.sleep(0.05)
+            return SlowModel()
+
+        monkeypatch.setattr(embedding_service, "_model", None)
+        monkeypatch.setattr(EmbeddingService, "load_model", staticmethod(slow_load))
+
+        run_concurrently(embedding_service._get_model)
+
+        assert len(loads) == 1
+
+    def test_inference_concurrency_is_bounded(self, monkeypatch):
+        model = SlowModel()
+        monkeypatch.setattr(embedding_service, "_model", model)
+        monkeypatch.setattr(EmbeddingService, "_inference_slots", threading.BoundedSemaphore(2))
+
+        run_concurrently(lambda: embedding_service.embed_batch(["a", "b"]))
+
+        assert model.max_active == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,373 @@
+"""
+Embedding Migration Tests
+
+Validates how the active embedding model is resolved from the migration
+table (latest cutover, TTL cache, fallback on lookup failure), the
+per-model EmbeddingService instances, and that the backfill and catch-up
+passes converge under the content trigger: a row leaves the stale set once
+its shadow vector is written, and only edits put it back.
+"""
+
+import importlib.util
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services import embedding_migration
+from app.services.embedding_migration import EmbeddingMigrationService
+from app.services.embedding_service import EmbeddingService, embedding_service
+
+
+def trigger_vector_columns():
+    """Columns the content trigger lets an UPDATE change without bumping updated_at."""
+    path = Path(__file__).parent.parent / "alembic" / "versions" / "d7a2c5e8f316_skip_content_trigger_for_embedding_writes.py"
+    spec = importlib.util.spec_from_file_location("skip_content_trigger", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return set(re.findall(r"'(\w+)'", module.VECTOR_COLUMNS))
+
+
+class FakeQuery:
+
+    def __init__(self, row, error=None):
+        self.row = row
+        self.error = error
+
+    def filter(self, *args):
+        return self
+
+    def order_by(self, *args):
+        return self
+
+    def first(self):
+        if self.error:
+            raise self.error
+        return self.row
+
+
+class FakeSessionFactory:
+    """Stands in for SessionLocal; counts lookups of the migration table."""
+
+    def __init__(self, row=None, error=None):
+        self.row = row
+        self.error = error
+        self.queries = 0
+
+    def __call__(self):
+        factory = self
+
+        class Session:
+            def query(self, *args):
+                factory.queries += 1
+                return FakeQuery(factory.row, factory.error)
+
+            def close(self):
+                pass
+
+        return Session()
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    factory = FakeSessionFactory()
+    monkeypatch.setattr(embedding_migration, "SessionLocal", factory)
+    monkeypatch.setattr(embedding_migration, "_active", None)
+    monkeypatch.setattr(settings, "EMBEDDING_ACTIVE_MODEL_TTL_SECONDS", 60.0)
+    return factory
+
+
+class TestActiveEmbeddingModel:
+
+    def test_configured_model_without_cutover(self, sessions):
+        assert embedding_migration.active_embedding_model() == (settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSION)
+
+    def test_latest_cutover_wins(self, sessions):
+        sessions.row = SimpleNamespace(target_model="all-mpnet-base-v2", dimension=768)
+        assert embedding_migration.active_embedding_model() == ("all-mpnet-base-v2", 768)
+
+    def test_result_is_cached_for_ttl(self, sessions):
+        embedding_migration.active_embedding_model()
+        embedding_migration.active_embedding_model()
+        assert sessions.queries == 1
+
+    def test_lookup_failure_keeps_last_known_model(self, sessions, monkeypatch):
+        sessions.row = SimpleNamespace(target_model="all-mpnet-base-v2", dimension=768)
+        embedding_migration.active_embedding_model()
+
+        monkeypatch.setattr(settings, "EMBEDDING_ACTIVE_MODEL_TTL_SECONDS", 0.0)
+        sessions.error = RuntimeError("database unavailable")
+        assert embedding_migration.active_embedding_model() == ("all-mpnet-base-v2", 768)
+
+
+class TestPerModelServices:
+
+    def test_for_model_returns_shared_instance(self):
+        assert EmbeddingService.for_model(settings.EMBEDDING_MODEL) is embedding_service
+        other = EmbeddingService.for_model("all-mpnet-base-v2")
+        assert other is EmbeddingService.for_model("all-mpnet-base-v2")
+        assert other is not embedding_service
+        assert other.model_name == "all-mpnet-base-v2"
+
+    def test_pool_is_normalized_mean(self):
+        vectors = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+        pooled = EmbeddingService.pool(vectors)
+        assert np.allclose(pooled, [2 ** -0.5, 2 ** -0.5])
+
+
+class Rows(list):
+
+    def fetchall(self):
+        return list(self)
+
+    def scalar(self):
+        return self[0]
+
+
+class FakeContentDatabase:
+    """
+    Content and chunk rows behind the statements of the backfill and catch-up.
+
+    Updates go through the content trigger's rule: updated_at moves unless
+    only the columns in the trigger migration changed.
+    """
+
+    def __init__(self, rows):
+        self.clock = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.vector_columns = trigger_vector_columns()
+        self.content = {}
+        self.chunks = {}
+        for content_id, chunk_count in rows:
+            self.content[content_id] = {
+                'id': content_id, 'title': f"Title {content_id}", 'updated_at': self.tick(),
+                'embedding': [0.0], 'embedding_next': None, 'embedding_next_at': None,
+            }
+            for index in range(chunk_count):
+                chunk_id = f"{content_id}-{index}"
+                self.chunks[chunk_id] = {
+                    'id': chunk_id, 'content_id': content_id, 'chunk_index': index,
+                    'text': f"chunk {index}", 'embedding': [0.0], 'embedding_next': None,
+                }
+
+    def tick(self):
+        self.clock += timedelta(seconds=1)
+        return self.clock
+
+    def update_content(self, content_id, **values):
+        row = self.content[content_id]
+        values = {name: value.tolist() if isinstance(value, np.ndarray) else value for name, value in values.items()}
+        changed = {name for name, value in values.items() if row[name] != value}
+        row.update(values)
+        if changed - self.vector_columns:
+            row['updated_at'] = self.tick()
+
+    def edit(self, content_id):
+        self.update_content(content_id, title=f"Edited {content_id}")
+
+    def stale(self):
+        return sorted(
+            row['id'] for row in self.content.values()
+            if row['embedding'] is not None and (
+                row['embedding_next_at'] != row['updated_at']
+                or any(ch['content_id'] == row['id'] and ch['embedding_next'] is None for ch in self.chunks.values())
+            )
+        )
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        params = params or {}
+        if sql.startswith("SET SESSION"):
+            return Rows()
+        if sql.startswith("SELECT count(*) FROM content c WHERE"):
+            return Rows([len(self.stale())])
+        if sql.startswith("SELECT c.id FROM content c WHERE"):
+            ids = [i for i in self.stale() if params.get('after') is None or i > params['after']]
+            return Rows(SimpleNamespace(id=i) for i in ids[:params.get('limit')])
+        if sql.startswith("SELECT id FROM content WHERE embedding IS NOT NULL AND updated_at >"):
+            since = params['since'] - timedelta(seconds=params['ttl'])
+            ids = sorted(
+                row['id'] for row in self.content.values()
+                if row['embedding'] is not None and row['updated_at'] > since
+                and (params.get('after') is None or row['id'] > params['after'])
+            )
+            return Rows(SimpleNamespace(id=i) for i in ids[:params['limit']])
+        if sql.startswith("SELECT id, title, updated_at FROM content"):
+            return Rows(SimpleNamespace(**self.content[i]) for i in params['ids'] if i in self.content)
+        if sql.startswith("SELECT ch.id, ch.content_id, ch.text FROM content_chunks"):
+            chunks = sorted(
+                (ch for ch in self.chunks.values() if ch['content_id'] in params['ids']),
+                key=lambda ch: (ch['content_id'], ch['chunk_index']),
+            )
+            return Rows(SimpleNamespace(**ch) for ch in chunks)
+        match = re.match(r"UPDATE content_chunks SET (\w+) = :embedding WHERE id = :id", sql)
+        if match:
+            for row in params:
+                self.chunks[row['id']][match.group(1)] = row['embedding']
+            return Rows()
+        if sql.startswith("UPDATE content SET embedding_next = :embedding, embedding_next_at = :version"):
+            for row in params:
+                self.update_content(row['id'], embedding_next=row['embedding'], embedding_next_at=row['version'])
+            return Rows()
+        match = re.match(r"UPDATE content SET (\w+) = :embedding WHERE id = :id", sql)
+        if match:
+            for row in params:
+                self.update_content(row['id'], **{match.group(1): row['embedding']})
+            return Rows()
+        raise AssertionError(f"Unexpected statement: {sql}")
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class FakeTargetModel:
+    """Target model that can run a hook (e.g. a concurrent edit) while embedding."""
+
+    pool = staticmethod(EmbeddingService.pool)
+    passage_text = staticmethod(EmbeddingService.passage_text)
+
+    def __init__(self, during_embed=None):
+        self.during_embed = during_embed
+        self.calls = 0
+
+    def embed_passages(self, texts):
+        self.calls += 1
+        if self.during_embed:
+            self.during_embed(self.calls)
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+    def embed_batch_array(self, texts):
+        return np.ones((len(texts), 2), dtype=np.float32)
+
+
+@pytest.fixture
+def backfill(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_MIGRATION_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "EMBEDDING_MIGRATION_THROTTLE_SECONDS", 0)
+
+    def make(rows):
+        database = FakeContentDatabase(rows)
+        migration = SimpleNamespace(id="m1", last_content_id=None, processed=0)
+        return database, migration, EmbeddingMigrationService(database)
+
+    return make
+
+
+class TestBackfillConvergence:
+
+    def test_trigger_ignores_every_column_the_backfill_writes(self):
+        assert {'embedding', 'embedding_next', 'embedding_next_at', 'embedding_prev'} <= trigger_vector_columns()
+        assert not {'title', 'body', 'summary', 'tags'} & trigger_vector_columns()
+
+    def test_backfilled_rows_leave_the_stale_set(self, backfill):
+        database, migration, service = backfill([(1, 2), (2, 0), (3, 1), (4, 3), (5, 0)])
+        versions = {i: row['updated_at'] for i, row in database.content.items()}
+
+        service._backfill_pass(migration, FakeTargetModel())
+
+        assert database.stale() == []
+        assert service._stale_count() == 0
+        assert migration.processed == 5 and migration.last_content_id is None
+        # Writing the shadow vectors is not an edit
+        assert {i: row['updated_at'] for i, row in database.content.items()} == versions
+        assert all(row['embedding_next_at'] == versions[i] for i, row in database.content.items())
+
+    def test_row_edited_during_the_pass_is_picked_up_by_the_next(self, backfill):
+        database, migration, service = backfill([(1, 1), (2, 1), (3, 1)])
+        # Row 1 is edited after its batch was read but before its vectors are written
+        target = FakeTargetModel(during_embed=lambda call: call == 1 and database.edit(1))
+
+        service._backfill_pass(migration, target)
+        assert database.stale() == [1]
+
+        service._backfill_pass(migration, target)
+        assert database.stale() == []
+
+    def test_new_chunks_make_a_row_stale(self, backfill):
+        database, migration, service = backfill([(1, 1), (2, 1)])
+        service._backfill_pass(migration, FakeTargetModel())
+
+        database.chunks["2-1"] = {'id': "2-1", 'content_id': 2, 'chunk_index': 1, 'text': "chunk 1", 'embedding': [0.0], 'embedding_next': None}
+        assert database.stale() == [2]
+
+    def test_run_stops_after_one_pass_without_edits(self, backfill, monkeypatch):
+        database, migration, service = backfill([(i, 1) for i in range(1, 8)])
+        migration.status = 'backfilling'
+        migration.target_model = "all-mpnet-base-v2"
+        monkeypatch.setattr(service, "current", lambda: migration)
+        monkeypatch.setattr(embedding_migration.EmbeddingService, "for_model", classmethod(lambda cls, name: FakeTargetModel()))
+        passes = []
+        backfill_pass = service._backfill_pass
+        monkeypatch.setattr(service, "_backfill_pass", lambda *args: passes.append(1) or backfill_pass(*args))
+
+        service.run(cutover=False)
+
+        assert len(passes) == 1
+        assert database.stale() == []
+
+    def test_catch_up_reembeds_recent_rows_once(self, backfill, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_ACTIVE_MODEL_TTL_SECONDS", 0)
+        database, migration, service = backfill([(i, 1) for i in range(1, 6)])
+        migration.cutover_at = database.tick()
+        database.edit(2)
+        database.edit(4)
+        versions = {i: row['updated_at'] for i, row in database.content.items()}
+        target = FakeTargetModel()
+
+        service._catch_up(migration, target)
+
+        assert target.calls == 1
+        assert [i for i, row in database.content.items() if row['embedding'] != [0.0]] == [2, 4]
+        assert {i: row['updated_at'] for i, row in database.content.items()} == versions
+
+
+class TestContentTriggerOnPostgres:
+    """The content trigger itself; needs TEST_POSTGRES_URL."""
+
+    def content_row(self, db, content_id):
+        return db.execute(
+            text("SELECT updated_at, search_vector::text AS search_vector FROM content WHERE id = :id"),
+            {'id': content_id},
+        ).one()
+
+    @pytest.fixture
+    def content_id(self, postgres_db, make_postgres_user):
+        content_id = uuid.uuid4()
+        postgres_db.execute(text("""
+            INSERT INTO content (id, user_id, source_url, domain, title, embedding)
+            VALUES (:id, :user_id, 'https://example.com/a', 'example.com', 'Rust ownership',
+                    array_fill(0.1, ARRAY[:dimension])::vector)
+        """), {'id': content_id, 'user_id': make_postgres_user(), 'dimension': settings.EMBEDDING_DIMENSION})
+        # NOW() is fixed within the test's transaction: backdate the row so a bump shows
+        postgres_db.execute(text("ALTER TABLE content DISABLE TRIGGER content_search_vector_update"))
+        postgres_db.execute(text("UPDATE content SET updated_at = '2000-01-01' WHERE id = :id"), {'id': content_id})
+        postgres_db.execute(text("ALTER TABLE content ENABLE TRIGGER content_search_vector_update"))
+        return content_id
+
+    def test_vector_only_update_keeps_updated_at(self, postgres_db, content_id):
+        before = self.content_row(postgres_db, content_id)
+        postgres_db.execute(
+            text("UPDATE content SET embedding = array_fill(0.2, ARRAY[:dimension])::vector WHERE id = :id"),
+            {'id': content_id, 'dimension': settings.EMBEDDING_DIMENSION},
+        )
+        assert self.content_row(postgres_db, content_id) == before
+
+    def test_edit_bumps_updated_at_and_search_vector(self, postgres_db, content_id):
+        before = self.content_row(postgres_db, content_id)
+        postgres_db.execute(text("UPDATE content SET title = 'Go generics' WHERE id = :id"), {'id': content_id})
+        after = self.content_row(postgres_db, content_id)
+        assert after.updated_at > before.updated_at
+        assert "generic" in after.search_vector and "rust" not in after.search_vector
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,123 @@
+"""
+Embedding Process Pool Tests
+
+Validates that vectors encoded in worker processes match in-process
+encoding and come back as float32 arrays, and that chunking in a worker
+matches chunking with the local model (skipped without sentence-transformers),
+and that a broken pool is replaced exactly once however many callers hit it.
+"""
+
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import numpy as np
+
+from app.core.config import settings
+from app.services import embedding_pool as pool_module
+from app.services.embedding_pool import EmbeddingProcessPool
+from app.services.embedding_service import EmbeddingService
+
+
+TEXTS = [
+    "Garbage collection in the JVM reclaims memory from unreachable objects.",
+    "How to make sourdough bread at home",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pytest.importorskip("sentence_transformers")
+    pool = EmbeddingProcessPool(settings.EMBEDDING_MODEL, workers=2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture(scope="module")
+def model():
+    pytest.importorskip("sentence_transformers")
+    return EmbeddingService.load_model()
+
+
+class TestEmbeddingProcessPool:
+
+    def test_matches_in_process_encoding(self, pool, model):
+        vectors = pool.encode(TEXTS, normalize_embeddings=True)
+        expected = model.encode(TEXTS, convert_to_numpy=True, normalize_embeddings=True)
+
+        assert vectors.dtype == np.float32
+        assert vectors.shape == (len(TEXTS), pool.dimension)
+        np.testing.assert_allclose(vectors, expected, atol=1e-5)
+
+    def test_empty_batch(self, pool):
+        assert pool.encode([]).shape == (0, pool.dimension)
+
+    def test_chunking_matches_local_model(self, pool, model):
+        body = "Sentences about vector search. " * 200
+        assert pool.chunk_document("Title", body) == EmbeddingService.chunk_document(model, "Title", body)
+
+
+class BrokenExecutor:
+    """Stand-in for a pool whose worker died: every task fails."""
+
+    def __init__(self, barrier=None):
+        self.barrier = barrier
+        self.shutdowns = []
+
+    def submit(self, fn, *args):
+        if self.barrier:
+            # Hold every caller until all of them have submitted to this pool
+            self.barrier.wait()
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shutdowns.append(wait)
+
+
+class TestPoolRestart:
+
+    def test_broken_pool_is_replaced_once(self, monkeypatch):
+        callers = 8
+        broken = BrokenExecutor(threading.Barrier(callers))
+        started = []
+
+        def start(self):
+            started.append(BrokenExecutor() if started else broken)
+            return started[-1]
+
+        monkeypatch.setattr(EmbeddingProcessPool, "_start", start)
+        pool = EmbeddingProcessPool("test-model", workers=2)
+        errors = []
+
+        def call():
+            try:
+                pool._call(pool_module._model_dimension)
+            except BrokenProcessPool as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(errors) == callers
+        assert len(started) == 2 and pool._executor is started[1]
+        assert broken.shutdowns == [False]
+
+    def test_restart_after_replacement_is_ignored(self, monkeypatch):
+        monkeypatch.setattr(EmbeddingProcessPool, "_start", lambda self: BrokenExecutor())
+        pool = EmbeddingProcessPool("test-model", workers=2)
+        stale, current = BrokenExecutor(), pool._executor
+
+        pool._restart(stale)
+
+        assert pool._executor is current and stale.shutdowns == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,179 @@
+"""
+Enrichment Pipeline Tests
+
+Runs EnrichmentPipeline.run against Postgres (TEST_POSTGRES_URL) on a mixed
+batch with stubbed scraping, embedding and LLM calls: an item whose scrape
+fails, one whose every step fails and one that is enriched. Checks the
+written columns, chunks and statuses and the retry errors returned to the
+job worker.
+"""
+
+import json
+import uuid
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services import enrichment_pipeline as pipeline_module
+from app.services.enrichment_pipeline import EnrichmentPipeline
+
+
+SCRAPED_BODY = "Rust ownership rules. Borrowing without a garbage collector. Lifetimes explained."
+BROKEN_BODY = "This document breaks every enrichment step."
+
+
+def vector(*weights):
+    result = np.zeros(settings.EMBEDDING_DIMENSION, dtype=np.float32)
+    result[:len(weights)] = weights
+    return result
+
+
+class FakeScrapeRunner:
+
+    def scrape_many(self, urls):
+        return [TimeoutError("timed out") if "unreachable" in url else {
+            'title': "Rust ownership", 'content': SCRAPED_BODY, 'author': "Ferris",
+        } for url in urls]
+
+
+class FakeEmbeddingService:
+    """One chunk per sentence; fails on documents it can't handle, like a bad input would."""
+
+    def embed_documents(self, documents):
+        if any(body == BROKEN_BODY for _, body in documents):
+            raise ValueError("bad document")
+        results = []
+        for _, body in documents:
+            sentences = [s.strip() + "." for s in body.split(".") if s.strip()]
+            chunks = [
+                {'chunk_index': i, 'text': sentence, 'token_count': len(sentence.split()), 'embedding': vector(1.0, i).tolist()}
+                for i, sentence in enumerate(sentences)
+            ]
+            results.append((vector(1.0).tolist(), chunks))
+        return results
+
+
+class FakeLLMService:
+
+    def configure_from_preferences(self, db):
+        pass
+
+    async def asummarize_and_tag_many(self, documents):
+        return [(None, None) if body == BROKEN_BODY else ("About Rust ownership.", json.dumps(["rust", "memory"]))
+                for body, _ in documents]
+
+
+def fake_readability(body):
+    if body == BROKEN_BODY:
+        raise ValueError("unreadable")
+    return {'flesch_kincaid_score': 45.0}
+
+
+@pytest.fixture
+def db(postgres_db, monkeypatch):
+    # The pipeline commits and rolls back its own sessions; savepoints keep
+    # that inside the test's transaction
+    monkeypatch.setattr(pipeline_module, "SessionLocal",
+                        lambda: Session(bind=postgres_db.connection(), join_transaction_mode="create_savepoint"))
+    monkeypatch.setattr(pipeline_module, "scrape_runner", FakeScrapeRunner())
+    monkeypatch.setattr(pipeline_module, "active_embedding_service", lambda: FakeEmbeddingService())
+    monkeypatch.setattr(pipeline_module, "llm_service", FakeLLMService())
+    monkeypatch.setattr(pipeline_module, "analyze_readability", fake_readability)
+    monkeypatch.setattr(pipeline_module.tag_selector, "select", lambda tags, document: tags)
+    monkeypatch.setattr(settings, "ENRICHMENT_PROFILING", False)
+    return postgres_db
+
+
+@pytest.fixture
+def batch(db, make_postgres_user):
+    user_id = make_postgres_user()
+
+    def add(url, body=None):
+        content_id = uuid.uuid4()
+        db.execute(text("""
+            INSERT INTO content (id, user_id, source_url, domain, title, body, enrichment_status)
+            VALUES (:id, :user_id, :url, 'pending.example.com', 'Processing...', :body, 'pending')
+        """), {'id': content_id, 'user_id': user_id, 'url': url, 'body': body})
+        return str(content_id)
+
+    return {
+        'unreachable': add("https://unreachable.example.com/post"),
+        'broken': add("https://example.com/broken", BROKEN_BODY),
+        'enriched': add("https://blog.example.com/rust"),
+    }
+
+
+def content(db, content_id):
+    return db.execute(text("SELECT * FROM content WHERE id = :id"), {'id': content_id}).fetchone()
+
+
+def chunks(db, content_id):
+    return db.execute(text(
+        "SELECT chunk_index, text, user_id FROM content_chunks WHERE content_id = :id ORDER BY chunk_index"
+    ), {'id': content_id}).fetchall()
+
+
+class TestEnrichmentPipeline:
+
+    def test_only_scrape_failures_are_retried(self, db, batch):
+        retry = EnrichmentPipeline.run(list(batch.values()))
+        assert retry == {batch['unreachable']: "Scraping failed: timed out"}
+
+    def test_enriched_item_is_written(self, db, batch):
+        EnrichmentPipeline.run(list(batch.values()))
+
+        row = content(db, batch['enriched'])
+        assert row.enrichment_status == 'ready' and row.enrichment_error is None
+        assert (row.title, row.body, row.author) == ("Rust ownership", SCRAPED_BODY, "Ferris")
+        assert row.domain == "blog.example.com" and row.word_count == len(SCRAPED_BODY.split())
+        assert row.readability_score == 45.0 and row.difficulty == 'intermediate'
+        assert row.summary == "About Rust ownership." and row.suggested_tags == ["rust", "memory"]
+        assert np.allclose(row.embedding.to_numpy(), vector(1.0))
+
+        stored = chunks(db, batch['enriched'])
+        assert [chunk.text for chunk in stored] == [
+            "Rust ownership rules.", "Borrowing without a garbage collector.", "Lifetimes explained.",
+        ]
+        assert all(chunk.user_id == row.user_id for chunk in stored)
+
+    def test_item_whose_steps_all_failed(self, db, batch):
+        EnrichmentPipeline.run(list(batch.values()))
+
+        row = content(db, batch['broken'])
+        assert row.enrichment_status == 'failed'
+        assert row.enrichment_error == "All enrichment steps failed"
+        assert row.body == BROKEN_BODY and row.embedding is None and row.summary is None
+        assert chunks(db, batch['broken']) == []
+
+    def test_scrape_failure_keeps_the_stub(self, db, batch):
+        EnrichmentPipeline.run(list(batch.values()))
+
+        row = content(db, batch['unreachable'])
+        assert row.enrichment_status == 'failed'
+        assert row.enrichment_error == "Scraping failed: timed out"
+        assert row.title == "Processing..." and row.body is None and row.domain == "pending.example.com"
+        assert chunks(db, batch['unreachable']) == []
+
+    def test_rerun_replaces_chunks(self, db, batch):
+        EnrichmentPipeline.run([batch['enriched']])
+        EnrichmentPipeline.run([batch['enriched']])
+
+        assert [chunk.chunk_index for chunk in chunks(db, batch['enriched'])] == [0, 1, 2]
+
+    def test_suggested_tags_reach_user_tags(self, db, batch):
+        EnrichmentPipeline.run(list(batch.values()))
+
+        user_id = content(db, batch['enriched']).user_id
+        tags = db.execute(text("SELECT tag, item_count FROM user_tags WHERE user_id = :user_id ORDER BY tag"),
+                          {'user_id': user_id}).fetchall()
+        assert [tuple(row) for row in tags] == [("memory", 1), ("rust", 1)]
+
+    def test_unknown_ids(self, db):
+        assert EnrichmentPipeline.run([str(uuid.uuid4())]) == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
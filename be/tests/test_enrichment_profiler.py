@@ -0,0 +1,168 @@
+"""
+Enrichment Profiler Tests
+
+Validates stage timing (wall-clock and CPU, across threads), that finished
+runs are recorded in the histograms and the run store, the histogram
+exposition format, the worker's metrics server, and the p50/p95 report.
+"""
+
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import Histogram, Registry, serve
+from app.services import enrichment_profiler
+from app.services.enrichment_profiler import (
+    EnrichmentProfile, format_report, percentile, stage_report, stage_seconds,
+)
+
+
+class FakeRunStore:
+
+    def __init__(self, fail=False):
+        self.saved = []
+        self.fail = fail
+
+    def save(self, mode, items, wall, cpu, stages):
+        if self.fail:
+            raise RuntimeError("database is down")
+        self.saved.append({'mode': mode, 'items': items, 'wall': wall, 'cpu': cpu, 'stages': stages})
+
+
+@pytest.fixture
+def store(monkeypatch):
+    fake = FakeRunStore()
+    monkeypatch.setattr(enrichment_profiler, "enrichment_runs", fake)
+    monkeypatch.setattr(settings, "ENRICHMENT_PROFILING", True)
+    return fake
+
+
+def busy(seconds):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+class TestEnrichmentProfile:
+
+    def test_stages_record_wall_and_cpu_time(self, store):
+        profile = EnrichmentProfile('pipeline', items=4)
+        with profile.stage('llm'):
+            time.sleep(0.05)
+        with profile.stage('embed'):
+            busy(0.05)
+        profile.finish()
+
+        run = store.saved[0]
+        assert run['mode'] == 'pipeline' and run['items'] == 4
+        llm, embed = run['stages']['llm'], run['stages']['embed']
+        assert llm['wall'] >= 0.05 and llm['cpu'] < 0.03
+        assert embed['cpu'] >= 0.04
+        assert run['wall'] >= llm['wall'] + embed['wall']
+
+    def test_stages_timed_from_threads_accumulate(self, store):
+        profile = EnrichmentProfile('single')
+
+        def work():
+            with profile.stage('embed'):
+                busy(0.02)
+
+        threads = [threading.Thread(target=work) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        profile.finish()
+
+        assert store.saved[0]['stages']['embed']['cpu'] >= 0.05
+
+    def test_failing_stage_is_still_timed(self, store):
+        profile = EnrichmentProfile('single')
+        with pytest.raises(ValueError):
+            with profile.stage('scrape'):
+                raise ValueError("unreachable")
+        assert 'scrape' in profile.stages
+
+    def test_finish_observes_histograms(self, store):
+        before = stage_seconds.count(mode='pipeline', stage='write')
+        profile = EnrichmentProfile('pipeline')
+        with profile.stage('write'):
+            pass
+        profile.finish()
+        assert stage_seconds.count(mode='pipeline', stage='write') == before + 1
+
+    def test_store_errors_do_not_fail_the_run(self, monkeypatch):
+        monkeypatch.setattr(enrichment_profiler, "enrichment_runs", FakeRunStore(fail=True))
+        EnrichmentProfile('single').finish()
+
+    def test_disabled_profiling_records_nothing(self, store, monkeypatch):
+        monkeypatch.setattr(settings, "ENRICHMENT_PROFILING", False)
+        EnrichmentProfile('single').finish()
+        assert store.saved == []
+
+
+class TestHistogram:
+
+    def test_renders_cumulative_buckets(self):
+        histogram = Histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, stage="llm")
+
+        lines = histogram.render().splitlines()
+        assert lines[1] == "# TYPE stage_seconds histogram"
+        assert 'stage_seconds_bucket{stage="llm",le="0.1"} 2' in lines
+        assert 'stage_seconds_bucket{stage="llm",le="1"} 3' in lines
+        assert 'stage_seconds_bucket{stage="llm",le="+Inf"} 4' in lines
+        assert 'stage_seconds_sum{stage="llm"} 3.65' in lines
+        assert 'stage_seconds_count{stage="llm"} 4' in lines
+
+    def test_metrics_server(self):
+        registry = Registry()
+        registry.histogram("stage_seconds", "Stage time").observe(0.2)
+        server = serve(registry, 0, host="127.0.0.1")
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                assert "stage_seconds_count 1" in response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestReport:
+
+    def test_percentile_interpolates(self):
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == pytest.approx(50.5)
+        assert percentile(values, 95) == pytest.approx(95.05)
+        assert percentile([3.0], 95) == 3.0
+        assert percentile([], 50) == 0.0
+
+    def test_stage_report(self):
+        runs = [
+            {'items': 2, 'wall_seconds': 4.0, 'cpu_seconds': 1.0,
+             'stages': {'write': {'wall': 1.0, 'cpu': 0.5}, 'llm': {'wall': 3.0, 'cpu': 0.5}}},
+            {'items': 4, 'wall_seconds': 8.0, 'cpu_seconds': 2.0,
+             'stages': {'write': {'wall': 1.0, 'cpu': 1.0}, 'llm': {'wall': 7.0, 'cpu': 1.0}}},
+        ]
+
+        rows = {row['stage']: row for row in stage_report(runs)}
+        assert [row['stage'] for row in stage_report(runs)] == ['llm', 'write', 'total']
+        assert rows['llm']['wall_p50'] == pytest.approx(5.0)
+        assert rows['llm']['wall_p95'] == pytest.approx(6.8)
+        assert rows['llm']['share'] == pytest.approx(10 / 12)
+        assert rows['total']['runs'] == 2
+
+        per_item = {row['stage']: row for row in stage_report(runs, per_item=True)}
+        assert per_item['llm']['wall_p50'] == pytest.approx(1.625)
+
+        table = format_report(stage_report(runs))
+        assert table.splitlines()[0].split() == ['stage', 'runs', 'wall', 'p50', 'wall', 'p95', 'cpu', 'p50', 'cpu', 'p95', 'share']
+        assert "83%" in table
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+"""
+Health Check Tests
+
+Validates that GET /health reports 503 while the embedding model warm-up
+started at application startup is still running, and 200 once it is done.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+from app.core.config import settings
+from app.services.embedding_service import EmbeddingService
+
+
+class GatedModel:
+    """Stand-in model whose encode calls block until the gate is opened."""
+
+    def __init__(self, gate):
+        self.gate = gate
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        assert self.gate.wait(timeout=10)
+        return np.zeros((len(texts), 384), dtype=np.float32)
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    gate = threading.Event()
+    service = EmbeddingService("test-model")
+    monkeypatch.setattr(EmbeddingService, "load_model", staticmethod(lambda *args, **kwargs: GatedModel(gate)))
+    monkeypatch.setattr(main, "active_embedding_service", lambda: service)
+    monkeypatch.setattr(settings, "EMBEDDING_WORKERS", 0)
+    yield gate
+    # Never leave the warm-up thread blocked
+    gate.set()
+
+
+def wait_for_status(client, status_code, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/health")
+        if response.status_code == status_code or time.monotonic() > deadline:
+            return response
+        time.sleep(0.01)
+
+
+class TestHealth:
+
+    def test_unavailable_until_warm_up_completes(self, gate, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_WARMUP", True)
+
+        with TestClient(main.app) as client:
+            response = client.get("/health")
+            assert response.status_code == 503
+            assert response.json()['status'] == "starting"
+            assert response.json()['embedding']['warm'] is False
+
+            gate.set()
+            response = wait_for_status(client, 200)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body['status'] == "ok"
+        assert body['embedding']['warm'] is True and body['embedding']['loaded'] is True
+        assert body['embedding']['warmup_ms'] is not None
+
+    def test_ready_immediately_without_warm_up(self, gate, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_WARMUP", False)
+
+        with TestClient(main.app) as client:
+            response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.json()['embedding']['loaded'] is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
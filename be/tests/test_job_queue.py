@@ -0,0 +1,139 @@
+"""
+Job Queue Tests
+
+Validates retry backoff and that the worker runs claimed jobs in batches with
+bounded concurrency, completing successful jobs and rescheduling failed ones.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app import worker as worker_module
+from app.core.config import settings
+from app.services.job_queue import JobQueue
+
+
+class FakeSession:
+
+    def close(self):
+        pass
+
+
+class FakeQueue:
+    """Stands in for JobQueue: hands out a fixed list of jobs and records results."""
+
+    def __init__(self, jobs):
+        self.pending = list(jobs)
+        self.claims = []
+        self.completed = []
+        self.failed = []
+        self._lock = threading.Lock()
+
+    def claim(self, db, worker_id, limit, kinds=None):
+        with self._lock:
+            claimed, self.pending = self.pending[:limit], self.pending[limit:]
+            if claimed:
+                self.claims.append(len(claimed))
+        return claimed
+
+    def complete(self, db, worker_id, job_id):
+        with self._lock:
+            self.completed.append(job_id)
+
+    def fail(self, db, worker_id, job, error):
+        with self._lock:
+            self.failed.append((job['id'], error))
+
+    def heartbeat(self, db, worker_id, job_ids):
+        pass
+
+
+def make_job(i, kind="test"):
+    return {'id': i, 'kind': kind, 'payload': {'n': i}, 'attempts': 1, 'max_attempts': 3}
+
+
+def run_worker(monkeypatch, jobs, handler, concurrency=2, batch_size=1):
+    queue = FakeQueue(jobs)
+    monkeypatch.setattr(worker_module, "JobQueue", queue)
+    monkeypatch.setattr(worker_module, "SessionLocal", FakeSession)
+    monkeypatch.setitem(worker_module.HANDLERS, "test", handler)
+    monkeypatch.setitem(worker_module.BATCH_SIZES, "test", batch_size)
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL_SECONDS", 0.01)
+
+    worker = worker_module.Worker(concurrency, kinds=["test"])
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    deadline = time.time() + 5
+    while len(queue.completed) + len(queue.failed) < len(jobs) and time.time() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+    thread.join(5)
+    return queue
+
+
+class TestBackoff:
+
+    def test_doubles_per_attempt_within_jitter(self, monkeypatch):
+        monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10.0)
+        monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 3600.0)
+        for attempt, expected in [(1, 10), (2, 20), (4, 80)]:
+            assert expected * 0.8 <= JobQueue.backoff_seconds(attempt) <= expected * 1.2
+
+    def test_capped_at_maximum(self, monkeypatch):
+        monkeypatch.setattr(settings, "JOB_RETRY_BASE_SECONDS", 10.0)
+        monkeypatch.setattr(settings, "JOB_RETRY_MAX_SECONDS", 60.0)
+        assert JobQueue.backoff_seconds(20) <= 60.0 * 1.2
+
+
+class TestWorker:
+
+    def test_successful_jobs_complete(self, monkeypatch):
+        queue = run_worker(monkeypatch, [make_job(i) for i in range(5)], lambda payloads: {})
+        assert sorted(queue.completed) == list(range(5))
+        assert queue.failed == []
+
+    def test_failed_jobs_are_reported_with_error(self, monkeypatch):
+        def handler(payloads):
+            if payloads[0]['n'] == 1:
+                raise RuntimeError("scrape timed out")
+            return {}
+
+        queue = run_worker(monkeypatch, [make_job(i) for i in range(3)], handler)
+        assert sorted(queue.completed) == [0, 2]
+        assert queue.failed == [(1, "RuntimeError: scrape timed out")]
+
+    def test_jobs_are_handled_in_batches(self, monkeypatch):
+        batches = []
+
+        def handler(payloads):
+            batches.append([payload['n'] for payload in payloads])
+            return {i: "Scraping failed: 404" for i, payload in enumerate(payloads) if payload['n'] == 5}
+
+        queue = run_worker(monkeypatch, [make_job(i) for i in range(10)], handler, batch_size=4)
+        assert queue.claims == [4, 4, 2]
+        assert sorted(n for batch in batches for n in batch) == list(range(10))
+        assert sorted(queue.completed) == [0, 1, 2, 3, 4, 6, 7, 8, 9]
+        assert queue.failed == [(5, "Scraping failed: 404")]
+
+    def test_concurrency_is_bounded(self, monkeypatch):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def handler(payloads):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return {}
+
+        queue = run_worker(monkeypatch, [make_job(i) for i in range(8)], handler, concurrency=3)
+        assert len(queue.completed) == 8
+        assert peak[0] == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
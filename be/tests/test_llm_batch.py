@@ -0,0 +1,160 @@
+"""
+LLM Batch Mode Tests
+
+Validates that short documents are packed several to a request within the
+document and token limits, that results are matched back by id and cached
+per document (apart from single-document results), and that documents a batch response misses (or a response
+that cannot be parsed) fall back to single-document calls.
+"""
+
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_service as llm_service_module
+from app.services.llm_cache import LLMCache, MemoryLLMCacheBackend
+from app.services.llm_providers import GroqProvider
+from app.services.llm_service import LLMService
+
+
+class BatchGroqClient:
+    """Async client answering batch and single prompts; records the documents per request."""
+
+    def __init__(self, drop_ids=(), broken=False):
+        self.requests = []
+        self.drop_ids = set(drop_ids)
+        self.broken = broken
+        raw = SimpleNamespace(create=self.create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw))
+
+    async def create(self, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        numbers = [int(n) for n in re.findall(r"### Document (\d+)", prompt)]
+        self.requests.append(len(numbers) or 1)
+        if numbers:
+            if self.broken:
+                content = "not json"
+            else:
+                bodies = re.findall(r"Content:\n(.*?)(?:\n\n###|\n\nReturn ONLY)", prompt, re.S)
+                content = json.dumps({"results": [
+                    # Answered out of order: results are matched by id
+                    {"id": n, "summary": f"Batch: {body}", "tags": ["batched"]}
+                    for n, body in reversed(list(zip(numbers, bodies))) if n not in self.drop_ids
+                ]})
+        else:
+            body = prompt.split("Content:\n", 1)[1].split("\n\nReturn ONLY", 1)[0]
+            content = json.dumps({"summary": f"Single: {body}", "tags": ["single"]})
+        message = SimpleNamespace(content=content)
+        completion = SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+        return SimpleNamespace(headers={}, parse=lambda: completion)
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    monkeypatch.setattr(llm_service_module, "llm_cache", LLMCache(MemoryLLMCacheBackend(ttl_seconds=60, max_entries=100)))
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 60000)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 10_000_000)
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_DOCUMENTS", 4)
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_DOCUMENT_CHARS", 200)
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_PROMPT_TOKENS", 3000)
+
+    def make(client):
+        return LLMService(provider=GroqProvider(client=client))
+
+    return make
+
+
+def summarize_many(service, documents):
+    return asyncio.run(service.asummarize_and_tag_many(documents))
+
+
+class TestBatchMode:
+
+    def test_short_documents_share_requests(self, make_service):
+        client = BatchGroqClient()
+        service = make_service(client)
+        documents = [(f"Article {i}", ["python"]) for i in range(10)]
+
+        results = summarize_many(service, documents)
+
+        assert client.requests == [4, 4, 2]
+        assert [summary for summary, _ in results] == [f"Batch: Article {i}" for i in range(10)]
+        assert results[0][1] == json.dumps(["batched"])
+
+    def test_long_documents_are_sent_alone(self, make_service):
+        client = BatchGroqClient()
+        service = make_service(client)
+        long_text = "x" * 300
+
+        results = summarize_many(service, [("Article 1", []), (long_text, []), ("Article 2", [])])
+
+        assert sorted(client.requests) == [1, 2]
+        assert results[1][0] == f"Single: {long_text}"
+        assert results[2][0] == "Batch: Article 2"
+
+    def test_prompt_token_budget_splits_batches(self, make_service, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_BATCH_MAX_PROMPT_TOKENS", 100)
+        client = BatchGroqClient()
+        service = make_service(client)
+
+        summarize_many(service, [("y" * 150, []) for _ in range(4)])
+
+        # About 58 prompt tokens per document: two would exceed 100, so each goes alone
+        assert client.requests == [1, 1, 1, 1]
+
+    def test_documents_missing_from_response_fall_back(self, make_service):
+        client = BatchGroqClient(drop_ids={2})
+        service = make_service(client)
+
+        results = summarize_many(service, [(f"Article {i}", []) for i in range(3)])
+
+        assert client.requests == [3, 1]
+        assert results[1][0] == "Single: Article 1"
+        assert results[0][0] == "Batch: Article 0"
+
+    def test_unparseable_response_falls_back_to_single_calls(self, make_service):
+        client = BatchGroqClient(broken=True)
+        service = make_service(client)
+
+        results = summarize_many(service, [(f"Article {i}", []) for i in range(3)])
+
+        assert client.requests == [3, 1, 1, 1]
+        assert [summary for summary, _ in results] == [f"Single: Article {i}" for i in range(3)]
+
+    def test_results_are_cached_per_document(self, make_service):
+        client = BatchGroqClient()
+        service = make_service(client)
+        summarize_many(service, [(f"Article {i}", ["python"]) for i in range(3)])
+
+        results = summarize_many(service, [("Article 1", ["python"]), ("Article 9", ["python"]), ("", [])])
+
+        assert client.requests == [3, 1]
+        assert results[0][0] == "Batch: Article 1"
+        assert results[1][0] == "Single: Article 9"
+        assert results[2] == (None, None)
+
+    def test_single_calls_do_not_reuse_batch_results(self, make_service):
+        client = BatchGroqClient()
+        service = make_service(client)
+        summarize_many(service, [(f"Article {i}", ["python"]) for i in range(3)])
+
+        assert asyncio.run(service.asummarize_and_tag("Article 2", ["python"]))[0] == "Single: Article 2"
+        assert client.requests == [3, 1]
+
+    def test_batches_reuse_single_results(self, make_service):
+        client = BatchGroqClient()
+        service = make_service(client)
+        asyncio.run(service.asummarize_and_tag("Article 0", ["python"]))
+
+        results = summarize_many(service, [(f"Article {i}", ["python"]) for i in range(3)])
+
+        assert client.requests == [1, 2]
+        assert [summary for summary, _ in results] == ["Single: Article 0", "Batch: Article 1", "Batch: Article 2"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
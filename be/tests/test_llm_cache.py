@@ -0,0 +1,136 @@
+"""
+LLM Cache Tests
+
+Validates that repeated enrichment of the same content is served from the
+cache, that the model, prompt version and tag context are part of the key,
+that lookups and writes stay off the event loop, and that the in-memory
+backend expires and evicts entries.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_service as llm_service_module
+from app.services.llm_cache import LLMCache, MemoryLLMCacheBackend, cache_hits
+from app.services.llm_providers import GroqProvider
+from app.services.llm_service import LLMService
+
+
+class FakeGroqClient:
+    """Async client returning a fixed JSON completion; counts calls."""
+
+    def __init__(self, response=None):
+        self.calls = 0
+        self.response = response or {"summary": "A summary.", "tags": ["python", "testing"]}
+        raw = SimpleNamespace(create=self.create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=json.dumps(self.response))
+        completion = SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+        return SimpleNamespace(headers={}, parse=lambda: completion)
+
+
+@pytest.fixture
+def client():
+    return FakeGroqClient()
+
+
+@pytest.fixture
+def service(monkeypatch, client):
+    monkeypatch.setattr(llm_service_module, "llm_cache", LLMCache(MemoryLLMCacheBackend(ttl_seconds=60, max_entries=100)))
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 60000)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 10_000_000)
+    return LLMService(provider=GroqProvider(client=client))
+
+
+class TestLLMCache:
+
+    def test_repeated_content_is_served_from_cache(self, service, client):
+        hits = cache_hits.value()
+        first = service.summarize_and_tag("Some   article text", ["python"])
+        second = service.summarize_and_tag("Some article text", ["python"])
+
+        assert first == second == ("A summary.", json.dumps(["python", "testing"]))
+        assert client.calls == 1
+        assert cache_hits.value() == hits + 1
+
+    def test_tag_context_is_part_of_key(self, service, client):
+        service.summarize_and_tag("Some article text", ["python"])
+        service.summarize_and_tag("Some article text", ["rust"])
+        assert client.calls == 2
+
+    def test_prompt_version_is_part_of_key(self, service, client, monkeypatch):
+        service.summarize_and_tag("Some article text", [])
+        monkeypatch.setattr(llm_service_module, "PROMPT_VERSION", "combined-test")
+        service.summarize_and_tag("Some article text", [])
+        assert client.calls == 2
+
+    def test_empty_results_are_not_cached(self, service, client):
+        client.response = {"summary": None, "tags": []}
+        service.summarize_and_tag("Some article text")
+        service.summarize_and_tag("Some article text")
+        assert client.calls == 2
+
+
+class ThreadRecordingBackend(MemoryLLMCacheBackend):
+    """Records the threads its lookups and writes run on."""
+
+    def __init__(self):
+        super().__init__(ttl_seconds=60, max_entries=100)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def put(self, key, model, prompt_version, result):
+        self.threads.append(threading.get_ident())
+        super().put(key, model, prompt_version, result)
+
+
+class TestCacheOffEventLoop:
+
+    def test_single_and_batch_calls_use_worker_threads(self, service, monkeypatch):
+        backend = ThreadRecordingBackend()
+        monkeypatch.setattr(llm_service_module, "llm_cache", LLMCache(backend))
+
+        async def main():
+            await service.asummarize_and_tag("Some article text", ["python"])
+            await service.asummarize_and_tag_many([("Some article text", ["python"]), ("Other text", [])])
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(main())
+        assert len(backend.threads) == 6
+        assert loop_thread not in backend.threads
+
+
+class TestMemoryBackend:
+
+    def test_entries_expire(self):
+        backend = MemoryLLMCacheBackend(ttl_seconds=0.05, max_entries=10)
+        backend.put("key", "model", "v1", ("summary", None))
+        assert backend.get("key") == ("summary", None)
+        time.sleep(0.06)
+        assert backend.get("key") is None
+
+    def test_least_recently_used_entries_are_evicted(self):
+        backend = MemoryLLMCacheBackend(ttl_seconds=60, max_entries=2)
+        backend.put("a", "model", "v1", ("a", None))
+        backend.put("b", "model", "v1", ("b", None))
+        backend.get("a")
+        backend.put("c", "model", "v1", ("c", None))
+        assert backend.get("b") is None
+        assert backend.get("a") == ("a", None)
+        assert backend.get("c") == ("c", None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
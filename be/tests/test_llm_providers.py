@@ -0,0 +1,193 @@
+"""
+LLM Provider Tests
+
+Validates the Ollama backend against a local stub server (request format,
+concurrency limit, retries and timeouts) and switching providers.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_service as llm_service_module
+from app.services.event_loop import EventLoopThread
+from app.services.llm_cache import LLMCache
+from app.services.llm_providers import GroqProvider, OllamaProvider
+from app.services.llm_service import LLMService
+
+
+class StubOllama:
+    """Ollama-compatible /api/chat server on a free local port."""
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        self.delay = 0.0
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append(body)
+                    stub.active += 1
+                    stub.peak = max(stub.peak, stub.active)
+                    status = stub.statuses.pop(0) if stub.statuses else 200
+                try:
+                    time.sleep(stub.delay)
+                    payload = {
+                        "message": {"role": "assistant", "content": json.dumps({"summary": "Local summary.", "tags": ["local"]})},
+                        "prompt_eval_count": 40,
+                        "eval_count": 10,
+                    } if status == 200 else {"error": "failed"}
+                    data = json.dumps(payload).encode()
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubOllama()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def loop(monkeypatch):
+    loop = EventLoopThread("test-loop")
+    monkeypatch.setattr(llm_service_module, "event_loop", loop)
+    monkeypatch.setattr(llm_service_module, "llm_cache", LLMCache(backend=None))
+    monkeypatch.setattr(llm_service_module.llm_cache, "_resolved", True)
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 3)
+    yield loop
+    loop.shutdown()
+
+
+def make_service(stub, monkeypatch, max_concurrency=4, timeout=5.0):
+    monkeypatch.setattr(settings, "OLLAMA_MAX_CONCURRENCY", max_concurrency)
+    monkeypatch.setattr(settings, "OLLAMA_TIMEOUT_SECONDS", timeout)
+    return LLMService(provider=OllamaProvider(base_url=stub.url))
+
+
+class TestOllamaProvider:
+
+    def test_summarizes_through_chat_api(self, stub, loop, monkeypatch):
+        service = make_service(stub, monkeypatch)
+
+        summary, tags = service.summarize_and_tag("Some article text", ["python"])
+
+        assert summary == "Local summary."
+        assert json.loads(tags) == ["local"]
+        request = stub.requests[0]
+        assert request["model"] == settings.OLLAMA_MODEL
+        assert request["format"] == "json"
+        assert request["stream"] is False
+        assert request["options"]["num_predict"] == settings.LLM_MAX_TOKENS
+        assert "Some article text" in request["messages"][-1]["content"]
+        service.close()
+
+    def test_concurrency_is_limited(self, stub, loop, monkeypatch):
+        stub.delay = 0.05
+        service = make_service(stub, monkeypatch, max_concurrency=2)
+
+        async def main():
+            return await asyncio.gather(*(service.asummarize_and_tag(f"Article {i}") for i in range(6)))
+
+        results = loop.run(main())
+        assert all(summary == "Local summary." for summary, _ in results)
+        assert stub.peak == 2
+        service.close()
+
+    def test_server_errors_are_retried(self, stub, loop, monkeypatch):
+        stub.statuses = [500, 503]
+        service = make_service(stub, monkeypatch)
+
+        assert service.summarize_and_tag("Some article text")[0] == "Local summary."
+        assert len(stub.requests) == 3
+        service.close()
+
+    def test_rejected_request_is_not_retried(self, stub, loop, monkeypatch):
+        stub.statuses = [404]
+        service = make_service(stub, monkeypatch)
+
+        assert service.summarize_and_tag("Some article text") == (None, None)
+        assert len(stub.requests) == 1
+        service.close()
+
+    def test_timeouts_give_up_after_max_retries(self, stub, loop, monkeypatch):
+        stub.delay = 0.3
+        service = make_service(stub, monkeypatch, timeout=0.05)
+
+        assert service.summarize_and_tag("Some article text") == (None, None)
+        assert len(stub.requests) == 3
+        service.close()
+
+    def test_unreachable_server_fails_cleanly(self, loop, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 2)
+        service = LLMService(provider=OllamaProvider(base_url="http://127.0.0.1:9"))
+
+        assert service.summarize_and_tag("Some article text") == (None, None)
+        service.close()
+
+
+class TestProviderSelection:
+
+    def test_configure_switches_and_reuses_providers(self, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_PROVIDER", "groq")
+        service = LLMService()
+        groq = service._get_provider()
+        assert isinstance(groq, GroqProvider)
+
+        service.configure("ollama", "http://ollama.internal:11434")
+        ollama = service._get_provider()
+        assert isinstance(ollama, OllamaProvider)
+        assert ollama.base_url == "http://ollama.internal:11434"
+
+        service.configure("groq")
+        assert service._get_provider() is groq
+
+    def test_unknown_provider_is_ignored(self):
+        service = LLMService(provider=OllamaProvider())
+        service.configure("openai")
+        assert isinstance(service._get_provider(), OllamaProvider)
+
+    def test_groq_without_api_key_is_unavailable(self, monkeypatch, loop):
+        monkeypatch.setattr(settings, "GROQ_API_KEY", None)
+        service = LLMService(provider=GroqProvider())
+        assert service.summarize_and_tag("Some article text") == (None, None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
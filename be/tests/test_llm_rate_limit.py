@@ -0,0 +1,195 @@
+"""
+LLM Rate Limit Tests
+
+Validates the token buckets and the limiter's pacing, pausing and
+reconciliation, and that LLM calls honor retry-after, back off with jitter
+and give up on rejected requests.
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import BadRequestError, RateLimitError
+
+from app.core.config import settings
+from app.services import llm_service as llm_service_module
+from app.services.event_loop import EventLoopThread
+from app.services.llm_cache import LLMCache
+from app.services.llm_providers import GroqProvider, backoff_seconds
+from app.services.llm_service import LLMService
+from app.services.rate_limiter import RateLimiter, TokenBucket, parse_duration
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def status_error(error_class, status, headers=None):
+    request = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return error_class("error", response=response, body=None)
+
+
+class ScriptedGroqClient:
+    """Async client that raises the scripted errors in order, then succeeds."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.call_times = []
+        raw = SimpleNamespace(create=self.create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=raw))
+
+    async def create(self, **kwargs):
+        self.call_times.append(time.monotonic())
+        if self.errors:
+            raise self.errors.pop(0)
+        message = SimpleNamespace(content=json.dumps({"summary": "A summary.", "tags": ["python"]}))
+        completion = SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=SimpleNamespace(total_tokens=10))
+        return SimpleNamespace(headers={}, parse=lambda: completion)
+
+
+@pytest.fixture
+def loop(monkeypatch):
+    loop = EventLoopThread("test-loop")
+    monkeypatch.setattr(llm_service_module, "event_loop", loop)
+    monkeypatch.setattr(llm_service_module, "llm_cache", LLMCache(backend=None))
+    monkeypatch.setattr(llm_service_module.llm_cache, "_resolved", True)
+    yield loop
+    loop.shutdown()
+
+
+def make_service(monkeypatch, client, requests_per_minute=6000, tokens_per_minute=10_000_000):
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", requests_per_minute)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", tokens_per_minute)
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 3)
+    return LLMService(provider=GroqProvider(client=client))
+
+
+class TestParseDuration:
+
+    def test_formats(self):
+        assert parse_duration("12") == 12.0
+        assert parse_duration("7.66s") == pytest.approx(7.66)
+        assert parse_duration("2m59.56s") == pytest.approx(179.56)
+        assert parse_duration("250ms") == pytest.approx(0.25)
+        assert parse_duration(None) is None
+        assert parse_duration("soon") is None
+
+
+class TestTokenBucket:
+
+    def test_refills_at_rate_up_to_capacity(self):
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=60, capacity=5, clock=clock)
+        bucket.take(5)
+        assert bucket.wait_time(2) == pytest.approx(2.0)
+        clock.now += 10
+        assert bucket.wait_time(5) == 0.0
+        assert bucket.level == 5
+
+    def test_oversized_take_leaves_debt(self):
+        clock = FakeClock()
+        bucket = TokenBucket(per_minute=600, capacity=100, clock=clock)
+        bucket.take(300)
+        # Requests larger than the bucket wait for a full bucket, after the debt is repaid
+        assert bucket.wait_time(300) == pytest.approx(30.0)
+
+
+class TestRateLimiter:
+
+    def test_observe_returns_unused_tokens_and_clamps_to_headers(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=6000, clock=clock)
+        limiter.tokens.take(500)
+        limiter.observe(500, used_tokens=200)
+        assert limiter.tokens.level == 400
+        limiter.observe(0, headers={'x-ratelimit-remaining-tokens': '50'})
+        assert limiter.tokens.level == 50
+
+    def test_acquire_paces_requests(self):
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10_000_000)
+        times = []
+
+        async def call():
+            await limiter.acquire(1)
+            times.append(time.monotonic())
+
+        async def main():
+            await asyncio.gather(*(call() for _ in range(14)))
+
+        asyncio.run(main())
+        # 10 requests per second: a burst of one second's budget, then one every 100ms
+        gaps = [b - a for a, b in zip(times[9:], times[10:])]
+        assert min(gaps) >= 0.09
+        assert times[-1] - times[0] >= 0.35
+
+    def test_pause_holds_callers(self):
+        limiter = RateLimiter(requests_per_minute=60000, tokens_per_minute=10_000_000)
+
+        async def main():
+            limiter.pause(0.1)
+            start = time.monotonic()
+            await limiter.acquire(1)
+            return time.monotonic() - start
+
+        assert asyncio.run(main()) >= 0.09
+
+
+class TestLLMServiceRetries:
+
+    def test_rate_limited_call_waits_for_retry_after(self, monkeypatch, loop):
+        client = ScriptedGroqClient([status_error(RateLimitError, 429, {'retry-after': '0.2'})])
+        service = make_service(monkeypatch, client)
+
+        summary, tags = service.summarize_and_tag("Some article text")
+
+        assert summary == "A summary."
+        assert len(client.call_times) == 2
+        assert client.call_times[1] - client.call_times[0] >= 0.19
+
+    def test_rejected_request_is_not_retried(self, monkeypatch, loop):
+        client = ScriptedGroqClient([status_error(BadRequestError, 400)])
+        service = make_service(monkeypatch, client)
+
+        assert service.summarize_and_tag("Some article text") == (None, None)
+        assert len(client.call_times) == 1
+
+    def test_gives_up_after_max_retries(self, monkeypatch, loop):
+        client = ScriptedGroqClient([status_error(RateLimitError, 429, {'retry-after': '0.01'})] * 3)
+        service = make_service(monkeypatch, client)
+
+        assert service.summarize_and_tag("Some article text") == (None, None)
+        assert len(client.call_times) == 3
+
+    def test_backoff_is_jittered_and_capped(self, monkeypatch):
+        monkeypatch.setattr(settings, "LLM_RETRY_BASE_SECONDS", 1.0)
+        monkeypatch.setattr(settings, "LLM_RETRY_MAX_SECONDS", 8.0)
+        for attempt, expected in [(1, 1.0), (3, 4.0), (10, 8.0)]:
+            delays = {backoff_seconds(attempt) for _ in range(20)}
+            assert all(expected / 2 <= delay <= expected for delay in delays)
+            assert len(delays) > 1
+
+    def test_concurrent_calls_run_at_the_request_rate(self, monkeypatch, loop):
+        client = ScriptedGroqClient()
+        service = make_service(monkeypatch, client, requests_per_minute=600)
+
+        async def main():
+            return await asyncio.gather(*(service.asummarize_and_tag(f"Article {i}") for i in range(14)))
+
+        results = loop.run(main())
+        assert all(summary == "A summary." for summary, _ in results)
+        assert client.call_times[-1] - client.call_times[0] >= 0.35
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
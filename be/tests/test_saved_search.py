@@ -0,0 +1,180 @@
+"""
+Materialized Saved Search Tests
+
+Validates, against Postgres (TEST_POSTGRES_URL), incremental refreshes of
+materialized saved searches (keyword, semantic and hybrid matching, removal
+of items that stop matching, `matched_at` kept across refreshes) and the
+read path (`only_new`, `new_count`, refreshing only when stale).
+"""
+
+import uuid
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services import content_search_service as search_module
+from app.services.content_search_service import SavedSearchService
+
+
+def unit_vector(axis):
+    vector = np.zeros(settings.EMBEDDING_DIMENSION, dtype=np.float32)
+    vector[axis] = 1.0
+    return vector
+
+
+class FakeEmbeddingService:
+    """Embeds every query along the first axis."""
+
+    def embed(self, query):
+        return unit_vector(0).tolist()
+
+
+@pytest.fixture
+def db(postgres_db, monkeypatch):
+    monkeypatch.setattr(search_module, "active_embedding_service", lambda: FakeEmbeddingService())
+    monkeypatch.setattr(settings, "SAVED_SEARCH_MIN_SIMILARITY", 0.5)
+    return postgres_db
+
+
+@pytest.fixture
+def user(make_postgres_user):
+    return make_postgres_user()
+
+
+def add_content(db, user_id, title, axis):
+    content_id = uuid.uuid4()
+    db.execute(text("""
+        INSERT INTO content (id, user_id, source_url, domain, title, embedding)
+        VALUES (:id, :user_id, :url, 'example.com', :title, :embedding)
+    """), {'id': content_id, 'user_id': user_id, 'url': f"https://example.com/{content_id}",
+           'title': title, 'embedding': unit_vector(axis)})
+    return content_id
+
+
+def materialized_ids(db, saved):
+    rows = db.execute(text("SELECT content_id FROM saved_search_results WHERE saved_search_id = :id"), {'id': saved.id})
+    return {row.content_id for row in rows}
+
+
+@pytest.fixture
+def library(db, user):
+    """One item matching "rust" by keyword, one only by meaning, one matching neither."""
+    return {
+        'keyword': add_content(db, user, "Rust ownership explained", axis=1),
+        'semantic': add_content(db, user, "Memory safety without a garbage collector", axis=0),
+        'neither': add_content(db, user, "Sourdough baking", axis=2),
+    }
+
+
+class TestRefresh:
+
+    @pytest.mark.parametrize("mode, expected", [
+        ('keyword', {'keyword'}),
+        ('semantic', {'semantic'}),
+        ('hybrid', {'keyword', 'semantic'}),
+    ])
+    def test_matching_by_mode(self, db, user, library, mode, expected):
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode=mode, materialize=True)
+        assert materialized_ids(db, saved) == {library[name] for name in expected}
+
+    def test_hybrid_scores_combine_both_legs(self, db, user, library):
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode='hybrid', materialize=True)
+        rows = {row.content_id: row for row in db.execute(text(
+            "SELECT content_id, relevance_score, similarity_score, score FROM saved_search_results WHERE saved_search_id = :id"
+        ), {'id': saved.id})}
+
+        semantic = rows[library['semantic']]
+        assert semantic.relevance_score is None
+        assert semantic.score == pytest.approx(settings.HYBRID_SEARCH_SEMANTIC_WEIGHT)
+        keyword = rows[library['keyword']]
+        assert keyword.relevance_score > 0 and keyword.similarity_score == pytest.approx(0.0, abs=1e-6)
+
+    def test_filters_apply(self, db, user, library):
+        db.execute(text("UPDATE content SET is_read = true WHERE id = :id"), {'id': library['keyword']})
+        saved = SavedSearchService.create(
+            db, str(user), "Rust", "rust", mode='hybrid', filters={'is_read': False}, materialize=True,
+        )
+        assert materialized_ids(db, saved) == {library['semantic']}
+
+    def test_edit_that_stops_matching_removes_the_item(self, db, user, library):
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode='keyword', materialize=True)
+        db.execute(text("UPDATE content SET title = 'Go generics' WHERE id = :id"), {'id': library['keyword']})
+
+        SavedSearchService.refresh(db, saved)
+
+        assert materialized_ids(db, saved) == set()
+
+    def test_matched_at_is_kept_across_refreshes(self, db, user, library):
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode='keyword', materialize=True)
+        db.execute(text("UPDATE saved_search_results SET matched_at = '2020-01-01' WHERE saved_search_id = :id"), {'id': saved.id})
+        db.execute(text("UPDATE content SET title = 'Rust ownership, revisited' WHERE id = :id"), {'id': library['keyword']})
+
+        SavedSearchService.refresh(db, saved)
+
+        matched_at = db.execute(text(
+            "SELECT matched_at FROM saved_search_results WHERE saved_search_id = :id"
+        ), {'id': saved.id}).scalar()
+        assert matched_at.year == 2020
+
+    def test_other_users_content_is_not_matched(self, db, user, library, make_postgres_user):
+        add_content(db, make_postgres_user(), "Rust for other people", axis=0)
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode='hybrid', materialize=True)
+        assert materialized_ids(db, saved) == {library['keyword'], library['semantic']}
+
+
+class TestGetResults:
+
+    def test_new_matches_since_last_view(self, db, user, library):
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode='hybrid', materialize=True)
+        # Viewed a day ago; only the semantic match arrived after that
+        db.execute(text("UPDATE saved_search_results SET matched_at = now() - interval '2 days' WHERE content_id = :id"),
+                   {'id': library['keyword']})
+        saved.last_viewed_at = db.execute(text("SELECT now() - interval '1 day'")).scalar()
+        db.commit()
+
+        result = SavedSearchService.get_results(db, str(user), saved.id)
+        assert result['total'] == 2 and result['new_count'] == 1
+        assert {item['id']: item['is_new'] for item in result['items']} == {
+            library['semantic']: True, library['keyword']: False,
+        }
+
+        saved.last_viewed_at = result['last_viewed_at']
+        db.commit()
+        only_new = SavedSearchService.get_results(db, str(user), saved.id, only_new=True)
+        assert [item['id'] for item in only_new['items']] == [library['semantic']]
+        assert only_new['total'] == only_new['new_count'] == 1
+
+    def test_results_are_ordered_and_paged(self, db, user, library):
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode='hybrid', materialize=True)
+
+        first = SavedSearchService.get_results(db, str(user), saved.id, limit=1)
+        second = SavedSearchService.get_results(db, str(user), saved.id, limit=1, offset=1)
+        past_end = SavedSearchService.get_results(db, str(user), saved.id, limit=1, offset=5)
+
+        assert first['items'][0]['combined_score'] >= second['items'][0]['combined_score']
+        assert first['total'] == second['total'] == past_end['total'] == 2
+        assert past_end['items'] == []
+
+    def test_opening_refreshes_only_when_stale(self, db, user, library, monkeypatch):
+        saved = SavedSearchService.create(db, str(user), "Rust", "rust", mode='keyword', materialize=True)
+        refreshes = []
+        refresh = SavedSearchService.refresh
+        monkeypatch.setattr(SavedSearchService, "refresh", staticmethod(lambda *args: refreshes.append(1) or refresh(*args)))
+
+        SavedSearchService.get_results(db, str(user), saved.id)
+        assert refreshes == []
+
+        saved.last_refreshed_at -= timedelta(seconds=settings.SAVED_SEARCH_REFRESH_INTERVAL_SECONDS + 1)
+        db.commit()
+        SavedSearchService.get_results(db, str(user), saved.id)
+        assert refreshes == [1]
+
+    def test_unknown_search(self, db, user):
+        assert SavedSearchService.get_results(db, str(user), uuid.uuid4()) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""
+Scrape Runner Tests
+
+Validates that scrapes submitted from worker threads share one event loop
+and HTTP client, run concurrently under the global and per-domain limits,
+and report failures per URL.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+
+import pytest
+
+from app.services import scrape_runner as scrape_runner_module
+from app.services.event_loop import EventLoopThread
+from app.services.scrape_runner import ScrapeRunner
+
+
+@pytest.fixture
+def runner():
+    loop = EventLoopThread("test-loop")
+    runner = ScrapeRunner(max_concurrency=4, per_domain=2, loop=loop)
+    yield runner
+    runner.close()
+    loop.shutdown()
+
+
+class FakeScraper:
+    """Stands in for ContentScraper.scrape_url and records concurrency."""
+
+    def __init__(self):
+        self.active = Counter()
+        self.peak = Counter()
+        self.total_peak = 0
+        self.clients = set()
+        self.loops = set()
+
+    async def scrape_url(self, url, client=None):
+        domain = url.split("/")[2]
+        self.clients.add(id(client))
+        self.loops.add(id(asyncio.get_running_loop()))
+        self.active[domain] += 1
+        self.peak[domain] = max(self.peak[domain], self.active[domain])
+        self.total_peak = max(self.total_peak, sum(self.active.values()))
+        try:
+            await asyncio.sleep(0.02)
+            if url.endswith("/missing"):
+                raise ValueError("Unable to fetch URL")
+            return {"title": url, "content": "body"}
+        finally:
+            self.active[domain] -= 1
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    fake = FakeScraper()
+    monkeypatch.setattr(scrape_runner_module.ContentScraper, "scrape_url", fake.scrape_url)
+    return fake
+
+
+class TestScrapeRunner:
+
+    def test_limits_concurrency_per_domain_and_overall(self, runner, scraper):
+        urls = [f"https://{domain}.example/{i}" for domain in ("a", "b", "c") for i in range(4)]
+        results = runner.scrape_many(urls)
+        assert [result["title"] for result in results] == urls
+        assert max(scraper.peak.values()) == 2
+        assert scraper.total_peak == 4
+
+    def test_failures_are_returned_per_url(self, runner, scraper):
+        results = runner.scrape_many(["https://a.example/1", "https://a.example/missing"])
+        assert results[0]["content"] == "body"
+        assert isinstance(results[1], ValueError)
+        with pytest.raises(ValueError):
+            runner.scrape("https://a.example/missing")
+
+    def test_threads_share_one_loop_and_client(self, runner, scraper):
+        threads = [
+            threading.Thread(target=runner.scrape, args=(f"https://a.example/{i}",))
+            for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        runner.scrape_many(["https://b.example/1"])
+        assert len(scraper.loops) == 1
+        assert len(scraper.clients) == 1
+
+    def test_domain_limits_are_released(self, runner, scraper):
+        runner.scrape_many([f"https://a.example/{i}" for i in range(3)])
+        assert runner._domains == {}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,128 @@
+"""
+Search History Writer Tests
+
+Validates that history entries are buffered and flushed in batches
+without touching the database on the request path.
+"""
+
+import time
+import pytest
+
+from app.services.search_history_writer import SearchHistoryWriter
+
+
+class RecordingSink:
+    """Collects flushed batches instead of writing them to Postgres."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, entries):
+        self.batches.append(list(entries))
+
+
+class TestSearchHistoryWriter:
+
+    def test_add_does_not_flush_immediately(self):
+        sink = RecordingSink()
+        writer = SearchHistoryWriter(flush_fn=sink, flush_size=10, flush_interval_ms=60000)
+        writer.add("user-1", "python", "hybrid", 3)
+
+        assert writer.pending() == 1
+        assert sink.batches == []
+        writer.shutdown()
+
+    def test_flushes_in_batches_of_flush_size(self):
+        sink = RecordingSink()
+        writer = SearchHistoryWriter(flush_fn=sink, flush_size=3, flush_interval_ms=60000)
+        for i in range(7):
+            writer.add("user-1", f"query {i}", "keyword", i)
+
+        writer.flush()
+
+        assert [len(b) for b in sink.batches] == [3, 3, 1]
+        assert writer.pending() == 0
+        writer.shutdown()
+
+    def test_background_flush_after_interval(self):
+        sink = RecordingSink()
+        writer = SearchHistoryWriter(flush_fn=sink, flush_size=100, flush_interval_ms=20)
+        writer.add("user-1", "rust", "semantic", 1)
+
+        deadline = time.time() + 2
+        while not sink.batches and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert len(sink.batches) == 1
+        assert sink.batches[0][0]["query"] == "rust"
+        writer.shutdown()
+
+    def test_buffer_is_capped(self):
+        sink = RecordingSink()
+        writer = SearchHistoryWriter(flush_fn=sink, flush_size=100, flush_interval_ms=60000, max_buffer=5)
+        for i in range(8):
+            writer.add("user-1", f"q{i}", "hybrid", 1)
+
+        assert writer.pending() == 5
+        assert writer.dropped == 3
+        writer.shutdown()
+        # Oldest entries are the ones dropped
+        assert [e["query"] for e in sink.batches[0]] == ["q3", "q4", "q5", "q6", "q7"]
+
+    def test_shutdown_flushes_pending(self):
+        sink = RecordingSink()
+        writer = SearchHistoryWriter(flush_fn=sink, flush_size=100, flush_interval_ms=60000)
+        writer.add("user-1", "a", "hybrid", 1)
+        writer.add("user-2", "b", "hybrid", 1)
+
+        writer.shutdown()
+
+        assert sum(len(b) for b in sink.batches) == 2
+
+    def test_discard_drops_only_that_user(self):
+        sink = RecordingSink()
+        writer = SearchHistoryWriter(flush_fn=sink, flush_size=100, flush_interval_ms=60000)
+        writer.add("user-1", "a", "hybrid", 1)
+        writer.add("user-2", "b", "hybrid", 1)
+
+        writer.discard("user-1")
+        writer.shutdown()
+
+        assert [e["user_id"] for e in sink.batches[0]] == ["user-2"]
+
+    def test_failed_flush_requeues_entries(self):
+        sink = RecordingSink()
+        failures = [RuntimeError("database is down")]
+
+        def flaky(entries):
+            if failures:
+                raise failures.pop()
+            sink(entries)
+
+        writer = SearchHistoryWriter(flush_fn=flaky, flush_size=100, flush_interval_ms=60000, max_buffer=3)
+        for query in ("a", "b"):
+            writer.add("user-1", query, "hybrid", 1)
+
+        assert writer.flush() == 0
+        assert writer.pending() == 2
+        writer.add("user-1", "c", "hybrid", 1)
+        writer.add("user-1", "d", "hybrid", 1)
+        writer.shutdown()
+
+        # Requeued entries keep their order; the cap still drops the oldest
+        assert [e["query"] for e in sink.batches[0]] == ["b", "c", "d"]
+        assert writer.dropped == 1
+
+    def test_requeue_drops_what_does_not_fit(self):
+        writer = SearchHistoryWriter(flush_fn=RecordingSink(), flush_size=100, flush_interval_ms=60000, max_buffer=3)
+        writer.add("user-1", "new", "hybrid", 1)
+        batch = [{"query": q, "user_id": "user-1"} for q in ("a", "b", "c")]
+
+        assert writer._requeue(batch) == 2
+        assert writer.dropped == 1
+        assert [e["query"] for e in writer._buffer] == ["b", "c", "new"]
+        writer.shutdown()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,71 @@
+"""
+Batched Search Tests
+
+Validates the SQL of the batched semantic leg: an exact scan by default,
+and the same quantized candidate pass and exact re-rank as single-query
+semantic search when EMBEDDING_QUANTIZATION is set.
+"""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import content_search_service as search_module
+from app.services.content_search_service import ContentSearchService
+
+
+class RecordingSession:
+    """Records executed statements and returns no rows."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params or {}))
+        return []
+
+
+class FakeEmbeddingService:
+
+    def embed_batch_array(self, queries):
+        return [np.zeros(4, dtype=np.float32) for _ in queries]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(search_module, "active_embedding_service", lambda: FakeEmbeddingService())
+    monkeypatch.setattr(search_module, "active_embedding_model", lambda: ("test-model", 4))
+    return ContentSearchService(RecordingSession(), "user-1")
+
+
+def search_sql(service):
+    service._semantic_search_many(["python", "rust"], limit=10, offset=5)
+    return service.db.statements[-1]
+
+
+class TestSemanticSearchMany:
+
+    def test_exact_scan_without_quantization(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_QUANTIZATION", "none")
+        sql, params = search_sql(service)
+        assert "ORDER BY c.embedding <=> q.embedding LIMIT :limit OFFSET :offset" in sql
+        assert "halfvec" not in sql and "candidates" not in params
+
+    @pytest.mark.parametrize("quantization, expression", [
+        ("halfvec", "c.embedding::halfvec(4) <=> (q.embedding)::halfvec(4)"),
+        ("binary", "binary_quantize(c.embedding)::bit(4) <~> binary_quantize(q.embedding)"),
+    ])
+    def test_quantized_candidates_are_reranked(self, service, monkeypatch, quantization, expression):
+        monkeypatch.setattr(settings, "EMBEDDING_QUANTIZATION", quantization)
+        monkeypatch.setattr(settings, "SEMANTIC_RERANK_FACTOR", 4)
+        sql, params = search_sql(service)
+
+        assert f"ORDER BY {expression} LIMIT :candidates" in sql
+        assert sql.rstrip().endswith("ORDER BY q.idx, s.similarity_score DESC")
+        assert "ORDER BY c.embedding <=> q.embedding LIMIT :limit OFFSET :offset" in sql
+        assert params["candidates"] == 60
+        assert "hnsw.ef_search" in service.db.statements[0][0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,156 @@
+"""
+Streamed Search Tests
+
+Validates GET /search/stream against Postgres (TEST_POSTGRES_URL): NDJSON
+framing, rank order in keyword, semantic and hybrid mode, `limit`, filters,
+the semantic similarity cutoff, and that hybrid search embeds the query once.
+Also checks that GET /search serializes its results through the response model.
+"""
+
+import json
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.api import search as search_api
+from app.api.auth import get_current_user
+from app.db.session import get_db
+from app.core.config import settings
+from app.services import content_search_service as search_module
+
+
+def vector(*weights):
+    result = np.zeros(settings.EMBEDDING_DIMENSION, dtype=np.float32)
+    result[:len(weights)] = weights
+    return result / np.linalg.norm(result)
+
+
+class FakeEmbeddingService:
+    """Embeds every query along the first axis; counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_array(self, query):
+        self.calls += 1
+        return vector(1.0)
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    fake = FakeEmbeddingService()
+    monkeypatch.setattr(search_module, "active_embedding_service", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def library(postgres_db, make_postgres_user):
+    user_id = make_postgres_user()
+
+    def add(title, embedding, domain="example.com"):
+        content_id = uuid.uuid4()
+        postgres_db.execute(text("""
+            INSERT INTO content (id, user_id, source_url, domain, title, embedding)
+            VALUES (:id, :user_id, :url, :domain, :title, :embedding)
+        """), {'id': content_id, 'user_id': user_id, 'url': f"https://{domain}/{content_id}",
+               'domain': domain, 'title': title, 'embedding': embedding})
+        return str(content_id)
+
+    return SimpleNamespace(
+        user_id=user_id,
+        both=add("Rust ownership", vector(1.0)),
+        keyword=add("Rust macros, rust traits and rust lifetimes", vector(0.0, 1.0), domain="blog.example.com"),
+        semantic=add("Memory safety without a garbage collector", vector(0.8, 0.6)),
+        neither=add("Sourdough baking", vector(0.0, 0.0, 1.0)),
+    )
+
+
+@pytest.fixture
+def client(postgres_db, library, embedder, monkeypatch):
+    # Each stream opens its own session; give it one on the test's connection
+    monkeypatch.setattr(search_api, "SessionLocal", lambda: Session(bind=postgres_db.connection()))
+    app = FastAPI()
+    app.include_router(search_api.router)
+    app.dependency_overrides[get_db] = lambda: postgres_db
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=library.user_id)
+    return TestClient(app)
+
+
+def stream(client, **params):
+    response = client.get("/search/stream", params={'query': "rust", **params})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.text == "" or response.text.endswith("\n")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestStreamSearch:
+
+    def test_one_json_object_per_line(self, client, library):
+        items = stream(client, mode="keyword")
+        assert all(isinstance(item, dict) and item['title'] for item in items)
+        assert {item['id'] for item in items} == {library.both, library.keyword}
+
+    def test_keyword_results_in_relevance_order(self, client):
+        scores = [item['relevance_score'] for item in stream(client, mode="keyword")]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_semantic_results_in_similarity_order_above_cutoff(self, client, library):
+        items = stream(client, mode="semantic")
+        # The keyword-only and unrelated items are orthogonal to the query
+        assert [item['id'] for item in items] == [library.both, library.semantic]
+        assert items[0]['similarity_score'] == pytest.approx(1.0)
+        assert items[1]['similarity_score'] == pytest.approx(0.8)
+
+    def test_hybrid_fuses_both_legs(self, client, library, embedder):
+        items = stream(client, mode="hybrid")
+
+        assert [item['id'] for item in items] == [library.both, library.keyword, library.semantic]
+        scores = [item['combined_score'] for item in items]
+        assert scores == sorted(scores, reverse=True)
+        assert scores[0] == pytest.approx(1 / 61 + 1 / 62)
+        assert embedder.calls == 1
+
+    @pytest.mark.parametrize("mode", ["keyword", "semantic", "hybrid"])
+    def test_limit_is_respected(self, client, mode):
+        assert len(stream(client, mode=mode, limit=1)) == 1
+
+    @pytest.mark.parametrize("mode", ["keyword", "semantic", "hybrid"])
+    def test_filters_apply(self, client, library, mode):
+        items = stream(client, mode=mode, domain="example.com")
+        assert library.keyword not in {item['id'] for item in items}
+        assert library.both in {item['id'] for item in items}
+
+    def test_semantic_legs_are_capped(self, client, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_STREAM_MAX_RESULTS", 1)
+        assert len(stream(client, mode="semantic")) == 1
+        # One id from each leg at most
+        assert len(stream(client, mode="hybrid")) <= 2
+
+    def test_no_matches_is_an_empty_stream(self, client):
+        assert stream(client, mode="keyword", domain="nowhere.example.com") == []
+
+
+class TestSearchResponse:
+
+    def test_results_are_serialized_through_the_response_model(self, client, monkeypatch):
+        monkeypatch.setattr(search_api, "search_history_writer", SimpleNamespace(add=lambda *args: None))
+        response = client.get("/search", params={'query': "rust", 'mode': "keyword"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body['total'] == 2 and body['mode'] == "keyword"
+        item = body['items'][0]
+        # Fields outside SearchResultItem (e.g. the body) are dropped
+        assert set(item) == set(search_api.SearchResultItem.model_fields)
+        assert uuid.UUID(item['id']) and item['created_at']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
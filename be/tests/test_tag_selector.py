@@ -0,0 +1,105 @@
+"""
+Tag Selector Tests
+
+Validates that prompts list only the existing tags closest to the document,
+within the tag count and token budget, and that tag vectors are embedded
+once and then served from memory.
+"""
+
+import numpy as np
+import pytest
+
+from app.services import embedding_cache as embedding_cache_module
+from app.services import embedding_migration
+from app.services.tag_selector import TagSelector, estimate_tokens, fit_to_budget
+
+
+AXES = {"python": 0, "rust": 1, "cooking": 2, "travel": 3}
+
+
+class FakeEmbeddingService:
+    """Embeds a tag as the unit vector of its topic; counts encoded texts."""
+
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.encoded = []
+
+    def embed_batch_array(self, texts):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), len(AXES)), dtype=np.float32)
+        for i, text in enumerate(texts):
+            vectors[i, AXES[text.split("-")[0]]] = 1.0
+        return vectors
+
+    def embed_array(self, text):
+        return self.embed_batch_array([text])[0]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = FakeEmbeddingService()
+    monkeypatch.setattr(embedding_migration, "active_embedding_service", lambda: service)
+    monkeypatch.setattr(
+        embedding_cache_module.embedding_cache, "embed",
+        lambda texts, encode_fn, model_name=None: list(encode_fn(texts)),
+    )
+    return service
+
+
+def vocabulary():
+    return [f"{topic}-{i}" for topic in AXES for i in range(10)]
+
+
+class TestBudget:
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("ai") == 1
+        assert estimate_tokens("machine-learning") == 4
+
+    def test_fit_to_budget_keeps_prefix(self):
+        assert fit_to_budget(["aaaa", "bbbb", "cccc"], 4) == ["aaaa", "bbbb"]
+        assert fit_to_budget(["aaaa"], 1) == []
+
+
+class TestTagSelector:
+
+    def test_small_vocabulary_is_listed_without_embedding(self, service):
+        selector = TagSelector(max_tags=10, budget=100, cache_size=100)
+        assert selector.select(["python-1", "rust-1"], np.ones(4)) == ["python-1", "rust-1"]
+        assert service.encoded == []
+
+    def test_selects_most_similar_tags(self, service):
+        selector = TagSelector(max_tags=5, budget=1000, cache_size=100)
+        document = np.array([0.1, 0.9, 0.0, 0.0], dtype=np.float32)
+        selected = selector.select(vocabulary(), document)
+        assert len(selected) == 5
+        assert all(tag.startswith("rust-") for tag in selected)
+
+    def test_budget_caps_selection(self, service):
+        selector = TagSelector(max_tags=40, budget=12, cache_size=100)
+        selected = selector.select(vocabulary(), np.array([1.0, 0, 0, 0], dtype=np.float32))
+        assert sum(estimate_tokens(tag) + 1 for tag in selected) <= 12
+        assert selected and all(tag.startswith("python-") for tag in selected)
+
+    def test_text_document_is_embedded(self, service):
+        selector = TagSelector(max_tags=3, budget=1000, cache_size=100)
+        selected = selector.select(vocabulary(), "travel")
+        assert all(tag.startswith("travel-") for tag in selected)
+
+    def test_tag_vectors_are_cached(self, service):
+        selector = TagSelector(max_tags=5, budget=1000, cache_size=100)
+        document = np.array([0, 0, 1.0, 0], dtype=np.float32)
+        selector.select(vocabulary(), document)
+        encoded = len(service.encoded)
+        selector.select(vocabulary(), document)
+        assert len(service.encoded) == encoded == len(vocabulary())
+
+    def test_cache_is_bounded(self, service):
+        selector = TagSelector(max_tags=5, budget=1000, cache_size=8)
+        selector.select(vocabulary(), np.ones(4, dtype=np.float32))
+        assert len(selector._vectors) == 8
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,213 @@
+"""
+User Tag Vocabulary Tests
+
+Validates TagService's reads of the user_tags table, the per-user lock
+order of multi-user writers and, against Postgres (TEST_POSTGRES_URL), the
+trigger that keeps its counts in step with content on INSERT, UPDATE of the
+tag columns and DELETE, including multi-row statements like the enrichment
+pipeline's bulk write.
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.services.enrichment_pipeline import EnrichmentPipeline
+from app.services.tag_service import TagService
+
+
+class RecordingSession:
+    """Returns fixed user_tags rows and records the statements executed."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return self.rows
+
+
+class TestTagServiceReads:
+
+    def test_vocabularies_are_grouped_by_user(self):
+        alice, bob = uuid.uuid4(), uuid.uuid4()
+        db = RecordingSession([
+            SimpleNamespace(user_id=alice, tag="go"),
+            SimpleNamespace(user_id=alice, tag="rust"),
+            SimpleNamespace(user_id=bob, tag="python"),
+        ])
+
+        vocabularies = TagService.get_tags_for_users(db, [alice, bob])
+
+        assert vocabularies == {str(alice): ["go", "rust"], str(bob): ["python"]}
+        assert len(db.statements) == 1
+        assert db.statements[0][1] == {"user_ids": [str(alice), str(bob)]}
+
+    def test_no_users_runs_no_query(self):
+        db = RecordingSession()
+        assert TagService.get_tags_for_users(db, []) == {}
+        assert db.statements == []
+
+    def test_user_without_tags_gets_empty_list(self):
+        assert TagService.get_user_tags(RecordingSession(), str(uuid.uuid4())) == []
+
+
+class TestUserLockOrder:
+
+    def test_users_are_locked_once_each_in_order(self):
+        db = RecordingSession()
+        alice, bob = uuid.uuid4(), uuid.uuid4()
+        TagService.lock_users(db, [bob, alice, bob])
+
+        [(sql, params)] = db.statements
+        assert "pg_advisory_xact_lock(hashtext('user_tags'), hashtext(u::text))" in sql
+        assert "SELECT DISTINCT u" in sql and "ORDER BY u" in sql
+        assert params == {"user_ids": [str(bob), str(alice), str(bob)]}
+
+    def test_pipeline_write_locks_users_then_writes_rows_in_user_order(self):
+        db = RecordingSession()
+        low, high = sorted([uuid.uuid4(), uuid.uuid4()])
+        items = [
+            {'id': uuid.uuid4(), 'user_id': user_id, 'updates': {}, 'failed_steps': 0}
+            for user_id in (high, low, high, low)
+        ]
+
+        EnrichmentPipeline._write(db, items)
+
+        (lock_sql, lock_params), (update_sql, params) = db.statements
+        assert "pg_advisory_xact_lock" in lock_sql and "UPDATE content" in update_sql
+        assert sorted(set(lock_params["user_ids"])) == sorted({str(low), str(high)})
+        written = [params[f"id_{n}"] for n in range(len(items))]
+        assert written == [item['id'] for item in sorted(items, key=lambda item: (item['user_id'], item['id']))]
+
+
+class TestUserTagTriggers:
+    """The trigger itself; needs TEST_POSTGRES_URL."""
+
+    @pytest.fixture
+    def db(self, postgres_db):
+        return postgres_db
+
+    def add(self, db, user_id, tags=(), suggested=()):
+        content_id = uuid.uuid4()
+        db.execute(text("""
+            INSERT INTO content (id, user_id, source_url, domain, title, tags, suggested_tags)
+            VALUES (:id, :user_id, :url, 'example.com', 'Title', :tags, :suggested)
+        """), {'id': content_id, 'user_id': user_id, 'url': f"https://example.com/{content_id}",
+               'tags': list(tags), 'suggested': list(suggested)})
+        return content_id
+
+    def counts(self, db, user_id):
+        rows = db.execute(text("SELECT tag, item_count FROM user_tags WHERE user_id = :user_id"), {'user_id': user_id})
+        return {row.tag: row.item_count for row in rows}
+
+    def test_insert_counts_each_item_once_per_tag(self, db, make_postgres_user):
+        user = make_postgres_user()
+        self.add(db, user, tags=["python", "web"], suggested=["python", "api"])
+        self.add(db, user, tags=["python", ""])
+        assert self.counts(db, user) == {"python": 2, "web": 1, "api": 1}
+
+    def test_multi_row_insert(self, db, make_postgres_user):
+        alice, bob = make_postgres_user(), make_postgres_user()
+        db.execute(text("""
+            INSERT INTO content (id, user_id, source_url, domain, title, tags)
+            SELECT gen_random_uuid(), u, 'https://example.com/' || n || '/' || u, 'example.com', 'Title', ARRAY['go']
+            FROM unnest(CAST(:users AS uuid[])) AS u, generate_series(1, 3) AS n
+        """), {'users': [str(alice), str(bob)]})
+        assert self.counts(db, alice) == {"go": 3}
+        assert self.counts(db, bob) == {"go": 3}
+
+    def test_update_moves_counts_and_drops_unused_tags(self, db, make_postgres_user):
+        user = make_postgres_user()
+        first = self.add(db, user, tags=["python", "web"])
+        self.add(db, user, tags=["python"])
+
+        db.execute(text("UPDATE content SET tags = ARRAY['python', 'api'] WHERE id = :id"), {'id': first})
+        assert self.counts(db, user) == {"python": 2, "api": 1}
+
+        db.execute(text("UPDATE content SET tags = '{}', suggested_tags = ARRAY['api'] WHERE id = :id"), {'id': first})
+        assert self.counts(db, user) == {"python": 1, "api": 1}
+
+    def test_update_of_other_columns_leaves_counts(self, db, make_postgres_user):
+        user = make_postgres_user()
+        content_id = self.add(db, user, tags=["python"])
+        db.execute(text("UPDATE content SET title = 'Renamed', is_read = true WHERE id = :id"), {'id': content_id})
+        assert self.counts(db, user) == {"python": 1}
+
+    def holds_user_lock(self, db, user_id):
+        return db.execute(text("""
+            SELECT EXISTS (
+                SELECT 1 FROM pg_locks
+                WHERE locktype = 'advisory' AND pid = pg_backend_pid()
+                  AND objid::bigint = (hashtext(CAST(:user_id AS text))::bigint & 4294967295)
+            )
+        """), {'user_id': str(user_id)}).scalar()
+
+    def test_only_tag_and_owner_updates_fire(self, db, make_postgres_user):
+        user = make_postgres_user()
+        db.execute(text("ALTER TABLE content DISABLE TRIGGER content_user_tags_sync"))
+        content_id = self.add(db, user)
+        db.execute(text("ALTER TABLE content ENABLE TRIGGER content_user_tags_sync"))
+
+        db.execute(text("UPDATE content SET title = 'Renamed', summary = 'Short' WHERE id = :id"), {'id': content_id})
+        assert not self.holds_user_lock(db, user)
+
+        db.execute(text("UPDATE content SET suggested_tags = ARRAY['go'] WHERE id = :id"), {'id': content_id})
+        assert self.holds_user_lock(db, user)
+        assert self.counts(db, user) == {"go": 1}
+
+    def test_service_lock_uses_the_trigger_keys(self, db, make_postgres_user):
+        alice, bob = make_postgres_user(), make_postgres_user()
+        TagService.lock_users(db, [bob, alice])
+        assert self.holds_user_lock(db, alice) and self.holds_user_lock(db, bob)
+
+    def test_changing_owner_moves_tags(self, db, make_postgres_user):
+        alice, bob = make_postgres_user(), make_postgres_user()
+        content_id = self.add(db, alice, tags=["python"])
+        db.execute(text("UPDATE content SET user_id = :user_id WHERE id = :id"), {'user_id': bob, 'id': content_id})
+        assert self.counts(db, alice) == {}
+        assert self.counts(db, bob) == {"python": 1}
+
+    def test_bulk_update_from_values(self, db, make_postgres_user):
+        alice, bob = make_postgres_user(), make_postgres_user()
+        a1, a2 = self.add(db, alice, tags=["go"]), self.add(db, alice, tags=["go"])
+        b1 = self.add(db, bob, tags=["go"])
+
+        # Shaped like the enrichment pipeline's single-statement write
+        db.execute(text("""
+            UPDATE content AS c SET suggested_tags = v.suggested
+            FROM (VALUES (CAST(:a1 AS uuid), ARRAY['rust', 'go']), (CAST(:a2 AS uuid), ARRAY['rust']),
+                         (CAST(:b1 AS uuid), ARRAY['zig'])) AS v(id, suggested)
+            WHERE c.id = v.id
+        """), {'a1': a1, 'a2': a2, 'b1': b1})
+
+        assert self.counts(db, alice) == {"go": 2, "rust": 2}
+        assert self.counts(db, bob) == {"go": 1, "zig": 1}
+
+    def test_delete_decrements_and_removes(self, db, make_postgres_user):
+        user = make_postgres_user()
+        first = self.add(db, user, tags=["python", "web"])
+        self.add(db, user, tags=["python"])
+
+        db.execute(text("DELETE FROM content WHERE id = :id"), {'id': first})
+        assert self.counts(db, user) == {"python": 1}
+
+        db.execute(text("DELETE FROM content WHERE user_id = :user_id"), {'user_id': user})
+        assert self.counts(db, user) == {}
+
+    def test_service_reads_trigger_maintained_tags(self, db, make_postgres_user):
+        alice, bob = make_postgres_user(), make_postgres_user()
+        self.add(db, alice, tags=["rust"], suggested=["go"])
+        self.add(db, bob, tags=["python"])
+
+        assert TagService.get_user_tags(db, str(alice)) == ["go", "rust"]
+        assert TagService.get_tags_for_users(db, [alice, bob, make_postgres_user()]) == {
+            str(alice): ["go", "rust"], str(bob): ["python"],
+        }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
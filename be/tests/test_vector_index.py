@@ -0,0 +1,155 @@
+"""
+Vector Index Tests
+
+Validates the quantized candidate pass of semantic search (candidate SQL,
+exact re-rank, expressions matching the index definitions) and the index
+build plan of app.services.vector_index: only the configured mode's index is
+kept, the exact index is dropped only on request, and an old pgvector skips
+the build (against Postgres, TEST_POSTGRES_URL).
+"""
+
+import logging
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.services import content_search_service as search_module
+from app.services.content_search_service import ContentSearchService
+from app.services.vector_index import VectorIndexError, VectorIndexService
+
+
+class RecordingSession:
+    """Records executed statements and returns no rows."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params or {}))
+        return self
+
+    def fetchall(self):
+        return []
+
+
+class FakeEmbeddingService:
+
+    def embed_array(self, query):
+        return np.zeros(4, dtype=np.float32)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(search_module, "active_embedding_service", lambda: FakeEmbeddingService())
+    monkeypatch.setattr(search_module, "active_embedding_model", lambda: ("test-model", 4))
+    monkeypatch.setattr(settings, "SEMANTIC_RERANK_FACTOR", 4)
+    return ContentSearchService(RecordingSession(), "user-1")
+
+
+EXPRESSIONS = [
+    ("halfvec", "c.embedding::halfvec(4) <=> (CAST(:embedding AS vector))::halfvec(4)"),
+    ("binary", "binary_quantize(c.embedding)::bit(4) <~> binary_quantize(CAST(:embedding AS vector))"),
+]
+
+
+class TestCandidatePass:
+
+    def test_exact_search_without_quantization(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_QUANTIZATION", "none")
+        service.semantic_search("rust", limit=10, offset=5)
+
+        [(sql, params)] = service.db.statements
+        assert "ORDER BY c.embedding <=> CAST(:embedding AS vector) LIMIT :limit OFFSET :offset" in sql
+        assert "candidates" not in params
+
+    @pytest.mark.parametrize("quantization, expression", EXPRESSIONS)
+    def test_candidates_are_reranked_exactly(self, service, monkeypatch, quantization, expression):
+        monkeypatch.setattr(settings, "EMBEDDING_QUANTIZATION", quantization)
+        service.semantic_search("rust", limit=10, offset=5, domain="example.com")
+
+        (ef_sql, ef_params), (sql, params) = service.db.statements
+        assert "hnsw.ef_search" in ef_sql and ef_params['ef_search'] == "60"
+        candidates, rerank = sql.split("SELECT c.*", 1)
+        assert f"ORDER BY {expression} LIMIT :candidates" in candidates
+        assert "c.domain = :domain" in candidates
+        assert "ORDER BY c.embedding <=> CAST(:embedding AS vector) LIMIT :limit OFFSET :offset" in rerank
+        assert params['candidates'] == 60
+
+    def test_candidates_are_capped(self, service, monkeypatch):
+        monkeypatch.setattr(settings, "EMBEDDING_QUANTIZATION", "halfvec")
+        service.semantic_search("rust", limit=100, offset=900)
+        assert service.db.statements[-1][1]['candidates'] == 1000
+
+    @pytest.mark.parametrize("quantization, expression", EXPRESSIONS)
+    def test_expression_matches_the_index(self, quantization, expression):
+        # The planner only uses the index for the same expression
+        definition = VectorIndexService._definition(VectorIndexService.MODE_INDEXES[quantization], 4)
+        indexed = expression.split(" <")[0].replace("c.embedding", "embedding")
+        assert f"(({indexed}) " in definition
+
+
+STATES = {
+    'idx_content_embedding_hnsw': True,
+    'idx_content_embedding_halfvec_hnsw': None,
+    'idx_content_embedding_binary_hnsw': None,
+}
+
+
+class TestPlan:
+
+    def test_builds_only_the_configured_mode(self):
+        assert VectorIndexService.plan('halfvec', STATES) == (['idx_content_embedding_halfvec_hnsw'], [])
+
+    def test_nothing_to_do_when_the_index_exists(self):
+        assert VectorIndexService.plan('none', STATES) == ([], [])
+
+    def test_switching_modes_drops_the_other_quantized_index(self):
+        states = {**STATES, 'idx_content_embedding_halfvec_hnsw': True}
+        assert VectorIndexService.plan('binary', states) == (
+            ['idx_content_embedding_binary_hnsw'], ['idx_content_embedding_halfvec_hnsw'],
+        )
+        assert VectorIndexService.plan('binary', states, keep_unused=True) == (['idx_content_embedding_binary_hnsw'], [])
+        assert VectorIndexService.plan('none', states) == ([], ['idx_content_embedding_halfvec_hnsw'])
+
+    def test_exact_index_dropped_only_on_request(self):
+        states = {**STATES, 'idx_content_embedding_halfvec_hnsw': True}
+        assert VectorIndexService.plan('halfvec', states) == ([], [])
+        assert VectorIndexService.plan('halfvec', states, drop_exact=True) == ([], ['idx_content_embedding_hnsw'])
+        with pytest.raises(VectorIndexError):
+            VectorIndexService.plan('none', states, drop_exact=True)
+
+    def test_invalid_index_is_rebuilt(self):
+        states = {**STATES, 'idx_content_embedding_hnsw': False}
+        assert VectorIndexService.plan('none', states) == (['idx_content_embedding_hnsw'], [])
+
+    def test_unknown_mode(self):
+        with pytest.raises(VectorIndexError):
+            VectorIndexService.plan('int8', STATES)
+
+
+@pytest.fixture
+def indexes(postgres_db):
+    return VectorIndexService(postgres_db.get_bind().engine)
+
+
+class TestBuild:
+
+    def test_old_pgvector_skips_quantized_build(self, indexes, monkeypatch, caplog):
+        monkeypatch.setattr(VectorIndexService, "pgvector_version", staticmethod(lambda conn: (0, 6, 2)))
+        with caplog.at_level(logging.WARNING):
+            assert indexes.build('halfvec', drop_exact=True) == ([], [])
+        assert "needs pgvector >= 0.7.0, installed is 0.6.2" in caplog.text
+        assert indexes.status()['idx_content_embedding_hnsw'] == 'valid'
+
+    def test_exact_mode_keeps_the_existing_index(self, indexes):
+        assert indexes.build('none') == ([], [])
+
+    def test_status_reports_version_and_indexes(self, indexes):
+        status = indexes.status()
+        assert status['pgvector'] and status['idx_content_embedding_hnsw'] == 'valid'
+        assert set(status) >= set(VectorIndexService.MODE_INDEXES.values())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -98,6 +98,10 @@ export const collectionAPI = {
 export const searchAPI = {
   search: (query, mode = 'hybrid', options = {}) =>
     apiClient.get('/search', { params: { query, mode, ...options } }),
+  batchSearch: (queries, mode = 'hybrid', options = {}) =>
+    apiClient.post('/search/batch', { queries, mode, ...options }),
+  searchPassages: (query, options = {}) =>
+    apiClient.get('/search/passages', { params: { query, ...options } }),
   getHistory: (limit = 10) =>
     apiClient.get('/search/history', { params: { limit } }),
   deleteHistory: () =>